@@ -2,16 +2,43 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_migrate import Migrate
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import shutil
+import mimetypes
+import tempfile
 from datetime import datetime, timedelta
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import jwt
-from database import db, Video, User, Subscription, VideoLike, VideoDislike, Comment, get_kst_now
+import click
+from database import db, Video, User, Subscription, Comment, UploadSession, VideoLike, VideoDislike, Job, get_kst_now
+from blobs import BlobStore, BLOB_CACHE_CONTROL
+from dbconfig import configure_database, install_pragmas
+from streaming import StreamEngine
+from hls import HlsPackager, HLS_PENDING, HLS_READY, MASTER_PLAYLIST
+from uploads import ResumableUploads, UploadError
+from viewcount import ViewCounter
+from search import SearchIndex, exclude_search_tables
+from pagination import keyset_page, parse_limit, InvalidCursor, MAX_PAGE_SIZE
+from reactions import toggle_reaction, user_reactions, reconcile_reaction_counts, VideoNotFound, LIKE, DISLIKE
+from counters import (toggle_subscription, release_subscriptions, reconcile_subscriber_counts,
+                      adjust_comment_count, release_comments, reconcile_comment_counts)
+from cache import TTLCache
+from auth import AuthCache, InvalidUser
+from hashing import PasswordHasher, HasherBusy
+from jobs import JobQueue
+from images import ImagePipeline
+from probe import MediaProber
+from faststart import FaststartRemuxer
+from storage import LocalStorage, redirect_response
+from responsecache import ResponseCache
+from serializers import (VideoListSerializer, VIDEO_LIST_COLUMNS, json_response,
+                         format_views, format_time, format_date)
 import pytz
 
 app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "*"}})
+# X-Next-Cursor: 목록 API의 다음 페이지 커서, X-Total-Count: 댓글 전체 개수
+CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor', 'X-Total-Count'])
 
 KST = pytz.timezone('Asia/Seoul')
 
@@ -19,33 +46,314 @@ KST = pytz.timezone('Asia/Seoul')
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'  # 실제 운영시 환경변수로 관리
 app.config['JWT_EXPIRATION_HOURS'] = 24
 
-# SQLite 설정
+# DB 설정 (기본값 SQLite, DATABASE_URL 환경변수로 변경 가능)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(BASE_DIR, "videos.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f'sqlite:///{os.path.join(BASE_DIR, "videos.db")}'
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# SQLITE_TUNING=0: WAL/PRAGMA/읽기·쓰기 분리 없이 기본 설정으로 실행 (벤치마크 비교용)
+app.config['SQLITE_TUNING'] = os.environ.get('SQLITE_TUNING', '1') != '0'
 
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads/videos')
 THUMBNAIL_FOLDER = os.path.join(BASE_DIR, 'uploads/thumbnails')
+HLS_FOLDER = os.path.join(BASE_DIR, 'uploads/hls')
 
 ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'webm'}
 ALLOWED_IMAGES = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['THUMBNAIL_FOLDER'] = THUMBNAIL_FOLDER
+app.config['HLS_FOLDER'] = HLS_FOLDER
+app.config['HLS_TRANSCODER'] = os.environ.get('HLS_TRANSCODER', 'ffmpeg')  # 테스트/개발용: 'stub'
 app.config['MAX_CONTENT_LENGTH'] = 8 * 1024 * 1024 * 1024
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(THUMBNAIL_FOLDER, exist_ok=True)
 
 # DB 및 마이그레이션 초기화
+# SQLite: WAL/PRAGMA 적용, 읽기는 reader 풀, 쓰기는 단일 writer 연결로 분리
+configure_database(app)
 db.init_app(app)
-migrate = Migrate(app, db)
+install_pragmas(app, db)
+# FTS 검색 색인 테이블은 autogenerate 대상에서 제외
+# render_as_batch: SQLite에서도 ALTER가 필요한 마이그레이션이 동작하도록 (PostgreSQL에서는 일반 ALTER)
+migrate = Migrate(app, db, include_object=exclude_search_tables, render_as_batch=True)
+
+# 스트리밍 엔진 (열린 파일/stat 캐시, 레인지 응답)
+# X-Accel-Redirect 경로는 uploads 기준 상대 경로 (blobs/ab/cd/<해시>.mp4, 예전 파일은 videos/<파일명>)
+app.config['STREAM_ACCEL_PREFIX'] = '/protected/'
+app.config['STREAM_ACCEL_ROOT'] = os.path.join(BASE_DIR, 'uploads')
+stream_engine = StreamEngine(app)
+
+# HLS 패키징 (업로드 후 백그라운드에서 화질별 세그먼트 생성)
+hls_packager = HlsPackager(app)
+
+# 백그라운드 작업 큐 (파일 삭제, HLS 패키징)
+# JOB_LOCAL_WORKERS=0: API 프로세스에서는 처리하지 않고 flask --app app jobs-worker 로만 처리
+if os.environ.get('JOB_LOCAL_WORKERS'):
+    app.config['JOB_LOCAL_WORKERS'] = int(os.environ['JOB_LOCAL_WORKERS'])
+job_queue = JobQueue(app)
+
+# 블롭/이미지 변형 저장소: local(기본) 또는 s3 (MinIO 등 S3 호환 저장소는 STORAGE_S3_ENDPOINT_URL 지정)
+# s3면 /stream과 이미지 요청은 presign URL로 302 응답해서 클라이언트가 저장소에서 바로 받음
+app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'local')
+app.config['STORAGE_S3_BUCKET'] = os.environ.get('STORAGE_S3_BUCKET')
+app.config['STORAGE_S3_PREFIX'] = os.environ.get('STORAGE_S3_PREFIX', '')
+app.config['STORAGE_S3_ENDPOINT_URL'] = os.environ.get('STORAGE_S3_ENDPOINT_URL')
+app.config['STORAGE_S3_REGION'] = os.environ.get('STORAGE_S3_REGION')
+
+# 업로드 파일 저장소 (내용 해시로 저장해서 같은 파일은 한 번만, 참조가 없어지면 GC)
+blob_store = BlobStore(app)
+
+# 원격 저장소일 때 /stream 요청의 비디오 id -> 파일 이름 (presign URL을 만들 때 DB 조회를 줄임)
+stream_filenames = TTLCache(maxsize=10000, ttl=300)
+
+# 썸네일/프로필/배너 이미지의 너비별 WebP/JPEG 변형 (작업 큐에서 생성)
+image_pipeline = ImagePipeline(app, store=blob_store)
+
+# 업로드된 비디오의 길이/해상도/코덱/비트레이트/크기/moov 위치 분석 (작업 큐에서 실행)
+media_prober = MediaProber(app)
+
+# moov가 끝에 있는 MP4/MOV를 앞으로 옮겨 다시 저장 (재생 시작 전에 파일 끝을 받지 않도록)
+faststart_remuxer = FaststartRemuxer(app)
+
+# 삭제 작업에서 지울 수 있는 폴더 (payload에는 폴더 설정 이름과 파일명만 저장)
+MEDIA_FOLDERS = ('UPLOAD_FOLDER', 'THUMBNAIL_FOLDER', 'PROFILE_FOLDER', 'BANNER_FOLDER')
+
+# 업로드 파일 이름이 들어 있는 컬럼 (블롭 참조 수 = 이 컬럼들에 나온 횟수)
+MEDIA_COLUMNS = (
+    ('UPLOAD_FOLDER', Video.filename),
+    ('THUMBNAIL_FOLDER', Video.thumbnail),
+    ('PROFILE_FOLDER', User.profile_image),
+    ('BANNER_FOLDER', User.banner_image),
+)
+
+def media_files(*pairs):
+    """(폴더 설정 이름, 파일명) 목록에서 파일명이 없는 항목 제외"""
+    return [[folder, filename] for folder, filename in pairs if filename]
+
+def save_upload(file):
+    """업로드된 파일(FileStorage)을 저장소에 넣고 컬럼에 저장할 이름 반환
+
+    참조 증가는 파일을 두기 전에 바로 커밋되므로 커밋하지 않은 변경이 없을 때 호출하고,
+    레코드 저장이 실패하면 release_media로 되돌립니다.
+    """
+    return blob_store.put_stream(file.stream, file.filename.rsplit('.', 1)[1])
+
+def release_media(*pairs):
+    """더 이상 쓰지 않는 업로드 파일 정리 (호출한 쪽에서 커밋)
+
+    블롭은 참조 수만 줄이고 BLOB_GC_GRACE 뒤에 collect_blobs 작업이 지우며,
+    저장소 이전의 파일은 delete_files 작업으로 지울 (폴더, 파일명) 목록으로 반환합니다.
+    """
+    files = media_files(*pairs)
+    released = blob_store.release(*(filename for _, filename in files))
+    if released:
+        job_queue.enqueue('collect_blobs', {'digests': released}, delay=app.config['BLOB_GC_GRACE'])
+    return [[folder, filename] for folder, filename in files if not blob_store.is_blob(filename)]
+
+@job_queue.handler('delete_files')
+def delete_files_job(files=(), hls_video_ids=()):
+    """업로드 파일과 HLS 결과물 삭제 (이미 지워진 파일은 건너뜀)"""
+    for folder, filename in files:
+        if folder not in MEDIA_FOLDERS:
+            raise ValueError(f'삭제할 수 없는 폴더입니다: {folder}')
+        try:
+            os.remove(os.path.join(app.config[folder], os.path.basename(filename)))
+        except FileNotFoundError:
+            pass
+        image_pipeline.delete_variants(folder, filename)
+    for video_id in hls_video_ids:
+        hls_packager.delete(video_id)
+
+@job_queue.handler('package_hls')
+def package_hls_job(video_id):
+    """업로드된 비디오 HLS 패키징 (그 사이 삭제된 비디오는 건너뜀)"""
+    video = db.session.get(Video, video_id)
+    if video is None:
+        return
+    # 분석이 먼저 끝났으면 원본 해상도를 다시 확인하지 않음
+    size = (video.width, video.height) if video.width and video.height else None
+    with blob_store.local_file('UPLOAD_FOLDER', video.filename) as src:
+        if src is None:
+            raise FileNotFoundError(video.filename)
+        hls_packager.process(video_id, src, size)
+
+def probe_video_file(filename):
+    """저장된 비디오 파일 분석 (원격 저장소면 ffprobe는 presign URL, moov 확인은 범위 요청으로 읽음)"""
+    src = blob_store.local_path('UPLOAD_FOLDER', filename) or blob_store.url(filename)
+    with blob_store.open('UPLOAD_FOLDER', filename) as f:
+        return media_prober.probe(src, f, filename.rsplit('.', 1)[1])
+
+@job_queue.handler('probe_video')
+def probe_video_job(video_id):
+    """업로드된 비디오의 메타데이터를 분석해서 기록 (길이를 알면 목록에 보이는 duration도 갱신)"""
+    video = db.session.get(Video, video_id)
+    if video is None:
+        return
+    media_prober.apply(video, probe_video_file(video.filename))
+    if video.moov_at_start is False and app.config['FASTSTART_ON_UPLOAD']:
+        job_queue.enqueue('faststart_video', {'video_id': video_id}, dedupe_key=f'faststart:{video_id}')
+    db.session.commit()
+    invalidate_follower_feeds(video.channel)
+    bump_video(video.channel)
+
+def remux_video_file(filename):
+    """비디오 파일을 faststart로 다시 쓴 임시 파일 경로 반환 (이미 moov가 앞에 있거나 MP4/MOV가 아니면 None)"""
+    if not faststart_remuxer.supports(filename):
+        return None
+    ext = filename.rsplit('.', 1)[1]
+    fd, tmp = tempfile.mkstemp(dir=app.config['BLOB_TMP_FOLDER'], suffix=f'.{ext}')
+    os.close(fd)
+    try:
+        with blob_store.local_file('UPLOAD_FOLDER', filename) as src:
+            if src is None:
+                raise FileNotFoundError(filename)
+            if faststart_remuxer.remux(src, tmp, ext):
+                return tmp
+    except Exception:
+        os.remove(tmp)
+        raise
+    os.remove(tmp)
+    return None
+
+def swap_video_file(old, path):
+    """변환한 파일을 저장소에 넣고 old를 쓰던 비디오들의 파일을 한 번에 교체 후 커밋, 바뀐 비디오 수 반환
+
+    내용이 바뀌므로 블롭 이름도 바뀝니다. 예전 블롭은 참조만 줄여서 BLOB_GC_GRACE 동안 남으므로
+    이미 재생 중인 요청은 끊기지 않습니다.
+    """
+    size = os.path.getsize(path)
+    new = blob_store.put_file(path, old.rsplit('.', 1)[1])
+    video_ids = [video_id for (video_id,) in db.session.query(Video.id).filter(Video.filename == old)]
+    rows = db.session.query(Video).filter(Video.id.in_(video_ids), Video.filename == old).update(
+        {Video.filename: new, Video.moov_at_start: True, Video.file_size: size, Video.remuxed_at: get_kst_now()},
+        synchronize_session=False)
+    if not rows:
+        # 그 사이 삭제/교체됨: 새로 넣은 파일의 참조를 되돌림
+        db.session.rollback()
+        release_media(('UPLOAD_FOLDER', new))
+        db.session.commit()
+        return 0
+    for _ in range(rows - 1):
+        blob_store.reference(new.split('.', 1)[0])
+    files = release_media(*[('UPLOAD_FOLDER', old)] * rows)
+    if files:
+        job_queue.enqueue('delete_files', {'files': files})
+    db.session.commit()
+    for video_id in video_ids:
+        stream_engine.invalidate(video_id)
+        stream_filenames.delete(video_id)
+    return rows
+
+@job_queue.handler('faststart_video')
+def faststart_video_job(video_id):
+    """moov가 뒤에 있는 업로드 비디오를 faststart로 다시 저장하고 파일 교체"""
+    video = db.session.get(Video, video_id)
+    if video is None or video.moov_at_start is not False:
+        return
+    filename = video.filename
+    path = remux_video_file(filename)
+    if path is None:
+        video.moov_at_start = True
+        db.session.commit()
+        return
+    swap_video_file(filename, path)
+
+@job_queue.handler('image_variants')
+def image_variants_job(folder, filename):
+    """업로드된 이미지의 너비별 변형 생성"""
+    image_pipeline.generate(folder, filename)
+
+@job_queue.handler('poster_frame')
+def poster_frame_job(video_id):
+    """썸네일 없이 업로드된 비디오의 대표 프레임을 썸네일로 저장"""
+    video = db.session.get(Video, video_id)
+    if video is None or video.thumbnail:
+        return
+    poster = os.path.join(app.config['BLOB_TMP_FOLDER'], f'poster_{video_id}.jpg')
+    with blob_store.local_file('UPLOAD_FOLDER', video.filename) as src:
+        if src is None:
+            raise FileNotFoundError(video.filename)
+        image_pipeline.extract_poster(src, poster)
+    thumbnail = blob_store.put_file(poster, 'jpg')
+    video = db.session.get(Video, video_id)
+    if video is None or video.thumbnail:
+        # 그 사이 삭제되었거나 썸네일이 올라옴
+        release_media(('THUMBNAIL_FOLDER', thumbnail))
+        db.session.commit()
+        return
+    video.thumbnail = thumbnail
+    job_queue.enqueue('image_variants', {'folder': 'THUMBNAIL_FOLDER', 'filename': thumbnail})
+    db.session.commit()
+    invalidate_follower_feeds(video.channel)
+    bump_video(video.channel)
+
+@job_queue.handler('collect_blobs')
+def collect_blobs_job(digests=None):
+    """참조가 없어진 블롭과 그 이미지 변형 삭제 (그 사이 다시 참조된 블롭은 건너뜀), 지운 이름 반환"""
+    removed = blob_store.collect(digests)
+    for name in removed:
+        for folder in app.config['IMAGE_WIDTHS']:
+            image_pipeline.delete_variants(folder, name)
+    return removed
+
+# 재개 가능한 청크 업로드 (청크는 블롭 저장소의 멀티파트 업로드 파트로 저장)
+resumable_uploads = ResumableUploads(app, storage=blob_store.storage)
+
+# 조회수 write-behind 카운터 (증가분을 모아서 일괄 UPDATE)
+view_counter = ViewCounter(app)
+
+# FTS5 검색 색인 (flask --app app search-index 로 생성/재색인)
+search_index = SearchIndex(app)
+
+# 구독 피드 첫 페이지 캐시 (사용자 id -> (limit, 응답 목록, 다음 커서))
+app.config['FEED_CACHE_TTL'] = 30
+app.config['FEED_CACHE_SIZE'] = 10000
+feed_cache = TTLCache(maxsize=app.config['FEED_CACHE_SIZE'], ttl=app.config['FEED_CACHE_TTL'])
+
+# 공개 조회 API 응답 캐시 (ETag/304), 여러 워커가 공유하려면 RESPONSE_CACHE_REDIS_URL 설정
+# 태그: 'videos' (비디오 목록/검색), 'user:<username>' (채널), 'comments:<video_id>' (댓글)
+app.config['RESPONSE_CACHE_REDIS_URL'] = os.environ.get('RESPONSE_CACHE_REDIS_URL')
+response_cache = ResponseCache(app)
+
+def bump_video(channel):
+    """비디오 추가/수정/삭제 후 목록과 채널 페이지 캐시 무효화"""
+    response_cache.bump('videos', f'user:{channel}')
+
+# HLS 패키징이 끝나면 hlsUrl이 바뀌므로 캐시 무효화
+hls_packager.status_listeners.append(lambda video: bump_video(video.channel))
 
 def allowed_file(filename, allowed_set):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_set
 
 BASE_URL = 'http://jcher.iptime.org:8087'
 
+# 목록 API 직렬화 (URL/날짜 등 요청과 무관한 값은 행마다 한 번만 계산)
+video_serializer = VideoListSerializer(BASE_URL, view_counter.pending)
+
+def hls_url(video):
+    """HLS 패키징이 끝난 비디오의 master 재생목록 URL (없으면 None)"""
+    if video.hls_status != HLS_READY:
+        return None
+    return f'{BASE_URL}/api/videos/{video.id}/hls/{MASTER_PLAYLIST}'
+
+# JWT 검증 결과/사용자 캐시 (인증된 요청마다 users 테이블을 조회하지 않도록)
+auth_cache = AuthCache(app)
+
+# 비밀번호 해싱 프로세스 풀 (HASH_WORKERS=0: 요청 스레드에서 바로 계산)
+if os.environ.get('HASH_WORKERS'):
+    app.config['HASH_WORKERS'] = int(os.environ['HASH_WORKERS'])
+password_hasher = PasswordHasher(app)
+
+@app.errorhandler(HasherBusy)
+def hasher_busy(e):
+    # 로그인/회원가입 폭주 시 대기열을 늘리지 않고 바로 거절 (클라이언트가 잠시 후 재시도)
+    response = jsonify({'error': '요청이 많아 잠시 후 다시 시도해주세요.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # JWT 토큰 생성 함수
 def generate_token(user_id, username):
     payload = {
@@ -74,10 +382,10 @@ def token_required(f):
             return jsonify({'error': '토큰이 필요합니다.'}), 401
 
         try:
-            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.query.get(payload['user_id'])
-            if not current_user:
-                return jsonify({'error': '유효하지 않은 사용자입니다.'}), 401
+            # current_user는 id/username만 가진 Principal (DB 행이 필요하면 user_required 사용)
+            current_user = auth_cache.authenticate(token)
+        except InvalidUser:
+            return jsonify({'error': '유효하지 않은 사용자입니다.'}), 401
         except jwt.ExpiredSignatureError:
             return jsonify({'error': '토큰이 만료되었습니다. 다시 로그인해주세요.'}), 401
         except jwt.InvalidTokenError:
@@ -87,6 +395,18 @@ def token_required(f):
 
     return decorated
 
+# 사용자 레코드 전체가 필요한 API용 (프로필 수정, 비밀번호 변경, 회원탈퇴)
+def user_required(f):
+    @token_required
+    @wraps(f)
+    def decorated(principal, *args, **kwargs):
+        current_user = db.session.get(User, principal.id)
+        if not current_user:
+            return jsonify({'error': '유효하지 않은 사용자입니다.'}), 401
+        return f(current_user, *args, **kwargs)
+
+    return decorated
+
 # 선택적 인증 데코레이터 (로그인하지 않아도 접근 가능하지만, 로그인한 경우 사용자 정보 제공)
 def optional_token(f):
     @wraps(f)
@@ -97,8 +417,7 @@ def optional_token(f):
             auth_header = request.headers['Authorization']
             try:
                 token = auth_header.split(" ")[1]
-                payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-                current_user = User.query.get(payload['user_id'])
+                current_user = auth_cache.authenticate(token)
             except:
                 pass  # 토큰이 유효하지 않아도 계속 진행
 
@@ -106,57 +425,30 @@ def optional_token(f):
 
     return decorated
 
-def format_date(upload_time):
-    """업로드 날짜를 YYYY.MM.DD 형식으로 반환"""
-    if upload_time is None:
-        return ""
-
-    if isinstance(upload_time, str):
-        try:
-            upload_time = datetime.fromisoformat(upload_time)
-        except:
-            return ""
-
-    # upload_time에 타임존 정보가 없으면 KST로 설정
-    if upload_time.tzinfo is None:
-        upload_time = KST.localize(upload_time)
-
-    return upload_time.strftime('%Y.%m.%d')
-
 @app.route('/api/videos', methods=['GET'])
+@response_cache.cached(lambda: ['videos'])
 def get_videos():
     try:
         query = request.args.get('q', '').strip()
+        next_cursor = None
 
         if query:
-            videos = Video.query.filter(
-                db.or_(
-                    Video.title.like(f'%{query}%'),
-                    Video.description.like(f'%{query}%'),
-                    Video.channel.like(f'%{query}%')
-                )
-            ).order_by(Video.upload_time.desc()).all()
+            # 관련도 순 검색 (FTS5)
+            limit = parse_limit(request.args.get('limit'), default=MAX_PAGE_SIZE)
+            videos = search_index.search_videos(query, limit=limit)
         else:
-            videos = Video.query.order_by(Video.upload_time.desc()).all()
-
-        video_list = []
-        for video in videos:
-            video_list.append({
-                'id': video.id,
-                'title': video.title,
-                'description': video.description,
-                'channel': video.channel,
-                'thumbnail': f'{BASE_URL}/api/thumbnails/{video.thumbnail}' if video.thumbnail else None,
-                'views': format_views(video.views),
-                'uploadTime': format_time(video.upload_time),
-                'uploadDate': format_date(video.upload_time),
-                'duration': video.duration,
-                'likes': video.likes,
-                'dislikes': video.dislikes,
-                'videoUrl': f'{BASE_URL}/api/videos/{video.id}/stream'
-            })
-
-        return jsonify(video_list)
+            # 최신순 keyset 페이지네이션 (다음 페이지 커서는 X-Next-Cursor 헤더로 전달)
+            videos, next_cursor = keyset_page(
+                db.session.query(*VIDEO_LIST_COLUMNS), Video.upload_time, Video.id,
+                parse_limit(request.args.get('limit')), request.args.get('cursor')
+            )
+
+        response = json_response(video_serializer.serialize(videos))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursor:
+        return jsonify({'error': '잘못된 커서입니다.'}), 400
     except Exception as e:
         print(f"Error fetching videos: {e}")
         return jsonify({'error': str(e)}), 500
@@ -164,10 +456,11 @@ def get_videos():
 @app.route('/api/videos/<int:video_id>', methods=['GET'])
 def get_video(video_id):
     video = Video.query.get_or_404(video_id)
-    video.views = (video.views or 0) + 1
-    db.session.commit()
+    # 조회수는 바로 쓰지 않고 모아서 반영 (응답에는 미반영분까지 포함)
+    view_counter.incr(video_id)
+    views = (video.views or 0) + view_counter.pending(video_id)
 
-    subscriber_count = Subscription.query.filter_by(following_channel=video.channel).count()
+    subscriber_count = get_channel_subscriber_count(video.channel)
 
     return jsonify({
         'id': video.id,
@@ -175,14 +468,19 @@ def get_video(video_id):
         'description': video.description,
         'channel': video.channel,
         'thumbnail': f'{BASE_URL}/api/thumbnails/{video.thumbnail}' if video.thumbnail else None,
-        'views': format_views(video.views),
+        'views': format_views(views),
         'uploadTime': format_time(video.upload_time),
         'uploadDate': format_date(video.upload_time),
         'duration': video.duration,
+        'durationSeconds': video.duration_seconds,
+        'width': video.width,
+        'height': video.height,
         'likes': video.likes,
         'dislikes': video.dislikes,
         'videoUrl': f'{BASE_URL}/api/videos/{video.id}/stream',
-        'subscriberCount': subscriber_count
+        'hlsUrl': hls_url(video),
+        'subscriberCount': subscriber_count,
+        'commentCount': video.comment_count
     })
 
 @app.route('/api/videos/<int:video_id>', methods=['DELETE'])
@@ -195,21 +493,20 @@ def delete_video(current_user, video_id):
         if video.channel != current_user.username:
             return jsonify({'error': '본인이 업로드한 동영상만 삭제할 수 있습니다.'}), 403
 
-        # 파일 삭제
-        if video.filename:
-            video_path = os.path.join(app.config['UPLOAD_FOLDER'], video.filename)
-            if os.path.exists(video_path):
-                os.remove(video_path)
-
-        if video.thumbnail:
-            thumb_path = os.path.join(app.config['THUMBNAIL_FOLDER'], video.thumbnail)
-            if os.path.exists(thumb_path):
-                os.remove(thumb_path)
-
+        # 파일 참조 해제와 HLS 삭제는 레코드 삭제와 함께 커밋되는 작업으로 예약
+        job = job_queue.enqueue('delete_files', {
+            'files': release_media(('UPLOAD_FOLDER', video.filename), ('THUMBNAIL_FOLDER', video.thumbnail)),
+            'hls_video_ids': [video_id],
+        })
         db.session.delete(video)
         db.session.commit()
+        stream_engine.invalidate(video_id)
+        stream_filenames.delete(video_id)
+        invalidate_follower_feeds(current_user.username)
+        bump_video(current_user.username)
+        response_cache.bump(f'comments:{video_id}')
 
-        return jsonify({'message': 'Video deleted successfully'}), 200
+        return jsonify({'message': 'Video deleted successfully', 'jobId': job.id}), 200
 
     except Exception as e:
         print(f"Delete Error: {e}")
@@ -229,17 +526,15 @@ def update_video(current_user, video_id):
         # 새 썸네일 파일이 있는지 확인
         thumbnail_file = request.files.get('thumbnail')
         if thumbnail_file and allowed_file(thumbnail_file.filename, ALLOWED_IMAGES):
-            # 기존 썸네일 삭제
-            if video.thumbnail:
-                old_thumb_path = os.path.join(app.config['THUMBNAIL_FOLDER'], video.thumbnail)
-                if os.path.exists(old_thumb_path):
-                    os.remove(old_thumb_path)
-
-            # 새 썸네일 저장
-            thumbnail_filename = secure_filename(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{thumbnail_file.filename}")
-            thumbnail_path = os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename)
-            thumbnail_file.save(thumbnail_path)
+            # 새 썸네일 저장 (참조가 바로 커밋되므로 기존 파일 정리보다 먼저)
+            thumbnail_filename = save_upload(thumbnail_file)
+
+            # 기존 썸네일(과 변형) 정리
+            files = release_media(('THUMBNAIL_FOLDER', video.thumbnail))
+            if files:
+                job_queue.enqueue('delete_files', {'files': files})
             video.thumbnail = thumbnail_filename
+            job_queue.enqueue('image_variants', {'folder': 'THUMBNAIL_FOLDER', 'filename': thumbnail_filename})
 
         # 텍스트 정보 업데이트
         if 'title' in request.form:
@@ -250,6 +545,7 @@ def update_video(current_user, video_id):
             video.duration = request.form.get('duration')
 
         db.session.commit()
+        bump_video(video.channel)
 
         return jsonify({
             'message': 'Video updated successfully',
@@ -268,38 +564,54 @@ def update_video(current_user, video_id):
 
 @app.route('/api/videos/<int:video_id>/stream', methods=['GET'])
 def stream_video(video_id):
-    video = Video.query.get_or_404(video_id)
-    return send_from_directory(app.config['UPLOAD_FOLDER'], video.filename)
+    if blob_store.remote:
+        # 원격 저장소의 블롭은 서버를 거치지 않고 저장소에서 바로 받도록 presign URL로 보냄
+        filename = stream_filenames.get(video_id)
+        if filename is None:
+            filename = Video.query.get_or_404(video_id).filename
+            stream_filenames.set(video_id, filename)
+        url = blob_store.url(filename)
+        if url is not None:
+            return redirect_response(url, blob_store.storage.url_expires)
+
+    def resolve():
+        # 캐시 미스일 때만 DB 조회
+        video = Video.query.get_or_404(video_id)
+        return blob_store.local_path('UPLOAD_FOLDER', video.filename)
+
+    return stream_engine.serve(video_id, resolve)
+
+@app.route('/api/videos/<int:video_id>/hls/<path:filename>', methods=['GET'])
+def stream_hls(video_id, filename):
+    """HLS 재생목록(.m3u8)과 세그먼트(.ts) 제공"""
+    if filename.endswith('.ts'):
+        mimetype = 'video/mp2t'
+        # 세그먼트는 한번 만들어지면 바뀌지 않음
+        cache_control = 'public, max-age=31536000, immutable'
+    elif filename.endswith('.m3u8'):
+        mimetype = 'application/vnd.apple.mpegurl'
+        cache_control = 'public, max-age=60'
+    else:
+        return jsonify({'error': 'Not found'}), 404
+
+    response = send_from_directory(hls_packager.video_dir(video_id), filename, mimetype=mimetype)
+    response.headers['Cache-Control'] = cache_control
+    return response
 
 @app.route('/api/thumbnails/<filename>', methods=['GET'])
 def get_thumbnail(filename):
-    return send_from_directory(app.config['THUMBNAIL_FOLDER'], filename)
-
-@app.route('/api/videos/upload', methods=['POST'])
-@token_required
-def upload_video(current_user):
-    if 'video' not in request.files:
-        return jsonify({'error': 'No video file'}), 400
-
-    video_file = request.files['video']
-    thumbnail_file = request.files.get('thumbnail')
-
-    if video_file.filename == '':
-        return jsonify({'error': 'No selected file'}), 400
+    return image_pipeline.serve('THUMBNAIL_FOLDER', filename)
 
-    if not allowed_file(video_file.filename, ALLOWED_EXTENSIONS):
-        return jsonify({'error': 'Invalid video format'}), 400
+def create_video(current_user, video_filename, thumbnail_file):
+    """저장소에 넣은 비디오 파일로 Video 레코드 생성 (폼 필드와 썸네일 포함) 후 HLS 패키징 예약
 
+    video_filename의 참조는 이미 커밋된 상태로 넘겨받으며, 레코드 저장이 실패하면
+    비디오/썸네일 파일의 참조를 되돌린 뒤 예외를 다시 발생시킵니다.
+    """
+    thumbnail_filename = None
     try:
-        video_filename = secure_filename(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{video_file.filename}")
-        video_path = os.path.join(app.config['UPLOAD_FOLDER'], video_filename)
-        video_file.save(video_path)
-
-        thumbnail_filename = None
         if thumbnail_file and allowed_file(thumbnail_file.filename, ALLOWED_IMAGES):
-            thumbnail_filename = secure_filename(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{thumbnail_file.filename}")
-            thumbnail_path = os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename)
-            thumbnail_file.save(thumbnail_path)
+            thumbnail_filename = save_upload(thumbnail_file)
 
         title = request.form.get('title', 'Untitled Video')
         description = request.form.get('description', '')
@@ -314,11 +626,50 @@ def upload_video(current_user):
             channel=channel,
             filename=video_filename,
             thumbnail=thumbnail_filename,
-            duration=duration
+            duration=duration,
+            hls_status=HLS_PENDING
         )
 
         db.session.add(new_video)
+        db.session.flush()
+        # 비디오 레코드와 분석/패키징 작업을 함께 커밋 (서버가 재시작되어도 작업이 남음)
+        job_queue.enqueue('probe_video', {'video_id': new_video.id}, dedupe_key=f'probe:{new_video.id}')
+        job_queue.enqueue('package_hls', {'video_id': new_video.id}, dedupe_key=f'hls:{new_video.id}')
+        if thumbnail_filename:
+            job_queue.enqueue('image_variants', {'folder': 'THUMBNAIL_FOLDER', 'filename': thumbnail_filename})
+        else:
+            job_queue.enqueue('poster_frame', {'video_id': new_video.id}, dedupe_key=f'poster:{new_video.id}')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        release_media(('UPLOAD_FOLDER', video_filename), ('THUMBNAIL_FOLDER', thumbnail_filename))
         db.session.commit()
+        raise
+    invalidate_follower_feeds(current_user.username)
+    bump_video(current_user.username)
+
+    return new_video
+
+@app.route('/api/videos/upload', methods=['POST'])
+@token_required
+def upload_video(current_user):
+    if 'video' not in request.files:
+        return jsonify({'error': 'No video file'}), 400
+
+    video_file = request.files['video']
+    thumbnail_file = request.files.get('thumbnail')
+
+    if video_file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+
+    if not allowed_file(video_file.filename, ALLOWED_EXTENSIONS):
+        return jsonify({'error': 'Invalid video format'}), 400
+
+    try:
+        # 받으면서 해시 계산, 같은 내용이 이미 있으면 새로 쓰지 않음
+        video_filename = save_upload(video_file)
+
+        new_video = create_video(current_user, video_filename, thumbnail_file)
 
         return jsonify({
             'message': 'Video uploaded successfully',
@@ -329,97 +680,158 @@ def upload_video(current_user):
         print(f"Upload Error: {e}")
         return jsonify({'error': 'Upload failed', 'details': str(e)}), 500
 
-@app.route('/api/videos/<int:video_id>/like', methods=['POST'])
+# ========== 재개 가능한 업로드 ==========
+# 1. POST /api/uploads                 세션 생성 (filename, size, checksum)
+# 2. PUT  /api/uploads/<id>            Content-Range 헤더와 함께 청크 전송
+# 3. GET  /api/uploads/<id>            현재까지 받은 오프셋 조회 (끊긴 뒤 이어받기)
+# 4. POST /api/uploads/<id>/complete   제목/설명/썸네일과 함께 완료 처리
+
+def get_upload_session(current_user, upload_id):
+    session = UploadSession.query.get_or_404(upload_id)
+    if session.user_id != current_user.id:
+        return None
+    return session
+
+def upload_error_response(e):
+    body = {'error': e.message}
+    if e.offset is not None:
+        body['offset'] = e.offset
+    return jsonify(body), e.status
+
+@app.route('/api/uploads', methods=['POST'])
 @token_required
-def like_video(current_user, video_id):
-    video = Video.query.get_or_404(video_id)
-    liked = VideoLike.query.filter_by(user_id=current_user.id, video_id=video_id).first()
+def create_upload(current_user):
+    data = request.json
+    original_name = data.get('filename', '')
+    total_size = data.get('size')
 
-    if liked:
-        db.session.delete(liked)
-        video.likes = max(0, video.likes - 1)
-        status = False
-    else:
-        # 싫어요가 눌려있으면 제거
-        disliked = VideoDislike.query.filter_by(user_id=current_user.id, video_id=video_id).first()
-        if disliked:
-            db.session.delete(disliked)
-            video.dislikes = max(0, video.dislikes - 1)
+    if not original_name or not allowed_file(original_name, ALLOWED_EXTENSIONS):
+        return jsonify({'error': 'Invalid video format'}), 400
+    if not isinstance(total_size, int) or total_size <= 0:
+        return jsonify({'error': '파일 크기가 올바르지 않습니다.'}), 400
+
+    try:
+        # 오래된 세션은 새 세션을 만들 때 같이 정리
+        resumable_uploads.cleanup_stale()
+
+        video_filename = secure_filename(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{original_name}")
+        # checksum(SHA-256)이 같은 파일이 이미 있으면 데이터를 받지 않고 바로 완료 가능 (offset == size)
+        checksum = (data.get('checksum') or '').lower() or None
+        duplicate = checksum is not None and blob_store.find(checksum, total_size) is not None
+        session = resumable_uploads.create(current_user.id, video_filename, original_name,
+                                           total_size, checksum, complete=duplicate)
+        return jsonify({
+            'uploadId': session.id,
+            'offset': session.received,
+            'size': session.total_size,
+            'chunkSize': app.config['UPLOAD_CHUNK_SIZE']
+        }), 201
+    except Exception as e:
+        print(f"Create Upload Error: {e}")
+        return jsonify({'error': 'Upload failed', 'details': str(e)}), 500
 
-        new_like = VideoLike(user_id=current_user.id, video_id=video_id)
-        db.session.add(new_like)
-        video.likes += 1
-        status = True
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@token_required
+def get_upload(current_user, upload_id):
+    session = get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'error': '본인의 업로드만 조회할 수 있습니다.'}), 403
 
-    db.session.commit()
-    return jsonify({'likes': video.likes, 'dislikes': video.dislikes, 'isLiked': status})
+    return jsonify({
+        'uploadId': session.id,
+        'offset': session.received,
+        'size': session.total_size,
+        'chunkSize': app.config['UPLOAD_CHUNK_SIZE']
+    })
 
-@app.route('/api/videos/<int:video_id>/dislike', methods=['POST'])
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
 @token_required
-def dislike_video(current_user, video_id):
-    video = Video.query.get_or_404(video_id)
-    disliked = VideoDislike.query.filter_by(user_id=current_user.id, video_id=video_id).first()
+def upload_chunk(current_user, upload_id):
+    session = get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'error': '본인의 업로드만 이어서 올릴 수 있습니다.'}), 403
 
-    if disliked:
-        db.session.delete(disliked)
-        video.dislikes = max(0, video.dislikes - 1)
-        status = False
-    else:
-        # 좋아요가 눌려있으면 제거
-        liked = VideoLike.query.filter_by(user_id=current_user.id, video_id=video_id).first()
-        if liked:
-            db.session.delete(liked)
-            video.likes = max(0, video.likes - 1)
+    try:
+        offset = resumable_uploads.write_chunk(session, request.headers.get('Content-Range'), request.stream)
+        return jsonify({'uploadId': session.id, 'offset': offset, 'size': session.total_size})
+    except UploadError as e:
+        return upload_error_response(e)
 
-        new_dislike = VideoDislike(user_id=current_user.id, video_id=video_id)
-        db.session.add(new_dislike)
-        video.dislikes += 1
-        status = True
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@token_required
+def complete_upload(current_user, upload_id):
+    session = get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'error': '본인의 업로드만 완료할 수 있습니다.'}), 403
 
-    db.session.commit()
-    return jsonify({'likes': video.likes, 'dislikes': video.dislikes, 'isDisliked': status})
+    try:
+        ext = session.original_name.rsplit('.', 1)[1]
+        key, digest = resumable_uploads.finalize(session)
+        if key is not None:
+            video_filename = blob_store.adopt(key, ext, digest, session.total_size)
+        else:
+            video_filename = blob_store.reference(digest, session.total_size)
+            if video_filename is None:
+                # 세션을 만든 뒤 같은 내용의 파일이 삭제됨: 처음부터 다시 받기
+                db.session.rollback()
+                resumable_uploads.restart(session)
+                raise UploadError('파일을 다시 업로드해주세요.', status=409, offset=0)
+            # adopt와 같이 참조를 먼저 커밋 (create_video가 실패하면 되돌림)
+            db.session.commit()
+        # 세션은 비디오 레코드와 함께 삭제
+        db.session.delete(session)
+        new_video = create_video(current_user, video_filename, request.files.get('thumbnail'))
 
-def format_views(views):
-    if views is None: return "0"
-    if views >= 1000000:
-        return f"{views/1000000:.1f}M"
-    elif views >= 1000:
-        return f"{views/1000:.0f}K"
-    return str(views)
+        return jsonify({
+            'message': 'Video uploaded successfully',
+            'video_id': new_video.id
+        }), 201
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        print(f"Complete Upload Error: {e}")
+        return jsonify({'error': 'Upload failed', 'details': str(e)}), 500
 
-def format_time(upload_time):
-    if upload_time is None:
-        return "Unknown"
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@token_required
+def cancel_upload(current_user, upload_id):
+    session = get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'error': '본인의 업로드만 취소할 수 있습니다.'}), 403
 
-    # 현재 한국 시간
-    now = datetime.now(KST)
+    resumable_uploads.discard(session)
+    return jsonify({'message': 'Upload cancelled'})
 
-    # upload_time이 문자열인 경우 처리
-    if isinstance(upload_time, str):
-        try:
-            upload_time = datetime.fromisoformat(upload_time)
-        except:
-            return upload_time
-
-    # upload_time에 타임존 정보가 없으면 KST로 설정
-    if upload_time.tzinfo is None:
-        upload_time = KST.localize(upload_time)
-
-    diff = now - upload_time
-    if diff.days > 365:
-        return f"{diff.days // 365}년 전"
-    elif diff.days > 30:
-        return f"{diff.days // 30}개월 전"
-    elif diff.days > 0:
-        return f"{diff.days}일 전"
-    elif diff.seconds > 3600:
-        return f"{diff.seconds // 3600}시간 전"
-    elif diff.seconds > 60:
-        return f"{diff.seconds // 60}분 전"
-    else:
-        return "방금 전"
+@app.route('/api/videos/<int:video_id>/like', methods=['POST'])
+@token_required
+def like_video(current_user, video_id):
+    try:
+        likes, dislikes, status = toggle_reaction(current_user.id, video_id, LIKE)
+    except VideoNotFound:
+        return jsonify({'error': '동영상을 찾을 수 없습니다.'}), 404
+    return jsonify({'likes': likes, 'dislikes': dislikes, 'isLiked': status})
 
+@app.route('/api/videos/<int:video_id>/dislike', methods=['POST'])
+@token_required
+def dislike_video(current_user, video_id):
+    try:
+        likes, dislikes, status = toggle_reaction(current_user.id, video_id, DISLIKE)
+    except VideoNotFound:
+        return jsonify({'error': '동영상을 찾을 수 없습니다.'}), 404
+    return jsonify({'likes': likes, 'dislikes': dislikes, 'isDisliked': status})
+
+# 여러 비디오에 대한 내 반응 한 번에 조회: GET /api/reactions?ids=1,2,3
+# 응답: {"1": "like", "3": "dislike"} (반응이 없는 비디오는 생략)
+@app.route('/api/reactions', methods=['GET'])
+@token_required
+def get_my_reactions(current_user):
+    try:
+        video_ids = [int(v) for v in request.args.get('ids', '').split(',') if v.strip()]
+    except ValueError:
+        return jsonify({'error': '잘못된 비디오 id 입니다.'}), 400
 
+    reactions = user_reactions(current_user.id, video_ids[:MAX_PAGE_SIZE])
+    return jsonify({str(video_id): kind for video_id, kind in reactions.items()})
 
 @app.route('/api/signup', methods=['POST'])
 def signup():
@@ -435,7 +847,7 @@ def signup():
             return jsonify({'error': '이미 존재하는 아이디입니다.'}), 400
 
         # 비밀번호 해싱 처리
-        hashed_password = generate_password_hash(data['password'], method='pbkdf2:sha256')
+        hashed_password = password_hasher.hash(data['password'])
 
         # 해싱된 비밀번호 저장
         new_user = User(username=data['username'], password=hashed_password)
@@ -443,6 +855,8 @@ def signup():
         db.session.commit()
 
         return jsonify({'message': '회원가입 성공'}), 201
+    except HasherBusy:
+        raise
     except Exception as e:
         return jsonify({'error': '회원가입 중 오류가 발생했습니다.'}), 500
 
@@ -457,7 +871,7 @@ def login():
     user = User.query.filter_by(username=data['username']).first()
 
     # 2. 사용자가 존재하고 비밀번호 해시가 일치하는지 확인
-    if user and check_password_hash(user.password, data['password']):
+    if user and password_hasher.verify(user.password, data['password']):
         token = generate_token(user.id, user.username)
         return jsonify({
             'id': user.id,
@@ -492,20 +906,10 @@ def toggle_subscribe(current_user):
     if current_user.username == channel_name:
         return jsonify({'error': '자기 자신은 구독할 수 없습니다.'}), 400
 
-    existing = Subscription.query.filter_by(
-        follower_id=current_user.id,
-        following_channel=channel_name
-    ).first()
-
-    if existing:
-        db.session.delete(existing)
-        status = False
-    else:
-        new_sub = Subscription(follower_id=current_user.id, following_channel=channel_name)
-        db.session.add(new_sub)
-        status = True
-
-    db.session.commit()
+    # 구독 행과 구독자 수를 한 트랜잭션에서 함께 변경 (실제로 바뀐 행 수만큼만 증감)
+    status = toggle_subscription(current_user.id, channel_name)
+    feed_cache.delete(current_user.id)
+    response_cache.bump(f'user:{channel_name}')
     return jsonify({'subscribed': status})
 
 @app.route('/api/subscriptions/<int:user_id>', methods=['GET'])
@@ -522,25 +926,117 @@ def get_subscriptions(current_user, user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def get_channel_subscriber_count(channel_name):
+    """채널의 구독자 수 (users.subscriber_count, 없는 채널은 0)"""
+    count = db.session.query(User.subscriber_count).filter_by(username=channel_name).scalar()
+    return count or 0
+
+# ========== 구독 피드 ==========
+
+def invalidate_follower_feeds(channel_name):
+    """채널에 새 동영상이 올라오거나 삭제되면 구독자들의 피드 캐시 제거"""
+    follower_ids = db.session.query(Subscription.follower_id).filter_by(following_channel=channel_name)
+    feed_cache.delete_many(row[0] for row in follower_ids)
+
+@app.route('/api/feed', methods=['GET'])
+@token_required
+def get_feed(current_user):
+    """구독한 채널들의 최신 동영상 (keyset 페이지네이션, 다음 커서는 X-Next-Cursor)"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+
+        # 가장 많이 요청되는 첫 페이지만 캐시 (다음 페이지는 인덱스로 바로 조회)
+        cached = None if cursor else feed_cache.get(current_user.id)
+        if cached and cached[0] == limit:
+            video_list, next_cursor = cached[1], cached[2]
+        else:
+            query = db.session.query(*VIDEO_LIST_COLUMNS).join(
+                Subscription, Subscription.following_channel == Video.channel
+            ).filter(Subscription.follower_id == current_user.id)
+            videos, next_cursor = keyset_page(query, Video.upload_time, Video.id, limit, cursor)
+            video_list = video_serializer.serialize(videos)
+            if not cursor:
+                feed_cache.set(current_user.id, (limit, video_list, next_cursor))
+
+        response = json_response(video_list)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursor:
+        return jsonify({'error': '잘못된 커서입니다.'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/channels/<channel_name>/subscribers/count', methods=['GET'])
 def get_subscriber_count(channel_name):
-    count = Subscription.query.filter_by(following_channel=channel_name).count()
+    count = get_channel_subscriber_count(channel_name)
     return jsonify({'count': count})
 
+# 여러 채널의 요약 정보 한 번에 조회 (사이드 메뉴/헤더의 구독 목록용)
+# GET /api/channels/summary?names=a,b,c
+@app.route('/api/channels/summary', methods=['GET'])
+def get_channel_summaries():
+    try:
+        names = []
+        for value in request.args.getlist('names'):
+            names.extend(n.strip() for n in value.split(',') if n.strip())
+        names = list(dict.fromkeys(names))[:MAX_PAGE_SIZE]
+        if not names:
+            return jsonify({})
+
+        users = db.session.query(
+            User.username, User.profile_image, User.subscriber_count
+        ).filter(User.username.in_(names)).all()
+
+        video_counts = dict(
+            db.session.query(Video.channel, db.func.count(Video.id))
+            .filter(Video.channel.in_(names))
+            .group_by(Video.channel)
+            .all()
+        )
+
+        return jsonify({
+            u.username: {
+                'username': u.username,
+                'profileImage': f'{BASE_URL}/api/profiles/{u.profile_image}' if u.profile_image else None,
+                'subscriberCount': u.subscriber_count,
+                'videoCount': video_counts.get(u.username, 0)
+            }
+            for u in users
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/videos/<int:video_id>/comments', methods=['GET'])
+@response_cache.cached(lambda video_id: [f'comments:{video_id}'])
 def get_comments(video_id):
+    """최신순 댓글 (keyset 페이지네이션, 다음 커서는 X-Next-Cursor, 전체 댓글 수는 X-Total-Count)
+
+    응답은 response_cache에 'comments:<video_id>' 태그로 캐시되어, 댓글 추가/수정/삭제 전까지
+    첫 페이지는 DB 조회 없이 나갑니다.
+    """
     try:
-        comments = Comment.query.filter_by(video_id=video_id).order_by(Comment.created_at.desc()).all()
-        comment_list = []
-        for c in comments:
-            comment_list.append({
-                'id': c.id,
-                'username': c.username,
-                'content': c.content,
-                'createdAt': format_time(c.created_at),
-                'userId': c.user_id  # 댓글 삭제를 위해 추가
-            })
-        return jsonify(comment_list)
+        query = db.session.query(
+            Comment.id, Comment.username, Comment.content, Comment.created_at, Comment.user_id
+        ).filter(Comment.video_id == video_id)
+        comments, next_cursor = keyset_page(query, Comment.created_at, Comment.id,
+                                            parse_limit(request.args.get('limit')), request.args.get('cursor'))
+        total = db.session.query(Video.comment_count).filter_by(id=video_id).scalar()
+
+        response = json_response([{
+            'id': c.id,
+            'username': c.username,
+            'content': c.content,
+            'createdAt': format_time(c.created_at),
+            'userId': c.user_id  # 댓글 삭제를 위해 추가
+        } for c in comments])
+        response.headers['X-Total-Count'] = str(total or 0)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursor:
+        return jsonify({'error': '잘못된 커서입니다.'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -561,7 +1057,9 @@ def add_comment(current_user, video_id):
             content=content.strip()
         )
         db.session.add(new_comment)
+        adjust_comment_count(video_id, 1)
         db.session.commit()
+        response_cache.bump(f'comments:{video_id}')
         return jsonify({
             'message': 'Comment added',
             'comment': {
@@ -585,7 +1083,9 @@ def delete_comment(current_user, comment_id):
         return jsonify({'error': '본인의 댓글만 삭제할 수 있습니다.'}), 403
 
     db.session.delete(comment)
+    adjust_comment_count(comment.video_id, -1)
     db.session.commit()
+    response_cache.bump(f'comments:{comment.video_id}')
     return jsonify({'message': 'Deleted'})
 
 
@@ -607,6 +1107,7 @@ def update_comment(current_user, comment_id):
 
     comment.content = content.strip()
     db.session.commit()
+    response_cache.bump(f'comments:{comment.video_id}')
 
     return jsonify({
         'message': 'Updated',
@@ -625,48 +1126,54 @@ def search_users():
         query = request.args.get('q', '').strip()
 
         if query:
-            # 아이디에 검색어가 포함된 사용자 검색
-            users = User.query.filter(User.username.like(f'%{query}%')).all()
+            # 아이디에 검색어가 포함된 사용자 검색 (관련도 순)
+            users = search_index.search_users(query)
         else:
             # 검색어가 없으면 전체 사용자 중 최근 가입순(ID 역순)으로 10명만 표시
             users = User.query.order_by(User.id.desc()).limit(10).all()
 
         user_list = []
         for user in users:
-            # 각 사용자의 구독자 수 계산
-            sub_count = Subscription.query.filter_by(following_channel=user.username).count()
             user_list.append({
                 'id': user.id,
                 'username': user.username,
-                'subscriberCount': sub_count
+                'subscriberCount': user.subscriber_count
             })
 
         return jsonify(user_list)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def format_channel_video(v):
+    """채널 페이지용 비디오 요약"""
+    return {
+        'id': v.id,
+        'title': v.title,
+        'thumbnail': f'{BASE_URL}/api/thumbnails/{v.thumbnail}' if v.thumbnail else None,
+        'views': format_views((v.views or 0) + view_counter.pending(v.id)),
+        'uploadTime': format_time(v.upload_time),
+        'uploadDate': format_date(v.upload_time),
+        'duration': v.duration
+    }
+
 # 2. 특정 사용자(채널) 상세 정보 조회
 # 4. get_user_profile 함수 수정 (bannerImage 포함)
 @app.route('/api/users/<username>', methods=['GET'])
+@response_cache.cached(lambda username: [f'user:{username}'], vary_on_auth=True)
 @optional_token
 def get_user_profile(current_user, username):
     try:
         user = User.query.filter_by(username=username).first_or_404()
 
-        videos = Video.query.filter_by(channel=username).order_by(Video.upload_time.desc()).all()
-        video_list = []
-        for v in videos:
-            video_list.append({
-                'id': v.id,
-                'title': v.title,
-                'thumbnail': f'{BASE_URL}/api/thumbnails/{v.thumbnail}' if v.thumbnail else None,
-                'views': format_views(v.views),
-                'uploadTime': format_time(v.upload_time),
-                'uploadDate': format_date(v.upload_time),
-                'duration': v.duration
-            })
+        # 첫 페이지만 포함, 나머지는 /api/users/<username>/videos?cursor= 로 조회
+        videos, next_cursor = keyset_page(
+            Video.query.filter_by(channel=username), Video.upload_time, Video.id,
+            parse_limit(request.args.get('limit'))
+        )
+        video_list = [format_channel_video(v) for v in videos]
+        video_count = Video.query.filter_by(channel=username).count()
 
-        sub_count = Subscription.query.filter_by(following_channel=username).count()
+        sub_count = user.subscriber_count
 
         is_subscribed = False
         if current_user:
@@ -682,14 +1189,33 @@ def get_user_profile(current_user, username):
             'subscriberCount': sub_count,
             'isSubscribed': is_subscribed,
             'videos': video_list,
+            'nextCursor': next_cursor,
             'profileImage': f'{BASE_URL}/api/profiles/{user.profile_image}' if user.profile_image else None,
             'bannerImage': f'{BASE_URL}/api/banners/{user.banner_image}' if user.banner_image else None,
             'bio': user.bio,
-            'videoCount': len(video_list)
+            'videoCount': video_count
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# 3. 채널 동영상 목록 (다음 페이지 조회용)
+@app.route('/api/users/<username>/videos', methods=['GET'])
+def get_user_videos(username):
+    try:
+        videos, next_cursor = keyset_page(
+            Video.query.filter_by(channel=username), Video.upload_time, Video.id,
+            parse_limit(request.args.get('limit')), request.args.get('cursor')
+        )
+
+        response = jsonify([format_channel_video(v) for v in videos])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursor:
+        return jsonify({'error': '잘못된 커서입니다.'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 
 
 # 프로필 폴더 설정 추가 (맨 위 설정 부분에)
@@ -705,55 +1231,56 @@ os.makedirs(BANNER_FOLDER, exist_ok=True)
 # 프로필 이미지 제공 엔드포인트 (get_thumbnail 아래에)
 @app.route('/api/profiles/<filename>', methods=['GET'])
 def get_profile(filename):
-    return send_from_directory(app.config['PROFILE_FOLDER'], filename)
+    return image_pipeline.serve('PROFILE_FOLDER', filename)
 
 # 2. 배너 이미지 제공 엔드포인트 (get_profile 함수 아래에 추가)
 @app.route('/api/banners/<filename>', methods=['GET'])
 def get_banner(filename):
-    return send_from_directory(app.config['BANNER_FOLDER'], filename)
+    return image_pipeline.serve('BANNER_FOLDER', filename)
 
 
 # 3. 프로필 업데이트 엔드포인트 수정 (기존 update_profile 함수를 아래 코드로 교체)
 @app.route('/api/profile/update', methods=['PUT'])
-@token_required
+@user_required
 def update_profile(current_user):
     try:
         profile_file = request.files.get('profileImage')
         banner_file = request.files.get('bannerImage')
 
-        # 프로필 이미지 처리
+        # 새 이미지 저장 (참조가 바로 커밋되므로 기존 파일 정리보다 먼저)
+        profile_filename = banner_filename = None
         if profile_file and allowed_file(profile_file.filename, ALLOWED_IMAGES):
-            # 기존 프로필 이미지 삭제
-            if current_user.profile_image:
-                old_profile_path = os.path.join(app.config['PROFILE_FOLDER'], current_user.profile_image)
-                if os.path.exists(old_profile_path):
-                    os.remove(old_profile_path)
-
-            # 새 프로필 이미지 저장
-            profile_filename = secure_filename(f"profile_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{profile_file.filename}")
-            profile_path = os.path.join(app.config['PROFILE_FOLDER'], profile_filename)
-            profile_file.save(profile_path)
+            profile_filename = save_upload(profile_file)
+        if banner_file and allowed_file(banner_file.filename, ALLOWED_IMAGES):
+            banner_filename = save_upload(banner_file)
+
+        # 프로필 이미지 처리
+        if profile_filename:
+            # 기존 프로필 이미지(와 변형) 정리
+            files = release_media(('PROFILE_FOLDER', current_user.profile_image))
+            if files:
+                job_queue.enqueue('delete_files', {'files': files})
+
             current_user.profile_image = profile_filename
+            job_queue.enqueue('image_variants', {'folder': 'PROFILE_FOLDER', 'filename': profile_filename})
 
         # 배너 이미지 처리
-        if banner_file and allowed_file(banner_file.filename, ALLOWED_IMAGES):
-            # 기존 배너 이미지 삭제
-            if current_user.banner_image:
-                old_banner_path = os.path.join(app.config['BANNER_FOLDER'], current_user.banner_image)
-                if os.path.exists(old_banner_path):
-                    os.remove(old_banner_path)
-
-            # 새 배너 이미지 저장
-            banner_filename = secure_filename(f"banner_{current_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{banner_file.filename}")
-            banner_path = os.path.join(app.config['BANNER_FOLDER'], banner_filename)
-            banner_file.save(banner_path)
+        if banner_filename:
+            # 기존 배너 이미지(와 변형) 정리
+            files = release_media(('BANNER_FOLDER', current_user.banner_image))
+            if files:
+                job_queue.enqueue('delete_files', {'files': files})
+
             current_user.banner_image = banner_filename
+            job_queue.enqueue('image_variants', {'folder': 'BANNER_FOLDER', 'filename': banner_filename})
 
         # bio 업데이트
         if 'bio' in request.form:
             current_user.bio = request.form.get('bio')
 
         db.session.commit()
+        response_cache.bump(f'user:{current_user.username}')
+        auth_cache.invalidate(current_user.id)
 
         return jsonify({
             'message': 'Profile updated successfully',
@@ -768,7 +1295,7 @@ def update_profile(current_user):
 
 # 비밀번호 변경
 @app.route('/api/profile/change-password', methods=['PUT'])
-@token_required
+@user_required
 def change_password(current_user):
     data = request.json
 
@@ -779,19 +1306,20 @@ def change_password(current_user):
         return jsonify({'error': '현재 비밀번호와 새 비밀번호를 입력해주세요.'}), 400
 
     # 현재 비밀번호 확인
-    if not check_password_hash(current_user.password, current_password):
+    if not password_hasher.verify(current_user.password, current_password):
         return jsonify({'error': '현재 비밀번호가 일치하지 않습니다.'}), 401
 
     # 새 비밀번호 해싱 및 저장
-    current_user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+    current_user.password = password_hasher.hash(new_password)
     db.session.commit()
+    auth_cache.invalidate(current_user.id)
 
     return jsonify({'message': '비밀번호가 변경되었습니다.'}), 200
 
 
 # 회원 탈퇴
 @app.route('/api/profile/delete-account', methods=['DELETE'])
-@token_required
+@user_required
 def delete_account(current_user):
     data = request.json
     password = data.get('password')
@@ -800,52 +1328,401 @@ def delete_account(current_user):
         return jsonify({'error': '비밀번호를 입력해주세요.'}), 400
 
     # 비밀번호 확인
-    if not check_password_hash(current_user.password, password):
+    if not password_hasher.verify(current_user.password, password):
         return jsonify({'error': '비밀번호가 일치하지 않습니다.'}), 401
 
     try:
-        # 사용자가 업로드한 모든 비디오 삭제
-        videos = Video.query.filter_by(channel=current_user.username).all()
+        user_id, username = current_user.id, current_user.username
+
+        # 사용자가 업로드한 모든 파일의 참조 해제 (파일 삭제는 작업 큐에서)
+        videos = db.session.query(Video.id, Video.filename, Video.thumbnail).filter_by(channel=username).all()
+        pairs = [('PROFILE_FOLDER', current_user.profile_image), ('BANNER_FOLDER', current_user.banner_image)]
         for video in videos:
-            # 비디오 파일 삭제
-            if video.filename:
-                video_path = os.path.join(app.config['UPLOAD_FOLDER'], video.filename)
-                if os.path.exists(video_path):
-                    os.remove(video_path)
-
-            # 썸네일 삭제
-            if video.thumbnail:
-                thumb_path = os.path.join(app.config['THUMBNAIL_FOLDER'], video.thumbnail)
-                if os.path.exists(thumb_path):
-                    os.remove(thumb_path)
-
-            db.session.delete(video)
-
-        # 프로필 이미지 삭제
-        if current_user.profile_image:
-            profile_path = os.path.join(app.config['PROFILE_FOLDER'], current_user.profile_image)
-            if os.path.exists(profile_path):
-                os.remove(profile_path)
-
-                        # 배너 이미지 삭제
-        if current_user.banner_image:
-            banner_path = os.path.join(app.config['BANNER_FOLDER'], current_user.banner_image)
-            if os.path.exists(banner_path):
-                os.remove(banner_path)
+            pairs += [('UPLOAD_FOLDER', video.filename), ('THUMBNAIL_FOLDER', video.thumbnail)]
+        files = release_media(*pairs)
+        job = job_queue.enqueue('delete_files', {'files': files, 'hls_video_ids': [v.id for v in videos]})
+
+        # 구독하던 채널들의 구독자 수, 댓글을 단 비디오들의 댓글 수 감소 (행은 cascade로 삭제)
+        release_subscriptions(user_id)
+        commented = release_comments(user_id)
 
         # 사용자 삭제 (cascade로 연관 데이터 자동 삭제)
+        followed = [row[0] for row in db.session.query(Subscription.following_channel).filter_by(follower_id=user_id)]
         db.session.delete(current_user)
+        db.session.flush()
+
+        # 채널의 비디오와 그 댓글/반응은 비디오 수와 관계없이 문장 몇 개로 일괄 삭제
+        channel_videos = db.select(Video.id).where(Video.channel == username)
+        for model in (Comment, VideoLike, VideoDislike):
+            db.session.query(model).filter(model.video_id.in_(channel_videos)).delete(synchronize_session=False)
+        db.session.query(Video).filter(Video.channel == username).delete(synchronize_session=False)
         db.session.commit()
 
-        return jsonify({'message': '회원탈퇴가 완료되었습니다.'}), 200
+        for video in videos:
+            stream_engine.invalidate(video.id)
+            stream_filenames.delete(video.id)
+        feed_cache.delete(user_id)
+        auth_cache.forget(user_id)
+        invalidate_follower_feeds(username)
+        # 목록/채널 페이지와, 구독자 수가 줄어든 채널 페이지 캐시 무효화
+        bump_video(username)
+        response_cache.bump(*(f'user:{channel}' for channel in followed))
+        response_cache.bump(*(f'comments:{video_id}' for video_id in commented))
+
+        return jsonify({'message': '회원탈퇴가 완료되었습니다.', 'jobId': job.id}), 200
 
     except Exception as e:
         db.session.rollback()
         print(f"Delete Account Error: {e}")
         return jsonify({'error': '회원탈퇴 중 오류가 발생했습니다.'}), 500
 
+# 백그라운드 작업 상태 조회 (id는 추측할 수 없는 임의 값이라 탈퇴 후에도 조회 가능하도록 인증 없이)
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'maxAttempts': job.max_attempts,
+        'error': job.last_error,
+        'createdAt': job.created_at.isoformat() if job.created_at else None,
+        'updatedAt': job.updated_at.isoformat() if job.updated_at else None,
+    })
+
+
+
+
+# 기존 비디오 HLS 일괄 패키징: flask --app app package-videos
+@app.cli.command('package-videos')
+def package_videos():
+    """HLS 패키징이 안 된 비디오를 모두 패키징"""
+    videos = Video.query.filter(db.or_(Video.hls_status.is_(None), Video.hls_status != HLS_READY)).all()
+    for video in videos:
+        with blob_store.local_file('UPLOAD_FOLDER', video.filename) as src_path:
+            if src_path is None:
+                continue
+            print(f"Packaging video {video.id}: {video.filename}")
+            hls_packager.submit(video.id, src_path).result()
+
+# 기존 비디오 메타데이터 분석: flask --app app probe-videos [--all] [--workers 8]
+@app.cli.command('probe-videos')
+@click.option('--all', 'reprobe', is_flag=True, help='이미 분석한 비디오도 다시 분석')
+@click.option('--workers', type=int, default=None, help='동시에 분석할 파일 수 (기본 PROBE_WORKERS)')
+def probe_videos(reprobe, workers):
+    """분석 전인 비디오 파일을 병렬로 분석해서 기록
+
+    파일 분석(ffprobe, 박스 읽기)은 스레드 풀에서 동시에 하고, 기록은 이 스레드에서
+    PROBE_BATCH_SIZE 개씩 모아 커밋하므로 쓰기 잠금을 오래 잡지 않습니다.
+    """
+    query = db.session.query(Video.id, Video.filename)
+    if not reprobe:
+        query = query.filter(Video.probed_at.is_(None))
+    targets = query.all()
+
+    probed = failed = pending = 0
+    channels = set()
+    with ThreadPoolExecutor(workers or app.config['PROBE_WORKERS'], thread_name_prefix='probe') as executor:
+        futures = {executor.submit(probe_video_file, filename): video_id for video_id, filename in targets}
+        for future in as_completed(futures):
+            video_id = futures[future]
+            try:
+                info = future.result()
+            except Exception as e:
+                print(f"Probe Error (video {video_id}): {e}")
+                failed += 1
+                continue
+            video = db.session.get(Video, video_id)
+            if video is None:
+                continue
+            media_prober.apply(video, info)
+            channels.add(video.channel)
+            probed += 1
+            pending += 1
+            if pending >= app.config['PROBE_BATCH_SIZE']:
+                db.session.commit()
+                pending = 0
+    db.session.commit()
 
+    for channel in channels:
+        invalidate_follower_feeds(channel)
+        bump_video(channel)
+    print(f"Probed {probed} video(s), {failed} failed")
+
+# 기존 비디오 faststart 변환: flask --app app faststart-videos [--workers 4]
+@app.cli.command('faststart-videos')
+@click.option('--workers', type=int, default=None, help='동시에 변환할 파일 수 (기본 FASTSTART_WORKERS)')
+def faststart_videos(workers):
+    """moov가 뒤에 있는(또는 아직 분석하지 않은) MP4/MOV를 병렬로 faststart 변환하고 파일 교체
+
+    변환은 스레드 풀에서 동시에 하고, 파일 교체는 이 스레드에서 파일마다 커밋합니다.
+    """
+    filenames = [filename for (filename,) in db.session.query(Video.filename).filter(
+        db.or_(Video.moov_at_start.is_(False), Video.probed_at.is_(None))).distinct()
+        if faststart_remuxer.supports(filename)]
+
+    swapped = unchanged = failed = 0
+    with ThreadPoolExecutor(workers or app.config['FASTSTART_WORKERS'], thread_name_prefix='faststart') as executor:
+        futures = {executor.submit(remux_video_file, filename): filename for filename in filenames}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"Faststart Error ({filename}): {e}")
+                failed += 1
+                continue
+            if path is None:
+                unchanged += 1
+                continue
+            try:
+                swapped += swap_video_file(filename, path)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Faststart Error ({filename}): {e}")
+                failed += 1
+    print(f"Remuxed {swapped} video(s), {unchanged} already faststart, {failed} failed")
+
+# 오래된 업로드 세션 정리: flask --app app cleanup-uploads
+@app.cli.command('cleanup-uploads')
+def cleanup_uploads():
+    """진행이 멈춘 재개 업로드 세션과 받던 파트 삭제"""
+    removed = resumable_uploads.cleanup_stale()
+    print(f"Removed {removed} stale upload session(s)")
+
+# 기존 이미지 변형/대표 이미지 생성: flask --app app image-variants
+@app.cli.command('image-variants')
+def image_variants():
+    """기존 썸네일/프로필/배너의 변형을 만들고, 썸네일이 없는 비디오의 대표 이미지 추출 예약"""
+    images = [('THUMBNAIL_FOLDER', name) for (name,) in db.session.query(Video.thumbnail).filter(Video.thumbnail.isnot(None))]
+    images += [('PROFILE_FOLDER', name) for (name,) in db.session.query(User.profile_image).filter(User.profile_image.isnot(None))]
+    images += [('BANNER_FOLDER', name) for (name,) in db.session.query(User.banner_image).filter(User.banner_image.isnot(None))]
+    created = 0
+    for folder, filename in images:
+        try:
+            created += image_pipeline.generate(folder, filename)
+        except Exception as e:
+            print(f"Variant Error ({filename}): {e}")
 
+    missing = [video_id for (video_id,) in db.session.query(Video.id).filter(Video.thumbnail.is_(None))]
+    for video_id in missing:
+        job_queue.enqueue('poster_frame', {'video_id': video_id}, dedupe_key=f'poster:{video_id}')
+    db.session.commit()
+    print(f"Created {created} variant(s) for {len(images)} image(s), queued {len(missing)} poster frame(s)")
+
+# 참조가 없는 블롭 정리: flask --app app gc-blobs [--orphans]
+@app.cli.command('gc-blobs')
+@click.option('--orphans', is_flag=True, help='blobs 행이 없는 파일과 남은 임시 파일도 삭제 (저장소 전체를 훑음)')
+def gc_blobs(orphans):
+    """참조가 없어진 지 BLOB_GC_GRACE 초가 지난 블롭과 그 이미지 변형 삭제"""
+    removed = 0
+    while True:
+        names = collect_blobs_job()
+        if not names:
+            break
+        removed += len(names)
+    print(f"Removed {removed} unreferenced blob(s)")
+    if orphans:
+        print(f"Removed {blob_store.collect_orphans()} orphaned file(s)")
+
+# 블롭 참조 수 재계산: flask --app app reconcile-blobs
+@app.cli.command('reconcile-blobs')
+def reconcile_blobs():
+    """videos/users 컬럼 기준으로 blobs.refcount 보정 (0이 된 블롭은 gc-blobs가 삭제)"""
+    drifted = blob_store.reconcile([column for _, column in MEDIA_COLUMNS])
+    print(f"Fixed reference counts for {drifted} blob(s)")
+
+# 예전 파일을 블롭 저장소로 이전: flask --app app migrate-blobs
+@app.cli.command('migrate-blobs')
+def migrate_blobs():
+    """'<시각>_<파일명>' 형식으로 저장된 업로드 파일을 해시 기준 블롭으로 옮기고 컬럼 값 변경
+
+    파일마다 커밋하므로 중간에 멈춰도 다시 실행하면 남은 파일부터 이어서 옮깁니다.
+    예전 파일은 커밋 후에 지우므로 실행 중에도 기존 URL이 계속 동작합니다.
+    """
+    moved = missing = 0
+    for folder, column in MEDIA_COLUMNS:
+        model = column.class_
+        legacy = [name for (name,) in db.session.query(column).filter(column.isnot(None)).distinct()
+                  if not blob_store.is_blob(name)]
+        for old in legacy:
+            path = blob_store.local_path(folder, old)
+            if '.' not in old or not os.path.isfile(path):
+                print(f"Missing file ({folder}): {old}")
+                missing += 1
+                continue
+
+            # 예전 파일은 커밋할 때까지 남겨 둠 (같은 파일시스템이면 하드 링크라 복사하지 않음)
+            tmp = os.path.join(app.config['BLOB_TMP_FOLDER'], f'migrate_{os.getpid()}')
+            try:
+                os.link(path, tmp)
+            except OSError:
+                shutil.copyfile(path, tmp)
+            name = blob_store.put_file(tmp, old.rsplit('.', 1)[1])
+            rows = db.session.query(model).filter(column == old).update({column: name}, synchronize_session=False)
+            for _ in range(rows - 1):
+                blob_store.reference(name.split('.', 1)[0])
+            db.session.commit()
+
+            os.remove(path)
+            if folder in app.config['IMAGE_WIDTHS']:
+                image_pipeline.delete_variants(folder, old)
+                try:
+                    image_pipeline.generate(folder, name)
+                except Exception as e:
+                    print(f"Variant Error ({name}): {e}")
+            moved += 1
+    print(f"Moved {moved} file(s) into the blob store, {missing} missing")
+
+# 로컬 블롭/이미지 변형을 원격 저장소로 복사: STORAGE_BACKEND=s3 flask --app app sync-storage
+@app.cli.command('sync-storage')
+def sync_storage():
+    """로컬 저장소(BLOB_FOLDER, IMAGE_VARIANTS_FOLDER)의 블롭과 변형을 설정된 원격 저장소로 복사
+
+    이미 있는 객체는 건너뛰므로 중간에 멈춰도 다시 실행하면 이어서 복사합니다.
+    로컬 파일은 지우지 않으므로 확인 후 직접 정리합니다.
+    """
+    if not blob_store.remote:
+        print("STORAGE_BACKEND가 원격 저장소가 아닙니다.")
+        return
+    copied = skipped = 0
+    for local_root, storage in ((app.config['BLOB_FOLDER'], blob_store.storage),
+                                (app.config['IMAGE_VARIANTS_FOLDER'], image_pipeline.storage)):
+        source = LocalStorage(local_root)
+        for key, _ in source.list():
+            if key.startswith(('tmp/', 'uploads/')):
+                continue
+            if storage.exists(key):
+                skipped += 1
+                continue
+            storage.put_file(key, source.path(key), content_type=mimetypes.guess_type(key)[0],
+                             cache_control=BLOB_CACHE_CONTROL)
+            copied += 1
+    print(f"Copied {copied} object(s), {skipped} already present")
+
+# 백그라운드 작업 워커: flask --app app jobs-worker [--burst]
+@app.cli.command('jobs-worker')
+@click.option('--burst', is_flag=True, help='대기 중인 작업을 모두 처리하면 종료')
+def jobs_worker(burst):
+    """jobs 테이블의 작업(파일 삭제, HLS 패키징)을 처리"""
+    processed = job_queue.work(burst=burst)
+    print(f"Processed {processed} job(s)")
+
+# 오래된 완료 작업 삭제: flask --app app prune-jobs [--days 7]
+@app.cli.command('prune-jobs')
+@click.option('--days', type=int, default=None, help='이 기간(일)이 지난 done/failed 작업 삭제 (기본: JOB_RETENTION_DAYS)')
+def prune_jobs(days):
+    """끝난 지 오래된 작업을 jobs 테이블에서 삭제 (jobs-worker도 한가할 때 주기적으로 실행)"""
+    removed = job_queue.prune(days)
+    print(f"Removed {removed} finished job(s)")
+
+# 검색 색인 생성 및 기존 데이터 색인: flask --app app search-index
+@app.cli.command('search-index')
+def build_search_index():
+    """FTS5 검색 색인 테이블/트리거를 만들고 기존 비디오/사용자를 다시 색인"""
+    search_index.create()
+    print(f"Indexed {Video.query.count()} videos, {User.query.count()} users")
+
+# 구독자 수 재계산: flask --app app reconcile-subscribers
+@app.cli.command('reconcile-subscribers')
+def reconcile_subscribers():
+    """subscriptions 테이블 기준으로 users.subscriber_count 보정"""
+    drifted = reconcile_subscriber_counts()
+    print(f"Fixed subscriber counts for {drifted} channel(s)")
+
+# 댓글 수 재계산: flask --app app reconcile-comments
+@app.cli.command('reconcile-comments')
+def reconcile_comments():
+    """comments 테이블 기준으로 videos.comment_count 보정"""
+    drifted = reconcile_comment_counts()
+    print(f"Fixed comment counts for {drifted} video(s)")
+# 좋아요/싫어요 수 재계산: flask --app app reconcile-reactions
+@app.cli.command('reconcile-reactions')
+def reconcile_reactions():
+    """video_likes/video_dislikes 테이블 기준으로 videos.likes/dislikes 보정"""
+    drifted = reconcile_reaction_counts()
+    print(f"Fixed reaction counts for {drifted} video(s)")
+
+# 기존 DB에 모델에 선언된 인덱스 중 없는 것만 생성: flask --app app create-indexes
+@app.cli.command('create-indexes')
+def create_indexes():
+    """database.py에 선언된 인덱스를 기존 테이블에 추가 (이미 있으면 건너뜀)"""
+    created = 0
+    with db.engine.begin() as conn:
+        existing = {table: {ix['name'] for ix in db.inspect(conn).get_indexes(table)}
+                    for table in db.inspect(conn).get_table_names()}
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing.get(table.name, set()):
+                    index.create(conn)
+                    print(f"Created {index.name}")
+                    created += 1
+    print(f"Created {created} index(es)")
+
+
+
+# 목록 직렬화 CPU 측정: flask --app app bench-serializer --count 1000
+@app.cli.command('bench-serializer')
+@click.option('--count', default=1000, help='직렬화할 비디오 수')
+@click.option('--repeat', default=20, help='반복 횟수')
+def bench_serializer(count, repeat):
+    """ORM 객체를 행마다 포맷하던 방식과 VideoListSerializer의 1회 직렬화 시간 비교 (DB 미사용)"""
+    import json
+    import time
+    from collections import namedtuple
+
+    Row = namedtuple('Row', [c.key for c in VIDEO_LIST_COLUMNS])
+    base = datetime(2024, 1, 1)
+    rows = [
+        Row(i, f'title {i}', f'description {i}' * 5, f'channel{i % 50}', f'thumb_{i}.jpg',
+            i * 37, base + timedelta(minutes=i * 13), '10:00', i % 100, i % 7, HLS_READY)
+        for i in range(count)
+    ]
+    videos = [Video(**row._asdict()) for row in rows]
+
+    def legacy():
+        # 이전 방식: 행마다 datetime.now/localize/f-string 계산 + 표준 json
+        data = [{
+            'id': v.id,
+            'title': v.title,
+            'description': v.description,
+            'channel': v.channel,
+            'thumbnail': f'{BASE_URL}/api/thumbnails/{v.thumbnail}' if v.thumbnail else None,
+            'views': format_views((v.views or 0) + view_counter.pending(v.id)),
+            'uploadTime': format_time(v.upload_time),
+            'uploadDate': format_date(v.upload_time),
+            'duration': v.duration,
+            'likes': v.likes,
+            'dislikes': v.dislikes,
+            'videoUrl': f'{BASE_URL}/api/videos/{v.id}/stream',
+            'hlsUrl': hls_url(v)
+        } for v in videos]
+        return json.dumps(data, sort_keys=True)
+
+    def current():
+        return json_response(serializer.serialize(rows)).get_data()
+
+    serializer = VideoListSerializer(BASE_URL, view_counter.pending)
+    with app.test_request_context():
+        start = time.perf_counter()
+        current()
+        cold = time.perf_counter() - start
+
+        results = {}
+        for name, fn in (('legacy', legacy), ('serializer', current)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            results[name] = (time.perf_counter() - start) / repeat
+
+    print(f"{count} videos, mean of {repeat} runs (ms per response)")
+    print(f"  legacy (per-row formatting):      {results['legacy'] * 1000:.2f}")
+    print(f"  serializer (cold cache):           {cold * 1000:.2f}")
+    print(f"  serializer (warm cache):           {results['serializer'] * 1000:.2f}")
+    print(f"  speedup: {results['legacy'] / results['serializer']:.1f}x")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,301 @@
+"""ASGI 진입점
+
+같은 Flask 앱(라우트, 인증, 캐시)을 ASGI 서버에서 실행합니다.
+
+    cd serverapi && uvicorn asgi:application --host 0.0.0.0 --port 8000
+
+- 요청 본문은 이벤트 루프가 끝까지 받은 뒤에 뷰를 실행하므로 느린 업로드가 스레드를 잡지 않습니다.
+  (ASGI_BODY_SPOOL_SIZE를 넘는 본문은 임시 파일에 저장)
+- 뷰는 스레드 풀에서 실행하고, 조회(GET/HEAD)와 변경 요청은 서로 다른 풀을 사용해서
+  단일 writer 연결을 기다리는 쓰기 요청이 많아도 조회 API가 밀리지 않습니다.
+- /stream, /thumbnails, /profiles, /banners, HLS 세그먼트처럼 파일을 돌려주는 응답은
+  뷰가 헤더(레인지, ETag 등)만 정하고, 본문은 이벤트 루프가 pread로 읽어 보내므로
+  시청자 수만큼 스레드가 필요하지 않습니다. 느린 클라이언트는 send()에서 대기하고
+  연결이 끊기면 바로 전송을 멈춥니다.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.wsgi import FileWrapper, _RangeWrapper
+
+from app import app
+from streaming import CHUNK_SIZE
+
+# 뷰 스레드에서 한 번에 모아 오는 응답 크기 (작은 JSON 응답은 스레드 왕복 한 번으로 끝남)
+PREFETCH_SIZE = 64 * 1024
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class AsyncFileWrapper(FileWrapper):
+    """wsgi.file_wrapper: 이 객체로 감싼 응답은 이벤트 루프에서 직접 전송"""
+
+
+def build_environ(scope, body, length):
+    """ASGI scope를 WSGI environ으로 변환 (body: 끝까지 받은 본문, length: 본문 크기)"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1] if server[1] is not None else 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'wsgi.file_wrapper': AsyncFileWrapper,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            key = 'CONTENT_TYPE'
+        elif name == 'CONTENT_LENGTH':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    # 본문을 이미 다 받았으므로 chunked 요청도 실제 크기로 지정
+    environ['CONTENT_LENGTH'] = str(length)
+    return environ
+
+
+class AsgiAdapter:
+    """Flask(WSGI) 앱을 ASGI 애플리케이션으로 실행하는 어댑터"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.read_pool = None
+        self.write_pool = None
+        self.io_pool = None
+        self.spool_size = 1024 * 1024
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # 조회/변경 뷰를 실행하는 스레드 수와 파일 읽기 스레드 수
+        app.config.setdefault('ASGI_READ_THREADS', 32)
+        app.config.setdefault('ASGI_WRITE_THREADS', 8)
+        app.config.setdefault('ASGI_IO_THREADS', 8)
+        app.config.setdefault('ASGI_BODY_SPOOL_SIZE', 1024 * 1024)
+
+        self.app = app
+        self.read_pool = ThreadPoolExecutor(app.config['ASGI_READ_THREADS'], thread_name_prefix='asgi-read')
+        self.write_pool = ThreadPoolExecutor(app.config['ASGI_WRITE_THREADS'], thread_name_prefix='asgi-write')
+        self.io_pool = ThreadPoolExecutor(app.config['ASGI_IO_THREADS'], thread_name_prefix='asgi-io')
+        self.spool_size = app.config['ASGI_BODY_SPOOL_SIZE']
+        app.extensions['asgi'] = self
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        elif scope['type'] == 'websocket':
+            await send({'type': 'websocket.close', 'code': 1000})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        for pool in (self.read_pool, self.write_pool, self.io_pool):
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ========== 요청 ==========
+
+    async def _read_body(self, receive):
+        """요청 본문을 끝까지 받아 (파일 객체, 크기) 반환 (중간에 연결이 끊기면 (None, 0))"""
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None, 0
+            chunk = message.get('body', b'')
+            if chunk:
+                body.write(chunk)
+            if not message.get('more_body', False):
+                break
+        length = body.tell()
+        body.seek(0)
+        return body, length
+
+    async def _http(self, scope, receive, send):
+        body, length = await self._read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        pool = self.read_pool if scope['method'] in READ_METHODS else self.write_pool
+        disconnected = asyncio.Event()
+        watcher = asyncio.create_task(self._watch_disconnect(receive, disconnected))
+        try:
+            environ = build_environ(scope, body, length)
+            try:
+                status, headers, prefix, iterable = await loop.run_in_executor(pool, self._call_app, environ)
+            except Exception:
+                self.app.logger.exception('ASGI request failed')
+                await self._send_error(send)
+                return
+
+            await send({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            })
+            if iterable is not None and self._file_wrapper(iterable) is not None:
+                length = next((value for name, value in headers if name.lower() == 'content-length'), None)
+                await self._send_file(iterable, length, send, disconnected)
+            else:
+                await self._send_iterable(prefix, iterable, pool, send, disconnected)
+        finally:
+            watcher.cancel()
+            body.close()
+
+    @staticmethod
+    async def _watch_disconnect(receive, disconnected):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+                return
+
+    def _call_app(self, environ):
+        """(스레드 풀에서) Flask 앱 실행 후 상태/헤더와 응답 앞부분 반환
+
+        파일 응답이 아니면 PREFETCH_SIZE까지 미리 읽어 둡니다. 다 읽었으면 iterable은 None.
+        """
+        started = {}
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started['status'] = status
+            started['headers'] = headers
+            return written.append
+
+        iterable = self.app(environ, start_response)
+        if self._file_wrapper(iterable) is not None:
+            return started['status'], started['headers'], written, iterable
+
+        prefix = written
+        size = sum(len(chunk) for chunk in prefix)
+        iterator = iter(iterable)
+        try:
+            while size < PREFETCH_SIZE:
+                chunk = next(iterator, None)
+                if chunk is None:
+                    self._close(iterable)
+                    return started['status'], started['headers'], prefix, None
+                prefix.append(chunk)
+                size += len(chunk)
+        except Exception:
+            self._close(iterable)
+            raise
+        return started['status'], started['headers'], prefix, _Remaining(iterable, iterator)
+
+    # ========== 응답 ==========
+
+    @staticmethod
+    def _file_wrapper(iterable):
+        if isinstance(iterable, AsyncFileWrapper):
+            return iterable
+        # send_file의 레인지 응답은 werkzeug가 file_wrapper를 한 번 더 감쌈
+        if isinstance(iterable, _RangeWrapper) and isinstance(iterable.iterable, AsyncFileWrapper):
+            return iterable.iterable
+        return None
+
+    async def _send_file(self, iterable, length, send, disconnected):
+        """파일 응답 본문을 이벤트 루프에서 CHUNK_SIZE씩 전송"""
+        wrapper = self._file_wrapper(iterable)
+        if isinstance(iterable, _RangeWrapper):
+            offset, remaining = iterable.start_byte, iterable.byte_range
+        else:
+            offset, remaining = wrapper.tell() or 0, int(length) if length is not None else None
+
+        loop = asyncio.get_running_loop()
+        try:
+            fd = wrapper.file.fileno()
+            while remaining is None or remaining > 0:
+                if disconnected.is_set():
+                    return
+                size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                data = await loop.run_in_executor(self.io_pool, os.pread, fd, size, offset)
+                if not data:
+                    break
+                offset += len(data)
+                if remaining is not None:
+                    remaining -= len(data)
+                await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+        finally:
+            wrapper.close()
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def _send_iterable(self, prefix, remaining, pool, send, disconnected):
+        """일반 응답: 미리 읽은 부분을 보내고, 남은 청크(스트리밍 응답)는 스레드 풀에서 하나씩 읽음"""
+        body = b''.join(prefix)
+        if remaining is None:
+            await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            if body:
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+            while not disconnected.is_set():
+                chunk = await loop.run_in_executor(pool, next, remaining.iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            await loop.run_in_executor(pool, self._close, remaining.iterable)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    @staticmethod
+    async def _send_error(send):
+        await send({
+            'type': 'http.response.start',
+            'status': 500,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"error": "Internal Server Error"}'})
+
+    @staticmethod
+    def _close(iterable):
+        close = getattr(iterable, 'close', None)
+        if close is not None:
+            close()
+
+
+class _Remaining:
+    """아직 다 읽지 않은 WSGI 응답 (close()는 원래 iterable에 호출해야 함)"""
+
+    __slots__ = ('iterable', 'iterator')
+
+    def __init__(self, iterable, iterator):
+        self.iterable = iterable
+        self.iterator = iterator
+
+
+application = AsgiAdapter(app)
@@ -0,0 +1,93 @@
+import time
+
+import jwt
+
+from cache import TTLCache
+from database import db, User
+
+
+class InvalidUser(Exception):
+    """토큰은 유효하지만 사용자가 없음 (탈퇴 등)"""
+
+
+class Principal:
+    """인증된 사용자의 id/username (대부분의 API는 이것만 필요하므로 DB 행을 읽지 않음)"""
+
+    __slots__ = ('id', 'username')
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+    def __repr__(self):
+        return f'<Principal {self.id} {self.username}>'
+
+
+# 탈퇴한 사용자 표시 (TTL 동안 DB를 다시 조회하지 않고 거절)
+_TOMBSTONE = object()
+
+
+class AuthCache:
+    """JWT 검증 결과와 사용자 레코드 캐시
+
+    - 토큰 캐시: 검증을 통과한 토큰 문자열 -> 디코딩된 claims (LRU)
+      서명만이 아니라 토큰 전체를 키로 써서, 캐시된 서명에 다른 payload를 붙인 토큰은 통과하지 못합니다.
+      만료 시각(exp)은 캐시 적중 시에도 매번 확인합니다.
+    - 사용자 캐시: user_id -> Principal 또는 탈퇴 표시 (AUTH_USER_TTL 초)
+      비밀번호 변경, 프로필 수정, 회원탈퇴 시 invalidate()/forget()으로 갱신합니다.
+      다른 워커 프로세스에는 최대 AUTH_USER_TTL 만큼 늦게 반영됩니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.tokens = None
+        self.users = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUTH_TOKEN_CACHE_SIZE', 10000)
+        app.config.setdefault('AUTH_USER_CACHE_SIZE', 10000)
+        app.config.setdefault('AUTH_USER_TTL', 60)
+
+        self.app = app
+        # 토큰 자체의 exp로 만료를 판단하므로 캐시 TTL은 길게
+        self.tokens = TTLCache(maxsize=app.config['AUTH_TOKEN_CACHE_SIZE'],
+                               ttl=app.config['JWT_EXPIRATION_HOURS'] * 3600)
+        self.users = TTLCache(maxsize=app.config['AUTH_USER_CACHE_SIZE'],
+                              ttl=app.config['AUTH_USER_TTL'])
+        app.extensions['auth_cache'] = self
+
+    def decode(self, token):
+        """검증된 claims 반환 (jwt.InvalidTokenError 계열 예외 발생 가능)"""
+        claims = self.tokens.get(token)
+        if claims is None:
+            claims = jwt.decode(token, self.app.config['SECRET_KEY'], algorithms=['HS256'])
+            self.tokens.set(token, claims)
+        elif claims.get('exp') is not None and claims['exp'] <= time.time():
+            self.tokens.delete(token)
+            raise jwt.ExpiredSignatureError('Signature has expired')
+        return claims
+
+    def principal(self, user_id):
+        """user_id의 Principal (없는 사용자면 InvalidUser)"""
+        cached = self.users.get(user_id)
+        if cached is None:
+            row = db.session.query(User.id, User.username).filter_by(id=user_id).first()
+            cached = Principal(row.id, row.username) if row else _TOMBSTONE
+            self.users.set(user_id, cached)
+        if cached is _TOMBSTONE:
+            raise InvalidUser(user_id)
+        return cached
+
+    def authenticate(self, token):
+        claims = self.decode(token)
+        return self.principal(claims['user_id'])
+
+    def invalidate(self, user_id):
+        """사용자 정보가 바뀌었을 때 (다음 요청에서 다시 조회)"""
+        self.users.delete(user_id)
+
+    def forget(self, user_id):
+        """탈퇴한 사용자의 토큰을 DB 조회 없이 거절하도록 표시"""
+        self.users.set(user_id, _TOMBSTONE)
@@ -0,0 +1,81 @@
+"""인증 오버헤드 마이크로 벤치마크
+
+임시 SQLite DB에서 요청 하나당 인증에 드는 시간을 비교합니다.
+- 이전 방식: 매번 jwt.decode + users 조회
+- AuthCache: 토큰/사용자 캐시 적중 시 (DB 조회 없음)
+- GET /api/verify-token 전체 요청 (캐시 사용)
+
+    cd serverapi && python bench_auth.py --iterations 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# app을 import 하기 전에 임시 DB 지정
+_tmpdir = tempfile.mkdtemp(prefix='benchauth-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_tmpdir, "auth.db")}'
+os.environ['HLS_TRANSCODER'] = 'stub'
+
+import jwt
+from sqlalchemy import event
+
+from app import app, db, generate_token, auth_cache
+from database import User
+
+
+def measure(fn, iterations):
+    fn()  # 캐시 준비
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', password='x')
+        db.session.add(user)
+        db.session.commit()
+        token = generate_token(user.id, user.username)
+
+        def legacy():
+            payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+            db.session.get(User, payload['user_id'])
+            db.session.rollback()
+
+        def cached():
+            auth_cache.authenticate(token)
+
+        queries = [0]
+
+        def count(*_):
+            queries[0] += 1
+
+        for engine in set(db.engines.values()):
+            event.listen(engine, 'before_cursor_execute', count)
+
+        results = {}
+        for name, fn in (('legacy (decode + user lookup)', legacy), ('AuthCache (warm)', cached)):
+            queries[0] = 0
+            results[name] = (measure(fn, args.iterations), queries[0] / (args.iterations + 1))
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    queries[0] = 0
+    per_request = measure(lambda: client.get('/api/verify-token', headers=headers), args.iterations // 5)
+    results['GET /api/verify-token (cached)'] = (per_request, queries[0] / (args.iterations // 5 + 1))
+
+    print(f"{args.iterations} iterations")
+    print(f"{'':<36} {'us/call':>9} {'queries/call':>13}")
+    for name, (micros, query_count) in results.items():
+        print(f"{name:<36} {micros:>9.1f} {query_count:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
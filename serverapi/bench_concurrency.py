@@ -0,0 +1,136 @@
+"""SQLite 동시 읽기/쓰기 벤치마크
+
+기본 설정(SQLITE_TUNING=0: rollback 저널, PRAGMA 없음, 공용 연결 풀)과
+튜닝 설정(WAL + PRAGMA + reader 풀/단일 writer)을 각각 임시 DB에서 실행해서
+처리량, 지연 시간, "database is locked" 등 실패 수를 비교합니다.
+
+    cd serverapi && python bench_concurrency.py --threads 16 --seconds 10
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def worker_main(args):
+    """자식 프로세스: 환경변수로 지정된 설정으로 app을 띄워 부하를 줌"""
+    from app import app, db, generate_token
+    from database import User, Video
+
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f'bench{i}', password='x') for i in range(args.threads)]
+        db.session.add_all(users)
+        db.session.add_all(Video(title=f'video {i}', filename=f'v{i}.mp4', channel=f'bench{i % args.threads}')
+                           for i in range(200))
+        db.session.commit()
+        tokens = [generate_token(u.id, u.username) for u in users]
+        names = ','.join(u.username for u in users)
+
+    latencies = {'read': [], 'write': []}
+    failures = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def run(index):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[index]}'}
+        rng = random.Random(index)
+        local = {'read': [], 'write': []}
+        local_failures = {'read': 0, 'write': 0}
+
+        while time.monotonic() < deadline:
+            video_id = rng.randint(1, 200)
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < args.write_ratio / 2:
+                kind = 'write'
+                r = client.post(f'/api/videos/{video_id}/comments', json={'content': 'bench'}, headers=headers)
+            elif roll < args.write_ratio:
+                kind = 'write'
+                r = client.post(f'/api/videos/{video_id}/like', headers=headers)
+            elif roll < (1 + args.write_ratio) / 2:
+                kind = 'read'
+                r = client.get(f'/api/videos/{video_id}')
+            else:
+                kind = 'read'
+                r = client.get(f'/api/channels/summary?names={names}')
+            elapsed = time.perf_counter() - start
+
+            if r.status_code >= 400:
+                local_failures[kind] += 1
+            else:
+                local[kind].append(elapsed)
+
+        with lock:
+            for kind in local:
+                latencies[kind].extend(local[kind])
+                failures[kind] += local_failures[kind]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    def percentile(values, p):
+        if not values:
+            return 0.0
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+    result = {}
+    for kind in ('read', 'write'):
+        result[kind] = {
+            'ok': len(latencies[kind]),
+            'failed': failures[kind],
+            'per_sec': len(latencies[kind]) / args.seconds,
+            'p50_ms': percentile(latencies[kind], 0.50),
+            'p95_ms': percentile(latencies[kind], 0.95),
+        }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='쓰기 요청 비율 (0~1)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker_main(args)
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix='bench-')
+    results = {}
+    for mode, tuning in (('default', '0'), ('tuned', '1')):
+        env = dict(os.environ,
+                   DATABASE_URL=f'sqlite:///{os.path.join(tmpdir, mode + ".db")}',
+                   SQLITE_TUNING=tuning,
+                   HLS_TRANSCODER='stub')
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker',
+               '--threads', str(args.threads), '--seconds', str(args.seconds),
+               '--write-ratio', str(args.write_ratio)]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(proc.returncode)
+        results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"{args.threads} threads, {args.seconds:g}s, write ratio {args.write_ratio:g}")
+    print(f"{'mode':<8} {'kind':<6} {'ok/s':>8} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, result in results.items():
+        for kind, r in result.items():
+            print(f"{mode:<8} {kind:<6} {r['per_sec']:>8.1f} {r['failed']:>7} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
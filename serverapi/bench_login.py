@@ -0,0 +1,132 @@
+"""로그인 + 비디오 목록 혼합 부하 테스트
+
+비밀번호 해싱을 요청 스레드에서 하는 경우(HASH_WORKERS=0)와 프로세스 풀(PasswordHasher)을 쓰는 경우를
+각각 임시 DB에서 실행해서 로그인 처리량, 503(대기열 초과) 수, 목록 요청의 지연 시간을 비교합니다.
+
+    cd serverapi && python bench_login.py --threads 32 --seconds 10 --login-ratio 0.3
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PASSWORD = 'bench-password'
+
+
+def worker_main(args):
+    """자식 프로세스: 환경변수로 지정된 설정으로 app을 띄워 부하를 줌"""
+    from app import app, db, password_hasher
+    from database import User, Video
+
+    with app.app_context():
+        db.create_all()
+        hashed = password_hasher.hash(PASSWORD)  # 풀도 미리 띄워 둠
+        db.session.add_all(User(username=f'bench{i}', password=hashed) for i in range(args.threads))
+        db.session.add_all(Video(title=f'video {i}', filename=f'v{i}.mp4', channel=f'bench{i % args.threads}')
+                           for i in range(200))
+        db.session.commit()
+
+    latencies = {'login': [], 'list': []}
+    counts = {'busy': 0, 'failed': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def run(index):
+        client = app.test_client()
+        rng = random.Random(index)
+        local = {'login': [], 'list': []}
+        busy = failed = 0
+
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            if rng.random() < args.login_ratio:
+                kind = 'login'
+                r = client.post('/api/login', json={'username': f'bench{index}', 'password': PASSWORD})
+            else:
+                kind = 'list'
+                r = client.get(f'/api/videos?limit=20&offset={rng.randint(0, 9) * 20}')
+            elapsed = time.perf_counter() - start
+
+            if r.status_code == 503:
+                busy += 1
+            elif r.status_code >= 400:
+                failed += 1
+            else:
+                local[kind].append(elapsed)
+
+        with lock:
+            for kind in local:
+                latencies[kind].extend(local[kind])
+            counts['busy'] += busy
+            counts['failed'] += failed
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    password_hasher.shutdown()
+
+    def percentile(values, p):
+        if not values:
+            return 0.0
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+    result = {'busy': counts['busy'], 'failed': counts['failed']}
+    for kind in ('login', 'list'):
+        result[kind] = {
+            'per_sec': len(latencies[kind]) / args.seconds,
+            'p50_ms': percentile(latencies[kind], 0.50),
+            'p95_ms': percentile(latencies[kind], 0.95),
+        }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--login-ratio', type=float, default=0.3, help='로그인 요청 비율 (0~1)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='해싱 프로세스 수')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker_main(args)
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix='benchlogin-')
+    results = {}
+    for mode, workers in (('inline', 0), ('pool', args.workers)):
+        env = dict(os.environ,
+                   DATABASE_URL=f'sqlite:///{os.path.join(tmpdir, mode + ".db")}',
+                   HASH_WORKERS=str(workers),
+                   HLS_TRANSCODER='stub')
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker',
+               '--threads', str(args.threads), '--seconds', str(args.seconds),
+               '--login-ratio', str(args.login_ratio)]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(proc.returncode)
+        results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"{args.threads} threads, {args.seconds:g}s, login ratio {args.login_ratio:g}, "
+          f"{args.workers} hashing workers")
+    print(f"{'mode':<7} {'login/s':>8} {'login p95':>10} {'list/s':>8} {'list p50':>9} {'list p95':>9} "
+          f"{'503':>6} {'failed':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<7} {r['login']['per_sec']:>8.1f} {r['login']['p95_ms']:>10.1f} "
+              f"{r['list']['per_sec']:>8.1f} {r['list']['p50_ms']:>9.2f} {r['list']['p95_ms']:>9.2f} "
+              f"{r['busy']:>6} {r['failed']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+
+from sqlalchemy import update, delete
+from sqlalchemy.dialects import sqlite, postgresql
+
+from database import db, Blob, get_kst_now
+from storage import create_storage
+
+# 블롭 이름: <SHA-256 hex>.<확장자>
+BLOB_NAME_RE = re.compile(r'^([0-9a-f]{64})\.([a-z0-9]{1,10})$')
+COPY_BUFFER_SIZE = 1024 * 1024
+# 블롭 내용은 이름(해시)이 같으면 바뀌지 않음
+BLOB_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# 저장소 안에서 블롭이 아닌 객체를 두는 위치 (임시 파일, 재개 업로드 파트)
+TMP_PREFIX = 'tmp/'
+UPLOADS_PREFIX = 'uploads/'
+
+# 참조 추가를 한 문장(INSERT ... ON CONFLICT DO UPDATE)으로 처리할 수 있는 DB
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def file_digest(path):
+    """파일의 SHA-256 (hex)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """내용(SHA-256)을 주소로 쓰는 업로드 파일 저장소
+
+    파일은 저장소의 <해시 1-2자리>/<3-4자리>/<해시>.<확장자> 에 한 번만 저장되고
+    Video/User 컬럼에는 '<해시>.<확장자>' 이름이 들어갑니다. 같은 내용을 다시 올리면
+    파일을 새로 쓰지 않고 blobs.refcount만 늘어납니다.
+
+    - reference()/release()는 호출한 쪽의 트랜잭션에서 실행되므로 레코드 변경과 함께 커밋/롤백됩니다.
+    - put_stream()/put_file()/adopt()는 참조를 늘려 바로 커밋한 뒤 트랜잭션 밖에서 파일을 둡니다
+      (업로드/복사 동안 단일 writer 연결을 잡지 않도록). 따라서 커밋하지 않은 변경이 없을 때 호출하고,
+      그 뒤 레코드 저장이 실패하면 호출한 쪽에서 release()로 참조를 되돌립니다.
+    - refcount가 0이 되고 BLOB_GC_GRACE 초가 지난 블롭은 collect()가 지웁니다.
+      collect()는 행 삭제와 파일 삭제를 한 트랜잭션 안에서 하고, 저장은 참조를 먼저 커밋한 뒤
+      파일을 두므로, GC와 같은 내용의 업로드가 겹쳐도 참조 중인 파일이 지워지지 않습니다.
+    - 블롭 이름이 아닌 값(예전 '<시각>_<파일명>' 형식)은 원래 폴더에서 찾습니다.
+    - 저장소는 STORAGE_BACKEND 설정으로 고릅니다 (local: BLOB_FOLDER, s3: 버킷의 blobs/ 아래).
+      원격 저장소면 url()이 presign URL을 돌려주고, 로컬 파일이 필요한 작업은 local_file()로 내려받아 씁니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.storage = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('BLOB_FOLDER', os.path.join(app.root_path, 'uploads/blobs'))
+        # 받는 중인 파일 (로컬 저장소면 rename으로 옮길 수 있도록 BLOB_FOLDER와 같은 파일시스템에 둠)
+        app.config.setdefault('BLOB_TMP_FOLDER', os.path.join(app.config['BLOB_FOLDER'], 'tmp'))
+        # 참조가 없어진 블롭을 지우기 전에 기다리는 시간 (초)
+        app.config.setdefault('BLOB_GC_GRACE', 600)
+
+        self.app = app
+        self.storage = create_storage(app, app.config['BLOB_FOLDER'], 'blobs/')
+        os.makedirs(app.config['BLOB_TMP_FOLDER'], exist_ok=True)
+        app.extensions['blob_store'] = self
+
+    @property
+    def remote(self):
+        return self.storage.remote
+
+    # ========== 경로 ==========
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name) and BLOB_NAME_RE.match(name) is not None
+
+    @staticmethod
+    def shard(name):
+        """블롭 이름이면 '<ab>/<cd>/<이름>', 아니면 이름 그대로 (디렉토리 하나에 파일이 몰리지 않도록)"""
+        if not BlobStore.is_blob(name):
+            return name
+        return f'{name[:2]}/{name[2:4]}/{name}'
+
+    def local_path(self, folder, name):
+        """컬럼 값(파일 이름)의 로컬 경로 (블롭이 아니면 folder 설정의 폴더 기준, 원격 저장소의 블롭이면 None)"""
+        if not self.is_blob(name):
+            return os.path.join(self.app.config[folder], os.path.basename(name))
+        if self.remote:
+            return None
+        return self.storage.path(self.shard(name))
+
+    @contextmanager
+    def local_file(self, folder, name):
+        """컬럼 값의 파일을 로컬 경로로 사용 (원격 저장소면 임시 파일로 내려받고 끝나면 삭제, 없으면 None)"""
+        path = self.local_path(folder, name)
+        if path is not None:
+            yield path if os.path.isfile(path) else None
+            return
+        if not self.storage.exists(self.shard(name)):
+            yield None
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.app.config['BLOB_TMP_FOLDER'], suffix=f".{name.rsplit('.', 1)[1]}")
+        os.close(fd)
+        try:
+            self.storage.get_file(self.shard(name), tmp)
+            yield tmp
+        finally:
+            self._discard(tmp)
+
+    def open(self, folder, name):
+        """컬럼 값의 파일을 seek 가능한 읽기 전용 파일 객체로 (원격 저장소는 필요한 부분만 범위 요청)"""
+        path = self.local_path(folder, name)
+        if path is not None:
+            return open(path, 'rb')
+        return self.storage.open_seekable(self.shard(name))
+
+    def url(self, name):
+        """원격 저장소에 있는 블롭의 presign URL (로컬 저장소나 블롭이 아닌 이름이면 None)"""
+        if not self.remote or not self.is_blob(name):
+            return None
+        return self.storage.url(self.shard(name))
+
+    def find(self, digest, size=None):
+        """같은 내용(과 크기)으로 저장된 블롭 이름 (없으면 None)"""
+        row = db.session.query(Blob.ext, Blob.size).filter_by(digest=digest).first()
+        if row is None or (size is not None and row.size != size):
+            return None
+        name = f'{digest}.{row.ext}'
+        return name if self.storage.exists(self.shard(name)) else None
+
+    # ========== 저장 / 참조 ==========
+
+    def put_stream(self, stream, ext):
+        """스트림을 임시 파일로 받으면서 해시를 계산해 저장하고 블롭 이름 반환 (참조 1 증가, 커밋됨)"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.app.config['BLOB_TMP_FOLDER'])
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: stream.read(COPY_BUFFER_SIZE), b''):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+            return self._store(digest.hexdigest(), size, ext, partial(self.storage.put_file, src=tmp))
+        finally:
+            self._discard(tmp)
+
+    def put_file(self, path, ext, digest=None):
+        """파일을 저장소로 옮기고 블롭 이름 반환 (참조 1 증가, 커밋됨)
+
+        같은 내용이 이미 있으면 원본 파일만 지웁니다. digest를 모르면 파일을 읽어 계산합니다.
+        """
+        if digest is None:
+            digest = file_digest(path)
+        try:
+            return self._store(digest, os.path.getsize(path), ext, partial(self.storage.put_file, src=path))
+        finally:
+            self._discard(path)
+
+    def adopt(self, key, ext, digest, size):
+        """저장소에 이미 올라간 객체(재개 업로드 결과)를 블롭으로 옮기고 이름 반환 (참조 1 증가, 커밋됨)
+
+        같은 내용이 이미 있으면 객체만 지웁니다.
+        """
+        placed = []
+
+        def place(dst, **meta):
+            self.storage.move(key, dst, **meta)
+            placed.append(dst)
+
+        name = self._store(digest, size, ext, place)
+        if not placed:
+            self.storage.delete(key)
+        return name
+
+    def reference(self, digest, size=None):
+        """이미 저장된 블롭의 참조를 1 늘리고 이름 반환 (없거나 크기가 다르면 None)"""
+        name = self.find(digest, size)
+        if name is None:
+            return None
+        # 그 사이 GC가 행을 지웠으면 0행
+        updated = db.session.execute(
+            update(Blob)
+            .where(Blob.digest == digest)
+            .values(refcount=Blob.refcount + 1, unreferenced_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        return name if updated else None
+
+    def release(self, *names):
+        """참조를 1씩 줄이고, 참조가 0이 된 블롭의 해시 목록 반환 (블롭이 아닌 이름은 무시)"""
+        counts = Counter(BLOB_NAME_RE.match(name).group(1) for name in names if self.is_blob(name))
+        if not counts:
+            return []
+        now = get_kst_now()
+        by_delta = {}
+        for digest, count in counts.items():
+            by_delta.setdefault(count, []).append(digest)
+        for delta, digests in by_delta.items():
+            db.session.execute(
+                update(Blob)
+                .where(Blob.digest.in_(digests), Blob.refcount >= delta)
+                .values(refcount=Blob.refcount - delta)
+                .execution_options(synchronize_session=False)
+            )
+        released = [digest for (digest,) in db.session.query(Blob.digest).filter(
+            Blob.digest.in_(list(counts)), Blob.refcount == 0, Blob.unreferenced_at.is_(None))]
+        if released:
+            db.session.execute(
+                update(Blob)
+                .where(Blob.digest.in_(released))
+                .values(unreferenced_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        return released
+
+    def _store(self, digest, size, ext, place):
+        # 참조를 먼저 늘린 뒤(쓰기 잠금) 파일 존재 여부를 확인해야 같은 블롭을 지우던 GC가 끝난 다음 상태를 보게 됨.
+        # 커밋한 뒤에는 refcount > 0 이라 GC가 지우지 않으므로 파일은 트랜잭션 밖에서 둠
+        name = f'{digest}.{self._reference(digest, size, ext.lower())}'
+        db.session.commit()
+        key = self.shard(name)
+        try:
+            if not self.storage.exists(key):
+                place(key, content_type=mimetypes.guess_type(name)[0], cache_control=BLOB_CACHE_CONTROL)
+        except Exception:
+            self.release(name)
+            db.session.commit()
+            raise
+        return name
+
+    def _reference(self, digest, size, ext):
+        """참조 수 1 증가 (처음이면 행 추가) 후 저장된 확장자 반환"""
+        values = {'digest': digest, 'ext': ext, 'size': size, 'refcount': 1, 'created_at': get_kst_now()}
+        insert = UPSERT_DIALECTS.get(db.engine.dialect.name)
+        if insert is not None:
+            stmt = insert(Blob).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Blob.digest],
+                set_={'refcount': Blob.refcount + 1, 'unreferenced_at': None},
+            ).returning(Blob.ext)
+            return db.session.execute(stmt).scalar_one()
+
+        updated = db.session.execute(
+            update(Blob)
+            .where(Blob.digest == digest)
+            .values(refcount=Blob.refcount + 1, unreferenced_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            return db.session.query(Blob.ext).filter_by(digest=digest).scalar()
+        db.session.add(Blob(**values))
+        db.session.flush()
+        return ext
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    # ========== 정리 ==========
+
+    def collect(self, digests=None, limit=1000):
+        """참조가 없어진 지 BLOB_GC_GRACE 초가 지난 블롭 삭제, 지운 블롭 이름 목록 반환
+
+        digests를 주면 그 블롭만 확인합니다. 블롭마다 따로 커밋해서 쓰기 잠금을 오래 잡지 않습니다.
+        """
+        cutoff = get_kst_now() - timedelta(seconds=self.app.config['BLOB_GC_GRACE'])
+        query = db.session.query(Blob.digest, Blob.ext).filter(Blob.refcount == 0, Blob.unreferenced_at <= cutoff)
+        if digests is not None:
+            query = query.filter(Blob.digest.in_(digests))
+        candidates = query.limit(limit).all()
+
+        removed = []
+        for digest, ext in candidates:
+            try:
+                deleted = db.session.execute(
+                    delete(Blob)
+                    .where(Blob.digest == digest, Blob.refcount == 0)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                # 파일은 커밋 전에 지움: 같은 내용을 올리는 요청은 커밋될 때까지 참조 추가에서 대기
+                if deleted:
+                    self.storage.delete(self.shard(f'{digest}.{ext}'))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            if deleted:
+                removed.append(f'{digest}.{ext}')
+        return removed
+
+    def collect_orphans(self, batch_size=500):
+        """blobs 행이 없는 파일과 남은 임시 파일 삭제 (요청 실패/프로세스 종료로 남은 것), 지운 개수 반환
+
+        재개 업로드 파트(uploads/)는 세션 정리(cleanup-uploads)가 지우므로 건드리지 않습니다.
+        """
+        cutoff = time.time() - self.app.config['BLOB_GC_GRACE']
+        removed = 0
+        candidates = {}
+        for key, mtime in self.storage.list():
+            if mtime > cutoff or key.startswith(UPLOADS_PREFIX):
+                continue
+            match = BLOB_NAME_RE.match(key.rsplit('/', 1)[-1])
+            if match and not key.startswith(TMP_PREFIX):
+                candidates[match.group(1)] = key
+                if len(candidates) >= batch_size:
+                    removed += self._remove_unknown(candidates)
+                    candidates = {}
+            elif key.startswith(TMP_PREFIX) or key.endswith('.tmp'):
+                self.storage.delete(key)
+                removed += 1
+        if candidates:
+            removed += self._remove_unknown(candidates)
+
+        # 원격 저장소면 로컬 임시 폴더는 따로 정리
+        if self.remote:
+            for filename in os.listdir(self.app.config['BLOB_TMP_FOLDER']):
+                path = os.path.join(self.app.config['BLOB_TMP_FOLDER'], filename)
+                try:
+                    if os.path.getmtime(path) > cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                self._discard(path)
+                removed += 1
+        return removed
+
+    def _remove_unknown(self, candidates):
+        known = {digest for (digest,) in db.session.query(Blob.digest).filter(Blob.digest.in_(list(candidates)))}
+        removed = 0
+        for digest, key in candidates.items():
+            if digest not in known:
+                self.storage.delete(key)
+                removed += 1
+        return removed
+
+    def reconcile(self, columns):
+        """컬럼(Video.filename 등)에 실제로 들어 있는 이름 기준으로 refcount 보정, 어긋나 있던 블롭 수 반환"""
+        actual = Counter()
+        for column in columns:
+            for (name,) in db.session.query(column).filter(column.isnot(None)):
+                if self.is_blob(name):
+                    actual[name[:64]] += 1
+
+        now = get_kst_now()
+        drifted = 0
+        for digest, refcount in db.session.query(Blob.digest, Blob.refcount).all():
+            expected = actual.get(digest, 0)
+            if refcount != expected:
+                drifted += 1
+                db.session.execute(
+                    update(Blob)
+                    .where(Blob.digest == digest)
+                    .values(refcount=expected, unreferenced_at=None if expected else now)
+                    .execution_options(synchronize_session=False)
+                )
+        db.session.commit()
+        return drifted
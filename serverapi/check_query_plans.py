@@ -0,0 +1,244 @@
+"""API가 실행하는 모든 쿼리의 실행 계획 점검
+
+임시 SQLite DB에 샘플 데이터를 넣고 주요 API, 백그라운드 작업(분석/faststart/HLS/블롭 GC),
+관리 명령을 한 번씩 실행하면서 실행된 쿼리를 모은 뒤,
+각 쿼리를 EXPLAIN QUERY PLAN 으로 확인해서 인덱스 없이 테이블 전체를 읽는(SCAN) 쿼리가
+있으면 실패(종료 코드 1)합니다. 인덱스를 추가/변경하거나 새 쿼리를 만든 뒤 실행하세요.
+
+    cd serverapi && python check_query_plans.py
+"""
+import io
+import os
+import re
+import struct
+import sys
+import tempfile
+
+# app을 import 하기 전에 임시 DB와 테스트용 패키저로 설정
+_tmpdir = tempfile.mkdtemp(prefix='plancheck-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_tmpdir, "plans.db")}'
+os.environ['HLS_TRANSCODER'] = 'stub'
+# 작업은 API 프로세스 스레드가 아니라 exercise()에서 직접 처리
+os.environ['JOB_LOCAL_WORKERS'] = '0'
+os.environ['STORAGE_BACKEND'] = 'local'
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from app import (app, db, generate_token, search_index, view_counter, job_queue, blob_store,
+                 image_pipeline, resumable_uploads)
+from database import User, Video, Comment, Subscription, VideoLike, VideoDislike
+from storage import LocalStorage
+
+# 파일을 쓰거나 지우는 작업/명령이 개발용 uploads 폴더를 건드리지 않도록 임시 폴더 사용
+MEDIA_FOLDERS = ('UPLOAD_FOLDER', 'THUMBNAIL_FOLDER', 'PROFILE_FOLDER', 'BANNER_FOLDER', 'HLS_FOLDER',
+                 'BLOB_FOLDER', 'BLOB_TMP_FOLDER', 'IMAGE_VARIANTS_FOLDER', 'IMAGE_TMP_FOLDER')
+
+# 의도적으로 전체를 읽는 쿼리 (패턴, 이유)
+ALLOWED_SCANS = [
+    (re.compile(r'sqlite_master'), 'FTS 색인 존재 여부 확인 (시스템 테이블)'),
+    (re.compile(r"LIKE \?"), '3글자 미만 검색어의 LIKE 대체 검색 (FTS trigram 불가)'),
+    (re.compile(r'videos\.probed_at IS NULL'), 'probe-videos/faststart-videos 대상 선택 (명령마다 한 번)'),
+    (re.compile(r'(videos\.filename|videos\.thumbnail|users\.profile_image|users\.banner_image) IS NOT NULL$'),
+     'reconcile-blobs 컬럼별 참조 수 집계 (명령마다 한 번)'),
+    (re.compile(r'^SELECT blobs\.digest AS blobs_digest, blobs\.refcount AS blobs_refcount FROM blobs$'),
+     'reconcile-blobs 전체 블롭 참조 수 보정 (명령마다 한 번)'),
+]
+
+SCAN_RE = re.compile(r'^SCAN (\S+)(.*)$')
+PLANNED_PREFIXES = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def isolate_media():
+    for key in MEDIA_FOLDERS:
+        app.config[key] = os.path.join(_tmpdir, key.lower())
+        os.makedirs(app.config[key], exist_ok=True)
+    blob_store.storage = resumable_uploads.storage = LocalStorage(app.config['BLOB_FOLDER'])
+    image_pipeline.storage = LocalStorage(app.config['IMAGE_VARIANTS_FOLDER'])
+
+
+def seed():
+    """인덱스 선택이 의미 있을 정도의 샘플 데이터 생성"""
+    db.create_all()
+    search_index.create()
+
+    password = generate_password_hash('password', method='pbkdf2:sha256')
+    users = [User(username=f'user{i}', password=password) for i in range(20)]
+    db.session.add_all(users)
+    db.session.flush()
+
+    base = datetime(2024, 1, 1)
+    videos = []
+    for i in range(200):
+        videos.append(Video(
+            title=f'샘플 동영상 {i} 하이라이트', description=f'설명 {i}', channel=f'user{i % 20}',
+            filename=f'video_{i}.mp4', upload_time=base + timedelta(hours=i), hls_status='ready'
+        ))
+    db.session.add_all(videos)
+    db.session.flush()
+
+    for i, video in enumerate(videos[:50]):
+        db.session.add(Comment(video_id=video.id, user_id=users[i % 20].id,
+                               username=users[i % 20].username, content=f'댓글 {i}'))
+        db.session.add(VideoLike(user_id=users[i % 20].id, video_id=video.id))
+        db.session.add(VideoDislike(user_id=users[(i + 1) % 20].id, video_id=video.id))
+    for i in range(1, 20):
+        db.session.add(Subscription(follower_id=users[0].id, following_channel=f'user{i}'))
+    db.session.commit()
+
+    return {u.username: generate_token(u.id, u.username) for u in users}
+
+
+def sample_mp4(payload=b'\0' * 64):
+    """moov가 mdat 뒤에 있는 (faststart가 아닌) 최소 MP4"""
+    def box(kind, body):
+        return struct.pack('>I4s', 8 + len(body), kind) + body
+    mvhd = box(b'mvhd', struct.pack('>B3xIIII', 0, 0, 0, 1000, 60000) + bytes(80))
+    return box(b'ftyp', b'isom' + bytes(4) + b'isom') + box(b'mdat', payload) + box(b'moov', mvhd)
+
+
+def exercise(client, tokens):
+    """API를 한 번씩 호출 (쓰기 API 포함)"""
+    auth = lambda name: {'Authorization': f'Bearer {tokens[name]}'}
+
+    def call(method, url, **kwargs):
+        response = client.open(url, method=method, **kwargs)
+        # 실패한 요청은 뒤쪽 쿼리가 실행되지 않았을 수 있으므로 알림
+        if response.status_code >= 400:
+            print(f"[warning] {method} {url} -> {response.status_code}")
+        return response
+
+    r = call('GET', '/api/videos?limit=5')
+    call('GET', f"/api/videos?limit=5&cursor={r.headers['X-Next-Cursor']}")
+    call('GET', '/api/videos?q=하이라이트')
+    call('GET', '/api/videos?q=샘플 동영상')
+    call('GET', '/api/videos/1')
+    call('GET', '/api/videos/1/comments')
+    call('GET', '/api/users?q=user1')
+    call('GET', '/api/users/user1', headers=auth('user0'))
+    r = call('GET', '/api/users/user1/videos?limit=2')
+    call('GET', f"/api/users/user1/videos?limit=2&cursor={r.headers['X-Next-Cursor']}")
+    call('GET', '/api/channels/summary?names=user1,user2,user3')
+    call('GET', '/api/channels/user1/subscribers/count')
+    call('GET', '/api/subscriptions/1', headers=auth('user0'))
+    r = call('GET', '/api/feed?limit=5', headers=auth('user0'))
+    call('GET', f"/api/feed?limit=5&cursor={r.headers['X-Next-Cursor']}", headers=auth('user0'))
+    call('GET', '/api/reactions?ids=1,2,3', headers=auth('user0'))
+    call('GET', '/api/verify-token', headers=auth('user0'))
+
+    call('POST', '/api/subscribe', json={'channelName': 'user5'}, headers=auth('user3'))
+    call('POST', '/api/subscribe', json={'channelName': 'user5'}, headers=auth('user3'))
+    call('POST', '/api/videos/2/like', headers=auth('user3'))
+    call('POST', '/api/videos/2/dislike', headers=auth('user3'))
+    r = call('POST', '/api/videos/2/comments', json={'content': '새 댓글'}, headers=auth('user3'))
+    comment_id = r.get_json()['comment']['id']
+    call('PUT', f'/api/comments/{comment_id}', json={'content': '수정'}, headers=auth('user3'))
+    call('DELETE', f'/api/comments/{comment_id}', headers=auth('user3'))
+    call('PUT', '/api/videos/4', data={'title': '제목 변경'}, headers=auth('user3'))
+    call('PUT', '/api/profile/update', data={'bio': '소개'}, headers=auth('user3'))
+    call('DELETE', '/api/videos/4', headers=auth('user3'))
+    call('DELETE', '/api/profile/delete-account', json={'password': 'password'}, headers=auth('user7'))
+    call('POST', '/api/login', json={'username': 'user1', 'password': 'password'})
+
+    view_counter.flush()
+
+    # 업로드 -> 분석/faststart/HLS/대표 이미지 작업 (같은 내용 두 번: 블롭 참조 공유)
+    for title in ('업로드', '중복 업로드'):
+        call('POST', '/api/videos/upload', data={'video': (io.BytesIO(sample_mp4()), 'a.mp4'), 'title': title},
+             headers=auth('user2'), content_type='multipart/form-data')
+    data = sample_mp4(b'\1' * 64)
+    r = call('POST', '/api/uploads', json={'filename': 'b.mp4', 'size': len(data)}, headers=auth('user2'))
+    upload_id = r.get_json()['uploadId']
+    call('GET', f'/api/uploads/{upload_id}', headers=auth('user2'))
+    call('PUT', f'/api/uploads/{upload_id}', data=data,
+         headers={**auth('user2'), 'Content-Range': f'bytes 0-{len(data) - 1}/{len(data)}'})
+    r = call('POST', f'/api/uploads/{upload_id}/complete', data={'title': '이어 올리기'},
+             headers=auth('user2'), content_type='multipart/form-data')
+    call('GET', f"/api/videos/{r.get_json()['video_id']}/stream", headers={'Range': 'bytes=0-9'})
+    job_queue.work(burst=True)
+
+    # 삭제 -> 참조 해제 -> 블롭 GC 작업
+    call('DELETE', f"/api/videos/{r.get_json()['video_id']}", headers=auth('user2'))
+    job_queue.work(burst=True)
+
+    # 관리 명령 (일괄 분석/변환, 블롭 정리)
+    runner = app.test_cli_runner()
+    for args in (['probe-videos'], ['faststart-videos'], ['gc-blobs', '--orphans'], ['reconcile-blobs'],
+                 ['cleanup-uploads'], ['prune-jobs', '--days', '0']):
+        result = runner.invoke(args=args)
+        if result.exception is not None:
+            print(f"[warning] {' '.join(args)} -> {result.exception!r}")
+
+
+def collect_statements(run):
+    statements = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            parameters = parameters[0]
+        statements.setdefault(statement, parameters)
+
+    # 읽기/쓰기 연결이 분리되어 있으면 엔진이 여러 개
+    engines = set(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    try:
+        run()
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+    return statements
+
+
+def full_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = SCAN_RE.match(detail)
+        if not match:
+            continue
+        table, rest = match.groups()
+        if 'USING' in rest or 'VIRTUAL TABLE' in rest or table == 'CONSTANT':
+            continue
+        scans.append(detail)
+    return scans
+
+
+def main():
+    isolate_media()
+    # 참조가 없어진 블롭을 바로 지우도록 (collect_blobs 작업)
+    app.config['BLOB_GC_GRACE'] = 0
+    with app.app_context():
+        tokens = seed()
+        client = app.test_client()
+        statements = collect_statements(lambda: exercise(client, tokens))
+
+        failures = 0
+        checked = 0
+        with db.engine.connect() as conn:
+            for statement, parameters in statements.items():
+                if not statement.lstrip().upper().startswith(PLANNED_PREFIXES):
+                    continue
+                checked += 1
+                scans = full_scans(conn, statement, parameters)
+                if not scans:
+                    continue
+
+                one_line = ' '.join(statement.split())
+                allowed = next((reason for pattern, reason in ALLOWED_SCANS if pattern.search(one_line)), None)
+                if allowed:
+                    print(f"[allowed] {allowed}\n    {one_line}")
+                    continue
+
+                failures += 1
+                print(f"[FULL SCAN] {', '.join(scans)}\n    {one_line}")
+
+    print(f"Checked {checked} statement(s), {failures} full table scan(s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+from sqlalchemy import update, delete, func, select
+
+from database import db, User, Subscription, Video, Comment
+from reactions import insert_ignore
+
+
+def adjust_subscriber_count(channel_name, delta):
+    """채널(사용자)의 구독자 수를 원자적으로 증감 (현재 트랜잭션 안에서 실행)"""
+    db.session.execute(
+        update(User)
+        .where(User.username == channel_name)
+        .values(subscriber_count=User.subscriber_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def toggle_subscription(follower_id, channel_name):
+    """구독 토글을 한 트랜잭션으로 처리하고 구독 여부 반환
+
+    구독 행을 먼저 지우고(없으면 INSERT ... ON CONFLICT DO NOTHING) 실제로 삭제/추가된
+    행 수(rowcount)만큼만 구독자 수를 바꾸므로, 같은 요청이 동시에 와도
+    subscriptions 행 수와 어긋나지 않습니다.
+    """
+    key = {'follower_id': follower_id, 'following_channel': channel_name}
+    try:
+        removed = db.session.execute(delete(Subscription).filter_by(**key)).rowcount
+        if removed:
+            delta = -removed
+            subscribed = False
+        else:
+            delta = insert_ignore(Subscription, key)
+            subscribed = True
+        if delta:
+            adjust_subscriber_count(channel_name, delta)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return subscribed
+
+
+def release_subscriptions(user_id):
+    """탈퇴하는 사용자가 구독하던 채널들의 구독자 수 감소"""
+    followed = select(Subscription.following_channel).where(Subscription.follower_id == user_id)
+    db.session.execute(
+        update(User)
+        .where(User.username.in_(followed))
+        .values(subscriber_count=User.subscriber_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_subscriber_counts():
+    """subscriptions 테이블 기준으로 구독자 수를 다시 계산하고, 어긋나 있던 채널 수 반환"""
+    actual = (
+        select(func.count())
+        .select_from(Subscription)
+        .where(Subscription.following_channel == User.username)
+        .scalar_subquery()
+    )
+    drifted = db.session.execute(
+        select(func.count()).select_from(User).where(User.subscriber_count != actual)
+    ).scalar()
+    if drifted:
+        db.session.execute(
+            update(User)
+            .values(subscriber_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return drifted
+
+
+def adjust_comment_count(video_id, delta):
+    """비디오의 댓글 수를 원자적으로 증감 (현재 트랜잭션 안에서 실행)"""
+    db.session.execute(
+        update(Video)
+        .where(Video.id == video_id)
+        .values(comment_count=Video.comment_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release_comments(user_id):
+    """탈퇴하는 사용자가 댓글을 단 비디오들의 댓글 수 감소, 영향받은 비디오 id 목록 반환"""
+    video_ids = [row[0] for row in db.session.query(Comment.video_id).filter_by(user_id=user_id).distinct()]
+    if video_ids:
+        written = (
+            select(func.count())
+            .select_from(Comment)
+            .where(Comment.video_id == Video.id, Comment.user_id == user_id)
+            .scalar_subquery()
+        )
+        db.session.execute(
+            update(Video)
+            .where(Video.id.in_(video_ids))
+            .values(comment_count=Video.comment_count - written)
+            .execution_options(synchronize_session=False)
+        )
+    return video_ids
+
+
+def reconcile_comment_counts():
+    """comments 테이블 기준으로 댓글 수를 다시 계산하고, 어긋나 있던 비디오 수 반환"""
+    actual = (
+        select(func.count())
+        .select_from(Comment)
+        .where(Comment.video_id == Video.id)
+        .scalar_subquery()
+    )
+    drifted = db.session.execute(
+        select(func.count()).select_from(Video).where(Video.comment_count != actual)
+    ).scalar()
+    if drifted:
+        db.session.execute(
+            update(Video)
+            .values(comment_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return drifted
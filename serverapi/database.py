@@ -2,7 +2,10 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import pytz
 
-db = SQLAlchemy()
+from dbconfig import RoutingSession
+
+# 읽기/쓰기 연결 분리는 dbconfig.configure_database 설정에 따라 동작
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # 한국 시간대 설정
 KST = pytz.timezone('Asia/Seoul')
@@ -13,6 +16,13 @@ def get_kst_now():
 
 class Video(db.Model):
     __tablename__ = 'videos'
+    __table_args__ = (
+        # 최신순 keyset 페이지네이션 (홈 피드, 채널 동영상 목록)
+        db.Index('ix_videos_upload_time_id', 'upload_time', 'id'),
+        db.Index('ix_videos_channel_upload_time_id', 'channel', 'upload_time', 'id'),
+        # 같은 블롭을 쓰는 비디오 찾기 (faststart 파일 교체, migrate-blobs)
+        db.Index('ix_videos_filename', 'filename'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -25,6 +35,20 @@ class Video(db.Model):
     dislikes = db.Column(db.Integer, default=0)
     duration = db.Column(db.String(20), default='0:00')
     upload_time = db.Column(db.DateTime, default=get_kst_now)
+    hls_status = db.Column(db.String(20))  # HLS 패키징 상태 (pending/processing/ready/failed)
+    # 댓글 수 (comments에서 매번 COUNT 하지 않도록 유지하는 값)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # 서버에서 분석한 파일 정보 (probe.MediaProber, 분석 전이면 probed_at이 NULL)
+    duration_seconds = db.Column(db.Float)
+    width = db.Column(db.Integer)  # 회전을 반영한 화면 기준 크기
+    height = db.Column(db.Integer)
+    video_codec = db.Column(db.String(32))
+    audio_codec = db.Column(db.String(32))
+    bitrate = db.Column(db.BigInteger)  # bps
+    file_size = db.Column(db.BigInteger)  # 바이트
+    moov_at_start = db.Column(db.Boolean)  # MP4/MOV의 moov가 mdat 앞에 있는지 (그 외 형식은 NULL)
+    remuxed_at = db.Column(db.DateTime)  # moov를 앞으로 옮겨 다시 저장한 시각 (faststart)
+    probed_at = db.Column(db.DateTime)
 
     comments = db.relationship('Comment', backref='video', lazy=True, cascade='all, delete-orphan')
     likes_rel = db.relationship('VideoLike', backref='video', lazy=True, cascade='all, delete-orphan')
@@ -40,22 +64,35 @@ class User(db.Model):
     profile_image = db.Column(db.String(200))
     bio = db.Column(db.Text)
     banner_image = db.Column(db.String(200))
+    # 구독자 수 (subscriptions에서 매번 COUNT 하지 않도록 유지하는 값)
+    subscriber_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     subscriptions = db.relationship('Subscription', backref='follower', lazy=True, cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='author', lazy=True, cascade='all, delete-orphan')
     liked_videos = db.relationship('VideoLike', backref='user', lazy=True, cascade='all, delete-orphan')
     disliked_videos = db.relationship('VideoDislike', backref='user', lazy=True, cascade='all, delete-orphan')
+    upload_sessions = db.relationship('UploadSession', backref='user', lazy=True, cascade='all, delete-orphan')
 
 
 class Subscription(db.Model):
     __tablename__ = 'subscriptions'
 
+    # 기본키 (follower_id, following_channel)는 피드 조인의 구독 목록 조회에 사용되고,
+    # following_channel 단독 인덱스는 채널의 구독자 조회(피드 캐시 무효화)에 사용
+    __table_args__ = (
+        db.Index('ix_subscriptions_following_channel', 'following_channel'),
+    )
+
     follower_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     following_channel = db.Column(db.String(100), primary_key=True)
 
 
 class VideoLike(db.Model):
     __tablename__ = 'video_likes'
+    # 기본키가 (user_id, video_id)라서 비디오 기준 조회(삭제 cascade, 카운터 재계산)용 인덱스 별도
+    __table_args__ = (
+        db.Index('ix_video_likes_video_id', 'video_id'),
+    )
 
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), primary_key=True)
@@ -63,6 +100,9 @@ class VideoLike(db.Model):
 
 class VideoDislike(db.Model):
     __tablename__ = 'video_dislikes'
+    __table_args__ = (
+        db.Index('ix_video_dislikes_video_id', 'video_id'),
+    )
 
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), primary_key=True)
@@ -70,6 +110,12 @@ class VideoDislike(db.Model):
 
 class Comment(db.Model):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # 비디오별 최신순 댓글 목록 ((created_at, id) keyset 페이지네이션)
+        db.Index('ix_comments_video_id_created_at_id', 'video_id', 'created_at', 'id'),
+        # 회원탈퇴 시 작성한 댓글 삭제
+        db.Index('ix_comments_user_id', 'user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False)
@@ -77,3 +123,67 @@ class Comment(db.Model):
     username = db.Column(db.String(80), nullable=False)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=get_kst_now)
+
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    __table_args__ = (
+        db.Index('ix_upload_sessions_user_id', 'user_id'),
+        # 오래된 세션 정리 (cleanup-uploads)
+        db.Index('ix_upload_sessions_updated_at', 'updated_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    filename = db.Column(db.String(200), nullable=False)  # 완료 후 저장될 파일명
+    original_name = db.Column(db.String(200), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    received = db.Column(db.BigInteger, nullable=False, default=0)  # 지금까지 받은 바이트 (다음 청크 시작 오프셋)
+    checksum = db.Column(db.String(64))  # 클라이언트가 보낸 SHA-256 (선택)
+    storage_upload_id = db.Column(db.String(200))  # 저장소 멀티파트 업로드 id (데이터 없이 완료할 세션은 NULL)
+    parts = db.Column(db.Text)  # 받은 파트 [[번호, ETag], ...] (JSON)
+    created_at = db.Column(db.DateTime, default=get_kst_now)
+    updated_at = db.Column(db.DateTime, default=get_kst_now)
+
+
+class Job(db.Model):
+    """백그라운드 작업 큐 (jobs.JobQueue)"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # 실행할 작업 가져오기 (상태별로 실행 시각이 지난 것부터)
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+        # 같은 작업 중복 예약 확인
+        db.Index('ix_jobs_dedupe_key', 'dedupe_key'),
+        # 보관 기간이 지난 완료 작업 삭제
+        db.Index('ix_jobs_status_updated_at', 'status', 'updated_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text)  # 핸들러 인자 (JSON)
+    dedupe_key = db.Column(db.String(200))  # 아직 끝나지 않은 같은 키의 작업이 있으면 새로 만들지 않음
+    status = db.Column(db.String(20), nullable=False)  # queued/running/done/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=get_kst_now)  # 재시도 대기 중이면 다음 실행 시각
+    locked_by = db.Column(db.String(100))  # 실행 중인 워커 (호스트:pid)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=get_kst_now)
+    updated_at = db.Column(db.DateTime, default=get_kst_now)
+
+
+class Blob(db.Model):
+    """내용 주소 저장소의 파일 (blobs.BlobStore)"""
+    __tablename__ = 'blobs'
+    __table_args__ = (
+        # GC: 참조가 없어진 지 오래된 블롭 찾기
+        db.Index('ix_blobs_refcount_unreferenced_at', 'refcount', 'unreferenced_at'),
+    )
+
+    digest = db.Column(db.String(64), primary_key=True)  # 내용의 SHA-256 (hex)
+    ext = db.Column(db.String(10), nullable=False)  # 처음 저장할 때의 확장자 (mimetype 판별용)
+    size = db.Column(db.BigInteger, nullable=False)
+    refcount = db.Column(db.Integer, nullable=False, default=0)  # 이 블롭을 가리키는 Video/User 컬럼 수
+    created_at = db.Column(db.DateTime, default=get_kst_now)
+    unreferenced_at = db.Column(db.DateTime)  # refcount가 0이 된 시각 (GC 유예 시간 기준)
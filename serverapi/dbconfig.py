@@ -0,0 +1,163 @@
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.expression import UpdateBase, TextClause
+
+# 읽기 전용 연결 풀의 bind 키 (SQLALCHEMY_BINDS)
+READ_BIND = 'reader'
+
+# 연결마다 적용하는 SQLite 설정
+DEFAULT_SQLITE_PRAGMAS = {
+    # 쓰기 중에도 읽기가 막히지 않도록 WAL 사용 (DB 파일에 영구 저장됨)
+    'journal_mode': 'WAL',
+    # WAL에서는 NORMAL로도 손상 없이 안전하고, 커밋마다 fsync 하지 않음
+    'synchronous': 'NORMAL',
+    # 잠금이 풀릴 때까지 기다리는 시간(ms), 바로 "database is locked" 를 내지 않음
+    'busy_timeout': 5000,
+    # 페이지 캐시 64MB (음수는 KiB 단위)
+    'cache_size': -64000,
+    # 256MB까지 메모리 매핑으로 읽기
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+_WRITER_KEY = 'use_writer'
+
+
+def normalize_url(uri):
+    """postgres:// 형식(Heroku 등)을 SQLAlchemy가 인식하는 postgresql:// 로 변환"""
+    if uri.startswith('postgres://'):
+        return 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def is_sqlite_file(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def configure_database(app):
+    """엔진 옵션 설정 (db.init_app 전에 호출)
+
+    PostgreSQL인 경우 연결 풀 크기, pool_pre_ping, 문장 타임아웃 등을 설정하고,
+    SQLite 파일 DB인 경우:
+    - 쓰기는 연결이 하나뿐인 기본 엔진으로 보내 프로세스 안에서 직렬화하고
+      (SQLite는 어차피 한 번에 하나만 쓸 수 있으므로 잠금 경쟁 대신 풀에서 대기)
+    - 읽기는 여러 연결을 가진 'reader' 엔진으로 보내 WAL 덕분에 쓰기와 동시에 처리합니다.
+    """
+    app.config.setdefault('SQLITE_TUNING', True)
+    app.config.setdefault('SQLITE_PRAGMAS', dict(DEFAULT_SQLITE_PRAGMAS))
+    app.config.setdefault('SQLITE_READ_POOL_SIZE', 16)
+    app.config.setdefault('SQLITE_READ_POOL_OVERFLOW', 16)
+    app.config.setdefault('SQLITE_WRITE_TIMEOUT', 30)
+
+    uri = normalize_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    if make_url(uri).get_backend_name() == 'postgresql':
+        configure_postgres(app)
+
+    app.config['SQLITE_READ_WRITE_SPLIT'] = bool(app.config['SQLITE_TUNING'] and is_sqlite_file(uri))
+    if not app.config['SQLITE_READ_WRITE_SPLIT']:
+        return
+
+    # 단일 writer 연결: 다른 스레드는 SQLITE_WRITE_TIMEOUT 초까지 풀에서 대기
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    options.setdefault('pool_size', 1)
+    options.setdefault('max_overflow', 0)
+    options.setdefault('pool_timeout', app.config['SQLITE_WRITE_TIMEOUT'])
+
+    binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+    binds.setdefault(READ_BIND, {
+        'url': uri,
+        'pool_size': app.config['SQLITE_READ_POOL_SIZE'],
+        'max_overflow': app.config['SQLITE_READ_POOL_OVERFLOW'],
+        'pool_timeout': app.config['SQLITE_WRITE_TIMEOUT'],
+    })
+
+
+def configure_postgres(app):
+    """여러 API 프로세스가 하나의 PostgreSQL을 공유할 때의 연결 풀 설정"""
+    app.config.setdefault('DB_POOL_SIZE', 10)
+    app.config.setdefault('DB_MAX_OVERFLOW', 20)
+    app.config.setdefault('DB_POOL_TIMEOUT', 30)
+    # 서버/프록시가 오래된 연결을 끊기 전에 교체 (초)
+    app.config.setdefault('DB_POOL_RECYCLE', 1800)
+    # 한 문장이 이 시간(ms)을 넘으면 서버에서 취소
+    app.config.setdefault('DB_STATEMENT_TIMEOUT', 15000)
+    # 시간대 없는 DateTime 컬럼에 KST 시각이 그대로 저장되도록 세션 시간대 지정
+    app.config.setdefault('DB_TIMEZONE', 'Asia/Seoul')
+
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    options.setdefault('pool_size', app.config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', app.config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', app.config['DB_POOL_RECYCLE'])
+    # 끊긴 연결을 사용 전에 확인해서 DB 재시작/페일오버 후에도 요청이 실패하지 않도록
+    options.setdefault('pool_pre_ping', True)
+
+    connect_args = options.setdefault('connect_args', {})
+    connect_args.setdefault('options', (
+        f"-c statement_timeout={int(app.config['DB_STATEMENT_TIMEOUT'])} "
+        f"-c timezone={app.config['DB_TIMEZONE']}"
+    ))
+
+
+def install_pragmas(app, db):
+    """SQLite 엔진에 연결마다 PRAGMA를 적용하는 이벤트 등록 (db.init_app 후에 호출)"""
+    if not app.config['SQLITE_TUNING']:
+        return
+    pragmas = app.config['SQLITE_PRAGMAS']
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', set_pragmas)
+
+
+def is_write(clause):
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(('SELECT', 'WITH', 'EXPLAIN', 'PRAGMA'))
+    return False
+
+
+class RoutingSession(Session):
+    """읽기는 reader 풀로, 쓰기(flush, INSERT/UPDATE/DELETE)는 기본 엔진(writer)으로 보내는 세션
+
+    트랜잭션 안에서 한 번 쓰기를 하면 커밋/롤백 전까지는 읽기도 writer에서 실행해서
+    아직 커밋되지 않은 자기 변경을 볼 수 있게 합니다.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and current_app.config.get('SQLITE_READ_WRITE_SPLIT'):
+            if self.info.get(_WRITER_KEY) or self._flushing or is_write(clause):
+                self.info[_WRITER_KEY] = True
+            else:
+                return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        try:
+            super().commit()
+        finally:
+            self.info.pop(_WRITER_KEY, None)
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self.info.pop(_WRITER_KEY, None)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.info.pop(_WRITER_KEY, None)
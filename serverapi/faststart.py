@@ -0,0 +1,158 @@
+import os
+import shutil
+import struct
+import subprocess
+
+from probe import MP4_EXTENSIONS, MAX_MOOV_SIZE, CONTAINER_BOXES, iter_boxes, moov_position
+
+COPY_BUFFER_SIZE = 1024 * 1024
+# ffmpeg 출력 형식 (확장자 기준)
+FFMPEG_FORMATS = {'mp4': 'mp4', 'm4v': 'mp4', 'mov': 'mov'}
+
+
+class Unsupported(Exception):
+    """파이썬으로 moov를 옮길 수 없는 파일 (압축된 moov, 조각난 MP4, 4GB를 넘는 stco 오프셋 등)"""
+
+
+def patch_chunk_offsets(moov, start, end):
+    """moov 박스(bytearray) 안의 모든 stco/co64 청크 오프셋 중 start 이상 end 미만인 값에 len(moov)를 더함"""
+    delta = len(moov)
+
+    def walk(offset, limit):
+        while offset + 8 <= limit:
+            size, kind = struct.unpack_from('>I4s', moov, offset)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', moov, offset + 8)[0]
+                header_size = 16
+            elif size == 0:
+                size = limit - offset
+            if size < header_size or offset + size > limit:
+                raise Unsupported('moov 박스가 손상되었습니다.')
+            body = offset + header_size
+            if kind == b'cmov':
+                raise Unsupported('압축된 moov는 지원하지 않습니다.')
+            if kind in CONTAINER_BOXES:
+                walk(body, offset + size)
+            elif kind in (b'stco', b'co64'):
+                count = struct.unpack_from('>I', moov, body + 4)[0]
+                fmt, width = ('>I', 4) if kind == b'stco' else ('>Q', 8)
+                if body + 8 + count * width > offset + size:
+                    raise Unsupported('청크 오프셋 표가 손상되었습니다.')
+                for i in range(count):
+                    position = body + 8 + i * width
+                    value = struct.unpack_from(fmt, moov, position)[0]
+                    if start <= value < end:
+                        value += delta
+                        if kind == b'stco' and value > 0xFFFFFFFF:
+                            raise Unsupported('32비트 청크 오프셋을 넘습니다.')
+                        struct.pack_into(fmt, moov, position, value)
+            offset += size
+
+    # moov 박스 헤더 다음부터
+    header_size = 16 if struct.unpack_from('>I', moov, 0)[0] == 1 else 8
+    walk(header_size, len(moov))
+
+
+def copy_range(src, dst, offset, length):
+    src.seek(offset)
+    remaining = length
+    while remaining > 0:
+        data = src.read(min(COPY_BUFFER_SIZE, remaining))
+        if not data:
+            raise Unsupported('파일이 예상보다 짧습니다.')
+        dst.write(data)
+        remaining -= len(data)
+
+
+def relocate_moov(src_path, dst_path):
+    """moov 박스를 첫 mdat 앞으로 옮긴 사본을 dst_path에 기록 (qt-faststart와 같은 방식)
+
+    옮겨진 구간을 가리키는 청크 오프셋(stco/co64)만 moov 크기만큼 늘리고 나머지 바이트는 그대로
+    복사하므로 재인코딩/재다중화 없이 원본과 같은 내용입니다.
+    이미 moov가 앞에 있거나 moov/mdat이 없으면 False.
+    """
+    file_size = os.path.getsize(src_path)
+    with open(src_path, 'rb') as src:
+        boxes = list(iter_boxes(src, 0, file_size))
+        kinds = [kind for kind, _, _, _ in boxes]
+        if b'moov' not in kinds or b'mdat' not in kinds:
+            return False
+        if b'moof' in kinds:
+            raise Unsupported('조각난(fragmented) MP4는 지원하지 않습니다.')
+        _, moov_offset, _, moov_size = boxes[kinds.index(b'moov')]
+        _, insert_at, _, _ = boxes[kinds.index(b'mdat')]
+        if moov_offset < insert_at:
+            return False
+        if moov_size > MAX_MOOV_SIZE or moov_offset + moov_size > file_size:
+            raise Unsupported('moov 박스가 너무 크거나 잘렸습니다.')
+
+        src.seek(moov_offset)
+        moov = bytearray(src.read(moov_size))
+        # insert_at ~ moov 앞까지의 데이터가 moov 크기만큼 뒤로 밀림
+        patch_chunk_offsets(moov, insert_at, moov_offset)
+
+        with open(dst_path, 'wb') as dst:
+            copy_range(src, dst, 0, insert_at)
+            dst.write(moov)
+            copy_range(src, dst, insert_at, moov_offset - insert_at)
+            copy_range(src, dst, moov_offset + moov_size, file_size - moov_offset - moov_size)
+    return True
+
+
+class FaststartRemuxer:
+    """moov(색인)가 파일 끝에 있는 MP4/MOV를 moov가 앞에 오도록 다시 저장 (재인코딩 없음)
+
+    브라우저가 파일 끝까지 레인지 요청을 보내지 않고 바로 재생을 시작할 수 있습니다.
+    먼저 파이썬으로 moov만 옮기고(relocate_moov), 그렇게 할 수 없는 파일은
+    `ffmpeg -c copy -movflags +faststart`로 다시 씁니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # 업로드 분석에서 moov가 뒤에 있으면 바로 변환 작업 예약
+        app.config.setdefault('FASTSTART_ON_UPLOAD', True)
+        app.config.setdefault('FASTSTART_FFMPEG', 'ffmpeg')
+        app.config.setdefault('FASTSTART_TIMEOUT', 3600)
+        # faststart-videos 명령에서 동시에 변환할 파일 수
+        app.config.setdefault('FASTSTART_WORKERS', 2)
+
+        self.app = app
+        app.extensions['faststart_remuxer'] = self
+
+    @staticmethod
+    def supports(filename):
+        return filename.rsplit('.', 1)[-1].lower() in MP4_EXTENSIONS
+
+    def remux(self, src, dst, ext):
+        """src를 faststart로 다시 쓴 파일을 dst에 만들고 True (이미 moov가 앞에 있으면 False)"""
+        try:
+            if not relocate_moov(src, dst):
+                return False
+        except Unsupported as e:
+            print(f"Faststart: {os.path.basename(src)}: {e}, ffmpeg로 다시 저장합니다.")
+            self._ffmpeg(src, dst, ext)
+
+        # 결과 확인: moov가 앞에 있어야 함
+        with open(dst, 'rb') as f:
+            at_start, _ = moov_position(f, os.path.getsize(dst))
+        if not at_start:
+            raise RuntimeError(f'faststart 변환 결과가 올바르지 않습니다: {src}')
+        return True
+
+    def _ffmpeg(self, src, dst, ext):
+        tmp = f'{dst}.ffmpeg'
+        try:
+            subprocess.run([
+                self.app.config['FASTSTART_FFMPEG'], '-y', '-v', 'error', '-i', src,
+                '-map', '0:v', '-map', '0:a?', '-c', 'copy', '-movflags', '+faststart',
+                '-f', FFMPEG_FORMATS.get(ext.lower(), 'mp4'), tmp,
+            ], check=True, capture_output=True, timeout=self.app.config['FASTSTART_TIMEOUT'])
+            shutil.move(tmp, dst)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
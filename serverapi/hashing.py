@@ -0,0 +1,91 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+HASH_METHOD = 'pbkdf2:sha256'
+
+
+class HasherBusy(Exception):
+    """해싱 대기열이 가득 참 (클라이언트에 503으로 응답)"""
+
+
+def _hash(password):
+    return generate_password_hash(password, method=HASH_METHOD)
+
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    """비밀번호 해싱/검증을 별도 프로세스 풀에서 실행
+
+    pbkdf2 계산이 요청 스레드를 점유하지 않도록 CPU 코어 수만큼의 프로세스에서 처리하고,
+    대기 중인 작업이 HASH_MAX_PENDING 개를 넘으면 기다리지 않고 HasherBusy를 발생시켜
+    로그인 폭주 중에도 스트리밍/목록 요청이 밀리지 않게 합니다.
+    HASH_WORKERS = 0 이면 풀 없이 요청 스레드에서 바로 계산합니다 (개발/테스트용).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.slots = None
+        self.timeout = 10
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('HASH_WORKERS', os.cpu_count() or 1)
+        app.config.setdefault('HASH_MAX_PENDING', app.config['HASH_WORKERS'] * 4)
+        app.config.setdefault('HASH_TIMEOUT', 10)
+
+        self.app = app
+        self.timeout = app.config['HASH_TIMEOUT']
+        self.slots = threading.BoundedSemaphore(max(1, app.config['HASH_MAX_PENDING']))
+        app.extensions['password_hasher'] = self
+
+    def _executor(self):
+        # 첫 사용 시 생성, 스레드가 떠 있는 서버 프로세스를 fork 하지 않도록 spawn 사용
+        # (spawn은 실행 중인 스크립트를 다시 import 하므로 스크립트에서 쓸 때는 __main__ 가드 필요)
+        if self.executor is None:
+            with self._lock:
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(
+                        max_workers=self.app.config['HASH_WORKERS'],
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self.executor
+
+    def _run(self, fn, *args):
+        if not self.app.config['HASH_WORKERS']:
+            return fn(*args)
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        # 슬롯은 계산이 실제로 끝날 때 반납 (시간 초과로 먼저 응답해도 풀에서는 계속 실행 중이므로)
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # 아직 시작하지 않았으면 취소 (취소되어도 done 콜백이 슬롯을 반납함)
+            future.cancel()
+            raise HasherBusy()
+
+    def hash(self, password):
+        return self._run(_hash, password)
+
+    def verify(self, pwhash, password):
+        return self._run(_verify, pwhash, password)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,196 @@
+import os
+import json
+import shutil
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from database import db, Video
+
+# 화질별 HLS 변환 설정 (높이, 비디오 비트레이트 kbps, 오디오 비트레이트 kbps)
+Rendition = namedtuple('Rendition', ['name', 'height', 'video_kbps', 'audio_kbps'])
+
+DEFAULT_LADDER = [
+    Rendition('1080p', 1080, 5000, 192),
+    Rendition('720p', 720, 2800, 128),
+    Rendition('480p', 480, 1400, 128),
+    Rendition('360p', 360, 800, 96),
+]
+
+SEGMENT_SECONDS = 6
+MASTER_PLAYLIST = 'master.m3u8'
+
+# HLS 처리 상태 (Video.hls_status)
+HLS_PENDING = 'pending'
+HLS_PROCESSING = 'processing'
+HLS_READY = 'ready'
+HLS_FAILED = 'failed'
+
+
+class FFmpegTranscoder:
+    """로컬 ffmpeg로 화질별 HLS 세그먼트를 생성"""
+
+    def __init__(self, ffmpeg='ffmpeg', ffprobe='ffprobe'):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+
+    def probe_size(self, src):
+        """원본 해상도 (width, height) 반환, 알 수 없으면 None"""
+        try:
+            out = subprocess.run(
+                [self.ffprobe, '-v', 'error', '-select_streams', 'v:0',
+                 '-show_entries', 'stream=width,height', '-of', 'json', src],
+                capture_output=True, check=True, timeout=60
+            ).stdout
+            stream = json.loads(out)['streams'][0]
+            return int(stream['width']), int(stream['height'])
+        except Exception:
+            return None
+
+    def transcode(self, src, out_dir, rendition):
+        os.makedirs(out_dir, exist_ok=True)
+        subprocess.run([
+            self.ffmpeg, '-y', '-v', 'error', '-i', src,
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-vf', f'scale=-2:{rendition.height}',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main',
+            '-b:v', f'{rendition.video_kbps}k',
+            '-maxrate', f'{int(rendition.video_kbps * 1.07)}k',
+            '-bufsize', f'{int(rendition.video_kbps * 1.5)}k',
+            # 세그먼트 경계와 키프레임을 맞춰서 화질 전환이 매끄럽도록
+            '-force_key_frames', f'expr:gte(t,n_forced*{SEGMENT_SECONDS})',
+            '-sc_threshold', '0',
+            '-c:a', 'aac', '-b:a', f'{rendition.audio_kbps}k', '-ac', '2',
+            '-hls_time', str(SEGMENT_SECONDS),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(out_dir, 'seg_%05d.ts'),
+            os.path.join(out_dir, 'index.m3u8'),
+        ], check=True, capture_output=True)
+
+
+class StubTranscoder:
+    """ffmpeg 없이 동작하는 가짜 변환기 (테스트/개발용)
+
+    원본을 실제로 인코딩하지 않고 재생목록과 더미 세그먼트만 만듭니다.
+    """
+
+    def probe_size(self, src):
+        return (1920, 1080)
+
+    def transcode(self, src, out_dir, rendition):
+        os.makedirs(out_dir, exist_ok=True)
+        with open(os.path.join(out_dir, 'seg_00000.ts'), 'wb') as f:
+            f.write(b'\x47' + b'\xff' * 187)
+        with open(os.path.join(out_dir, 'index.m3u8'), 'w') as f:
+            f.write(
+                '#EXTM3U\n#EXT-X-VERSION:3\n'
+                f'#EXT-X-TARGETDURATION:{SEGMENT_SECONDS}\n'
+                '#EXT-X-PLAYLIST-TYPE:VOD\n'
+                f'#EXTINF:{SEGMENT_SECONDS}.0,\nseg_00000.ts\n'
+                '#EXT-X-ENDLIST\n'
+            )
+
+
+TRANSCODERS = {
+    'ffmpeg': FFmpegTranscoder,
+    'stub': StubTranscoder,
+}
+
+
+class HlsPackager:
+    """업로드된 비디오를 백그라운드에서 HLS(적응형 비트레이트)로 패키징
+
+    결과물은 HLS_FOLDER/<video_id>/ 아래에 화질별 디렉토리와 master.m3u8로 저장됩니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.transcoder = None
+        self.ladder = DEFAULT_LADDER
+        # 상태가 바뀐 뒤 호출할 함수 목록 (video를 인자로 받음)
+        self.status_listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('HLS_FOLDER', os.path.join(app.root_path, 'uploads/hls'))
+        app.config.setdefault('HLS_TRANSCODER', 'ffmpeg')
+        app.config.setdefault('HLS_WORKERS', 1)
+
+        self.app = app
+        transcoder = app.config['HLS_TRANSCODER']
+        self.transcoder = TRANSCODERS[transcoder]() if isinstance(transcoder, str) else transcoder
+        self.executor = ThreadPoolExecutor(max_workers=app.config['HLS_WORKERS'],
+                                           thread_name_prefix='hls')
+        os.makedirs(app.config['HLS_FOLDER'], exist_ok=True)
+        app.extensions['hls_packager'] = self
+
+    def video_dir(self, video_id):
+        return os.path.join(self.app.config['HLS_FOLDER'], str(video_id))
+
+    def submit(self, video_id, src_path):
+        """패키징 작업 예약 (요청 스레드는 바로 반환)"""
+        return self.executor.submit(self._run, video_id, src_path)
+
+    def delete(self, video_id):
+        shutil.rmtree(self.video_dir(video_id), ignore_errors=True)
+
+    def _set_status(self, video_id, status):
+        video = db.session.get(Video, video_id)
+        if video is not None:
+            video.hls_status = status
+            db.session.commit()
+            for listener in self.status_listeners:
+                listener(video)
+        return video
+
+    def _run(self, video_id, src_path):
+        try:
+            self.process(video_id, src_path)
+        except Exception:
+            pass
+
+    def process(self, video_id, src_path, size=None):
+        """패키징 실행 후 상태 기록 (실패하면 failed로 표시하고 예외를 다시 발생, 작업 큐 재시도용)
+
+        size: 이미 알고 있는 원본 (width, height) (없으면 변환기로 확인)
+        """
+        with self.app.app_context():
+            if self._set_status(video_id, HLS_PROCESSING) is None:
+                return
+            try:
+                self.package(video_id, src_path, size)
+            except Exception as e:
+                print(f"HLS Packaging Error (video {video_id}): {e}")
+                db.session.rollback()
+                self._set_status(video_id, HLS_FAILED)
+                raise
+            self._set_status(video_id, HLS_READY)
+
+    def package(self, video_id, src_path, size=None):
+        """화질별 세그먼트 + master.m3u8 생성 (임시 디렉토리에서 만든 뒤 교체)"""
+        final_dir = self.video_dir(video_id)
+        work_dir = final_dir + '.tmp'
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+        if size is None:
+            size = self.transcoder.probe_size(src_path)
+        src_width, src_height = size if size else (1920, 1080)
+
+        # 원본보다 높은 화질은 만들지 않음 (최소 1개는 유지)
+        renditions = [r for r in self.ladder if r.height <= src_height] or [self.ladder[-1]]
+
+        lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+        for rendition in renditions:
+            self.transcoder.transcode(src_path, os.path.join(work_dir, rendition.name), rendition)
+            width = int(src_width * rendition.height / src_height) // 2 * 2
+            bandwidth = (rendition.video_kbps + rendition.audio_kbps) * 1000
+            lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{rendition.height}')
+            lines.append(f'{rendition.name}/index.m3u8')
+
+        with open(os.path.join(work_dir, MASTER_PLAYLIST), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.rename(work_dir, final_dir)
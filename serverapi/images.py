@@ -0,0 +1,271 @@
+import os
+import json
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+from flask import request, send_from_directory
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+from cache import TTLCache
+from storage import create_storage, redirect_response
+
+# 폴더(설정 이름)별로 만들어 두는 변형 너비 (px)
+DEFAULT_WIDTHS = {
+    'THUMBNAIL_FOLDER': (320, 640, 1280),
+    'PROFILE_FOLDER': (48, 96, 256),
+    'BANNER_FOLDER': (640, 1280, 2560),
+}
+
+# w= 없이 요청했을 때 보내는 너비 (홈 그리드 썸네일, 헤더/사이드바 아바타, 채널 배너)
+DEFAULT_SIZES = {
+    'THUMBNAIL_FOLDER': 640,
+    'PROFILE_FOLDER': 96,
+    'BANNER_FOLDER': 1280,
+}
+
+# 형식 -> (확장자, mimetype)
+FORMATS = {
+    'webp': ('webp', 'image/webp'),
+    'jpeg': ('jpg', 'image/jpeg'),
+}
+
+# 업로드 파일명에 시각이 들어가서 같은 URL의 내용은 바뀌지 않음
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# 아직 변형을 만들기 전이라 원본을 보내는 경우 (곧 변형으로 바뀜)
+PENDING_MAX_AGE = 300
+PENDING = f'public, max-age={PENDING_MAX_AGE}'
+
+# 원격 저장소의 변형 존재 여부 캐시 (있음: 변형은 지워질 때까지 그대로, 없음: 곧 만들어질 수 있음)
+EXISTS_TTL = 3600
+MISSING_TTL = 60
+
+
+class PillowResizer:
+    """Pillow로 크기 조정/인코딩"""
+
+    def size(self, src):
+        with Image.open(src) as image:
+            return ImageOps.exif_transpose(image).size
+
+    def resize(self, src, dst, width, fmt, quality):
+        with Image.open(src) as image:
+            # 휴대폰 사진의 EXIF 회전 정보를 픽셀에 반영 (변형에는 EXIF를 남기지 않음)
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            if fmt == 'jpeg':
+                image = image.convert('RGB')
+                image.save(dst, format='JPEG', quality=quality, optimize=True, progressive=True)
+            else:
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                image.save(dst, format='WEBP', quality=quality, method=4)
+
+
+class FFmpegResizer:
+    """Pillow가 없을 때 ffmpeg로 크기 조정/인코딩"""
+
+    def __init__(self, ffmpeg='ffmpeg', ffprobe='ffprobe'):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+
+    def size(self, src):
+        out = subprocess.run(
+            [self.ffprobe, '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=width,height', '-of', 'json', src],
+            capture_output=True, check=True, timeout=60
+        ).stdout
+        stream = json.loads(out)['streams'][0]
+        return int(stream['width']), int(stream['height'])
+
+    def resize(self, src, dst, width, fmt, quality):
+        if fmt == 'jpeg':
+            # -q:v 2(최고) ~ 31(최저)
+            codec = ['-c:v', 'mjpeg', '-q:v', str(round(2 + (100 - quality) * 29 / 100))]
+        else:
+            codec = ['-c:v', 'libwebp', '-quality', str(quality)]
+        subprocess.run([
+            self.ffmpeg, '-y', '-v', 'error', '-i', src, '-frames:v', '1',
+            '-vf', f"scale='min({width},iw)':-2", *codec, '-f', 'image2', dst,
+        ], check=True, capture_output=True, timeout=120)
+
+
+class ImagePipeline:
+    """썸네일/프로필/배너 이미지의 너비별 WebP/JPEG 변형 생성과 제공
+
+    변형은 저장소의 <폴더>/<파일명>.<너비>.<webp|jpg> 에 저장합니다
+    (STORAGE_BACKEND가 local이면 IMAGE_VARIANTS_FOLDER 아래, s3면 버킷의 variants/ 아래).
+    요청의 w= 보다 크거나 같은 가장 작은 변형을 고르고, Accept에 image/webp가 있으면 WebP를 보냅니다.
+    아직 변형이 없으면 원본을 짧은 캐시로 보냅니다. 원격 저장소면 파일 대신 presign URL로 302를 보냅니다.
+    store(BlobStore)를 주면 원본 경로를 저장소에서 찾고, 블롭 이름의 변형은 해시 앞자리로 나눈 하위 디렉토리에 둡니다.
+    IMAGE_BACKEND: 'auto' (Pillow가 설치되어 있으면 pillow, 아니면 ffmpeg) | 'pillow' | 'ffmpeg'
+    """
+
+    def __init__(self, app=None, store=None):
+        self.app = None
+        self.resizer = None
+        self.store = store
+        self.storage = None
+        # 원격 저장소의 변형 키 -> 존재 여부 (요청마다 HEAD를 보내지 않도록)
+        self._exists = TTLCache(maxsize=10000, ttl=EXISTS_TTL)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_VARIANTS_FOLDER', os.path.join(app.root_path, 'uploads/variants'))
+        app.config.setdefault('IMAGE_WIDTHS', dict(DEFAULT_WIDTHS))
+        app.config.setdefault('IMAGE_DEFAULT_WIDTHS', dict(DEFAULT_SIZES))
+        app.config.setdefault('IMAGE_QUALITY', 80)
+        app.config.setdefault('IMAGE_BACKEND', 'auto')
+        app.config.setdefault('IMAGE_FFMPEG', 'ffmpeg')
+        app.config.setdefault('IMAGE_FFPROBE', 'ffprobe')
+        # 대표 이미지를 뽑을 위치 (초), 영상이 더 짧으면 첫 프레임
+        app.config.setdefault('IMAGE_POSTER_AT', 1.0)
+
+        self.app = app
+        backend = app.config['IMAGE_BACKEND']
+        if backend == 'auto':
+            backend = 'pillow' if Image is not None else 'ffmpeg'
+        if backend == 'pillow':
+            if Image is None:
+                raise RuntimeError("IMAGE_BACKEND='pillow'를 사용하려면 Pillow 패키지가 필요합니다.")
+            self.resizer = PillowResizer()
+        elif backend == 'ffmpeg':
+            self.resizer = FFmpegResizer(app.config['IMAGE_FFMPEG'], app.config['IMAGE_FFPROBE'])
+        else:
+            self.resizer = backend
+        self.storage = create_storage(app, app.config['IMAGE_VARIANTS_FOLDER'], 'variants/')
+        # 만드는 중인 변형 (로컬 저장소면 rename으로 옮길 수 있도록 같은 파일시스템에 둠)
+        app.config.setdefault('IMAGE_TMP_FOLDER', os.path.join(app.config['IMAGE_VARIANTS_FOLDER'], 'tmp'))
+        os.makedirs(app.config['IMAGE_TMP_FOLDER'], exist_ok=True)
+        app.extensions['image_pipeline'] = self
+
+    # ========== 생성 ==========
+
+    @contextmanager
+    def source_file(self, folder, filename):
+        """원본 이미지의 로컬 경로 (원격 저장소면 내려받은 임시 파일, 없으면 None)"""
+        if self.store is not None:
+            with self.store.local_file(folder, filename) as path:
+                yield path
+            return
+        path = os.path.join(self.app.config[folder], os.path.basename(filename))
+        yield path if os.path.isfile(path) else None
+
+    def variant_key(self, folder, filename, width, fmt):
+        name = os.path.basename(filename)
+        if self.store is not None:
+            name = self.store.shard(name)
+        return f'{os.path.basename(self.app.config[folder])}/{name}.{width}.{FORMATS[fmt][0]}'
+
+    def generate(self, folder, filename):
+        """원본에서 너비별 변형 생성 (이미 있는 것은 건너뜀), 새로 만든 파일 수 반환
+
+        원본보다 큰 너비는 원본 크기로 하나만 만듭니다.
+        """
+        with self.source_file(folder, filename) as src:
+            if src is None:
+                return 0
+            src_width, _ = self.resizer.size(src)
+
+            widths = []
+            for width in sorted(self.app.config['IMAGE_WIDTHS'][folder]):
+                widths.append(width)
+                if width >= src_width:
+                    break
+
+            created = 0
+            for width in widths:
+                for fmt in FORMATS:
+                    key = self.variant_key(folder, filename, width, fmt)
+                    if self.storage.exists(key):
+                        continue
+                    # 다 만들어진 파일만 보이도록 임시 파일에 쓴 뒤 저장
+                    fd, tmp = tempfile.mkstemp(dir=self.app.config['IMAGE_TMP_FOLDER'], suffix=f'.{FORMATS[fmt][0]}')
+                    os.close(fd)
+                    try:
+                        self.resizer.resize(src, tmp, width, fmt, self.app.config['IMAGE_QUALITY'])
+                        self.storage.put_file(key, tmp, content_type=FORMATS[fmt][1], cache_control=IMMUTABLE)
+                    finally:
+                        if os.path.exists(tmp):
+                            os.remove(tmp)
+                    self._exists.delete(key)
+                    created += 1
+            return created
+
+    def delete_variants(self, folder, filename):
+        if folder not in self.app.config['IMAGE_WIDTHS']:
+            return
+        for width in self.app.config['IMAGE_WIDTHS'][folder]:
+            for fmt in FORMATS:
+                key = self.variant_key(folder, filename, width, fmt)
+                self.storage.delete(key)
+                self._exists.delete(key)
+
+    def extract_poster(self, video_path, dst):
+        """ffmpeg로 비디오의 대표 프레임을 JPEG로 저장"""
+        tmp = f'{dst}.tmp.jpg'
+        for at in (self.app.config['IMAGE_POSTER_AT'], 0):
+            subprocess.run([
+                self.app.config['IMAGE_FFMPEG'], '-y', '-v', 'error', '-ss', str(at), '-i', video_path,
+                '-frames:v', '1', '-q:v', '2', tmp,
+            ], check=True, capture_output=True, timeout=120)
+            # 영상이 IMAGE_POSTER_AT 보다 짧으면 출력이 없으므로 처음 프레임으로 다시 시도
+            if os.path.exists(tmp) and os.path.getsize(tmp) > 0:
+                os.replace(tmp, dst)
+                return dst
+        raise RuntimeError(f'대표 이미지를 추출하지 못했습니다: {video_path}')
+
+    # ========== 제공 ==========
+
+    def exists(self, key):
+        if not self.storage.remote:
+            return self.storage.exists(key)
+        exists = self._exists.get(key)
+        if exists is None:
+            exists = self.storage.exists(key)
+            self._exists.set(key, exists, ttl=None if exists else MISSING_TTL)
+        return exists
+
+    def select(self, folder, filename, width, fmt):
+        """요청 너비 이상인 가장 작은 변형 키 (없으면 가장 큰 변형, 하나도 없으면 None)"""
+        largest = None
+        for candidate in sorted(self.app.config['IMAGE_WIDTHS'].get(folder, ())):
+            key = self.variant_key(folder, filename, candidate, fmt)
+            if not self.exists(key):
+                continue
+            if candidate >= width:
+                return key
+            largest = key
+        return largest
+
+    def serve(self, folder, filename):
+        """w= 와 Accept 헤더에 맞는 변형 응답 (변형이 없으면 원본)"""
+        width = request.args.get('w', type=int) or self.app.config['IMAGE_DEFAULT_WIDTHS'].get(folder, 0)
+        # image/* 만 보내는 구형 브라우저는 WebP를 못 읽을 수 있으므로 명시한 경우에만
+        fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+
+        key = self.select(folder, filename, width, fmt)
+        if key is not None and self.storage.remote:
+            response = redirect_response(self.storage.url(key), self.storage.url_expires)
+        elif key is not None:
+            path = self.storage.path(key)
+            response = send_from_directory(os.path.dirname(path), os.path.basename(path),
+                                           mimetype=FORMATS[fmt][1])
+            response.headers['Cache-Control'] = IMMUTABLE
+        else:
+            url = self.store.url(filename) if self.store is not None else None
+            if url is not None:
+                response = redirect_response(url, self.store.storage.url_expires, max_age=PENDING_MAX_AGE)
+            else:
+                src = (self.store.local_path(folder, filename) if self.store is not None
+                       else os.path.join(self.app.config[folder], os.path.basename(filename)))
+                response = send_from_directory(os.path.dirname(src), os.path.basename(src))
+                response.headers['Cache-Control'] = PENDING
+        response.vary.add('Accept')
+        return response
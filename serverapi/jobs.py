@@ -0,0 +1,245 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import event, update, delete, select
+
+from database import db, Job, get_kst_now
+
+# 작업 상태 (Job.status)
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# 커밋되면 로컬 워커를 깨울지 표시하는 session.info 키
+_ENQUEUED_KEY = 'jobs_enqueued'
+
+
+class JobQueue:
+    """DB(jobs 테이블)에 저장되는 백그라운드 작업 큐
+
+    요청은 enqueue()로 작업을 세션에 추가하고 자신의 변경과 함께 커밋하므로,
+    DB 변경이 커밋되면 후속 작업(파일 삭제, HLS 패키징 등)도 반드시 남습니다.
+    워커는 조건부 UPDATE로 작업을 하나씩 가져가므로 여러 프로세스가 동시에 실행해도
+    같은 작업을 두 번 가져가지 않습니다.
+
+    - 실패하면 JOB_RETRY_DELAY * 2^(시도-1) 초 뒤 다시 시도하고, max_attempts번 실패하면 failed
+    - 워커가 실행 중에 죽으면 JOB_LOCK_TIMEOUT 초 뒤 다른 워커가 다시 가져감
+      (그래서 핸들러는 여러 번 실행되어도 결과가 같도록 작성해야 함)
+    - JOB_LOCAL_WORKERS 개의 스레드가 API 프로세스 안에서 작업을 처리하고,
+      0으로 두면 별도 프로세스(`flask --app app jobs-worker`)에서만 처리합니다.
+    - 끝난(done/failed) 작업은 JOB_RETENTION_DAYS 일이 지나면 워커가 한가할 때
+      JOB_PRUNE_INTERVAL 초마다 지웁니다 (`flask --app app prune-jobs`로 바로 실행 가능).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.handlers = {}
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pruned_at = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOB_LOCAL_WORKERS', 1)
+        app.config.setdefault('JOB_MAX_ATTEMPTS', 5)
+        app.config.setdefault('JOB_RETRY_DELAY', 5)
+        app.config.setdefault('JOB_LOCK_TIMEOUT', 600)
+        app.config.setdefault('JOB_POLL_INTERVAL', 2.0)
+        # 끝난 작업 보관 기간 (지나면 jobs 테이블에서 삭제, 상태 조회 API는 404)
+        app.config.setdefault('JOB_RETENTION_DAYS', 7)
+        app.config.setdefault('JOB_PRUNE_INTERVAL', 3600)
+        app.config.setdefault('JOB_PRUNE_BATCH_SIZE', 1000)
+
+        self.app = app
+        event.listen(db.session, 'after_commit', self._after_commit)
+        app.extensions['job_queue'] = self
+
+    def handler(self, kind):
+        """작업 핸들러 등록 데코레이터 (payload의 키가 키워드 인자로 전달됨)"""
+        def decorator(f):
+            self.handlers[kind] = f
+            return f
+        return decorator
+
+    # ========== 예약 ==========
+
+    def enqueue(self, kind, payload=None, dedupe_key=None, max_attempts=None, delay=None):
+        """작업을 현재 세션에 추가하고 Job 반환 (호출한 쪽에서 커밋)
+
+        dedupe_key가 같은 작업이 아직 대기/실행 중이면 새로 만들지 않고 그 작업을 반환합니다.
+        delay(초)를 주면 그 시간이 지난 뒤에 실행합니다.
+        """
+        if kind not in self.handlers:
+            raise LookupError(f'등록되지 않은 작업 종류입니다: {kind}')
+
+        if dedupe_key is not None:
+            existing = Job.query.filter(Job.dedupe_key == dedupe_key,
+                                        Job.status.in_((JOB_QUEUED, JOB_RUNNING))).first()
+            if existing is not None:
+                return existing
+
+        now = get_kst_now()
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            dedupe_key=dedupe_key,
+            status=JOB_QUEUED,
+            attempts=0,
+            max_attempts=max_attempts or self.app.config['JOB_MAX_ATTEMPTS'],
+            run_after=now + timedelta(seconds=delay) if delay else now,
+            created_at=now,
+            updated_at=now,
+        )
+        db.session.add(job)
+        db.session.info[_ENQUEUED_KEY] = True
+        self._ensure_threads()
+        return job
+
+    def _after_commit(self, session):
+        if session.info.pop(_ENQUEUED_KEY, False):
+            self._wakeup.set()
+
+    # ========== 실행 ==========
+
+    def claim(self):
+        """실행할 작업 하나를 가져와 running으로 표시 (없으면 None)"""
+        now = get_kst_now()
+        stale = now - timedelta(seconds=self.app.config['JOB_LOCK_TIMEOUT'])
+        conditions = (
+            # 실행 시각이 된 대기 작업
+            (Job.status == JOB_QUEUED, Job.run_after <= now),
+            # 워커가 죽어서 오래 running으로 남은 작업
+            (Job.status == JOB_RUNNING, Job.locked_at < stale),
+        )
+        for condition in conditions:
+            candidates = (db.session.query(Job.id).filter(*condition)
+                          .order_by(Job.run_after, Job.id).limit(5).all())
+            for (job_id,) in candidates:
+                result = db.session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, *condition)
+                    .values(status=JOB_RUNNING, locked_by=self.worker_id, locked_at=now,
+                            attempts=Job.attempts + 1, updated_at=now)
+                )
+                db.session.commit()
+                # 다른 워커가 먼저 가져갔으면 다음 후보
+                if result.rowcount == 1:
+                    return db.session.get(Job, job_id)
+        return None
+
+    def run(self, job):
+        """가져온 작업 실행 후 결과(상태) 기록"""
+        job_id = job.id
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f'등록되지 않은 작업 종류입니다: {job.kind}')
+            handler(**json.loads(job.payload or '{}'))
+        except Exception as e:
+            print(f"Job Error ({job.kind} {job_id}): {e}")
+            db.session.rollback()
+            self._finish(job_id, error=f'{type(e).__name__}: {e}')
+            return False
+        self._finish(job_id)
+        return True
+
+    def _finish(self, job_id, error=None):
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return
+        now = get_kst_now()
+        if error is None:
+            job.status = JOB_DONE
+            job.last_error = None
+        elif job.attempts >= job.max_attempts:
+            job.status = JOB_FAILED
+            job.last_error = error
+        else:
+            job.status = JOB_QUEUED
+            job.last_error = error
+            job.run_after = now + timedelta(seconds=self.app.config['JOB_RETRY_DELAY'] * 2 ** (job.attempts - 1))
+        job.locked_by = None
+        job.locked_at = None
+        job.updated_at = now
+        db.session.commit()
+
+    # ========== 정리 ==========
+
+    def prune(self, days=None):
+        """끝난 지(updated_at) days 일이 지난 done/failed 작업 삭제, 지운 개수 반환
+
+        JOB_PRUNE_BATCH_SIZE 개씩 나눠 커밋해서 쓰기 잠금을 오래 잡지 않습니다.
+        """
+        if days is None:
+            days = self.app.config['JOB_RETENTION_DAYS']
+        cutoff = get_kst_now() - timedelta(days=days)
+        finished = (Job.status.in_((JOB_DONE, JOB_FAILED)), Job.updated_at < cutoff)
+        removed = 0
+        while True:
+            batch = select(Job.id).where(*finished).limit(self.app.config['JOB_PRUNE_BATCH_SIZE'])
+            deleted = db.session.execute(
+                delete(Job).where(Job.id.in_(batch)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            removed += deleted
+            if deleted < self.app.config['JOB_PRUNE_BATCH_SIZE']:
+                return removed
+
+    def _prune_if_due(self):
+        now = time.monotonic()
+        if self._pruned_at is not None and now - self._pruned_at < self.app.config['JOB_PRUNE_INTERVAL']:
+            return
+        self._pruned_at = now
+        try:
+            self.prune()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job Prune Error: {e}")
+
+    def work(self, burst=False, stop=None):
+        """작업 처리 루프 (burst: 대기 작업이 없으면 종료), 처리한 작업 수 반환"""
+        processed = 0
+        while stop is None or not stop.is_set():
+            with self.app.app_context():
+                job = self.claim()
+                if job is not None:
+                    self.run(job)
+                    processed += 1
+                    continue
+                # 대기 작업이 없을 때 오래된 완료 작업 정리
+                self._prune_if_due()
+            if burst:
+                break
+            self._wakeup.wait(self.app.config['JOB_POLL_INTERVAL'])
+            self._wakeup.clear()
+        return processed
+
+    def _ensure_threads(self):
+        # 첫 예약 시 로컬 워커 스레드 시작 (DB 테이블이 준비되기 전에 폴링하지 않도록)
+        if self._threads or not self.app.config['JOB_LOCAL_WORKERS']:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.app.config['JOB_LOCAL_WORKERS']):
+                thread = threading.Thread(target=self._run_local, name=f'jobs-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run_local(self):
+        while True:
+            try:
+                self.work()
+            except Exception as e:
+                print(f"Job Worker Error: {e}")
+                self._wakeup.wait(self.app.config['JOB_POLL_INTERVAL'])
@@ -0,0 +1,57 @@
+import json
+import base64
+from datetime import datetime
+
+from database import db
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """디코딩할 수 없는 페이지 커서"""
+
+
+def encode_cursor(created, row_id):
+    """(시각, id)를 클라이언트에 넘길 불투명한 커서 문자열로 변환"""
+    raw = json.dumps([created.isoformat() if created else None, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(created) if created else None), int(row_id)
+    except Exception:
+        raise InvalidCursor(cursor)
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    """limit 파라미터를 1 ~ MAX_PAGE_SIZE 범위로 맞춤"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, time_column, id_column, limit, cursor=None):
+    """(시각, id) 내림차순 keyset 페이지네이션
+
+    OFFSET 없이 마지막으로 본 행 다음부터 읽으므로 페이지가 뒤로 가도
+    (시각, id) 복합 인덱스를 타고 일정한 비용으로 조회됩니다.
+    반환값: (행 목록, 다음 페이지 커서 또는 None)
+    """
+    if cursor:
+        created, row_id = decode_cursor(cursor)
+        query = query.filter(db.tuple_(time_column, id_column) < (created, row_id))
+
+    rows = query.order_by(time_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
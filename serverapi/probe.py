@@ -0,0 +1,241 @@
+import json
+import struct
+import subprocess
+
+from database import get_kst_now
+
+# moov/mdat 위치를 직접 확인할 수 있는 형식 (ISO BMFF)
+MP4_EXTENSIONS = {'mp4', 'mov', 'm4v'}
+# 최상위 박스를 읽는 최대 개수 (손상된 파일에서 끝없이 읽지 않도록)
+MAX_TOP_LEVEL_BOXES = 1024
+# ffprobe 없이 해석할 moov 박스의 최대 크기
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+# moov 안에서 트랙 정보를 찾으려고 들어가는 컨테이너 박스
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+# MP4 샘플 엔트리 이름 -> ffprobe 코덱 이름
+SAMPLE_ENTRY_CODECS = {
+    'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc', 'av01': 'av1', 'vp09': 'vp9',
+    'mp4v': 'mpeg4', 'mp4a': 'aac', 'Opus': 'opus', 'ac-3': 'ac3', 'ec-3': 'eac3', 'fLaC': 'flac',
+}
+
+
+def iter_boxes(f, start, end):
+    """start~end 범위의 박스 (종류, 시작 위치, 헤더 크기, 전체 크기) 목록
+
+    크기 0은 파일 끝까지, 1은 64비트 크기(largesize)를 뜻합니다.
+    """
+    offset = start
+    for _ in range(MAX_TOP_LEVEL_BOXES):
+        if offset + 8 > end:
+            return
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack('>Q', large)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return
+        yield kind, offset, header_size, size
+        offset += size
+
+
+def moov_position(f, file_size):
+    """moov가 mdat보다 앞에 있으면 True, 뒤에 있으면 False, 알 수 없으면 None (함께 moov 위치/크기 반환)"""
+    moov = mdat = None
+    for kind, offset, header_size, size in iter_boxes(f, 0, file_size):
+        if kind == b'moov' and moov is None:
+            moov = (offset, header_size, size)
+        elif kind == b'mdat' and mdat is None:
+            mdat = offset
+        if moov is not None and mdat is not None:
+            break
+    if moov is None or mdat is None:
+        return None, moov
+    return moov[0] < mdat, moov
+
+
+def parse_moov(data):
+    """moov 박스 본문에서 길이(초), 화면 기준 가로/세로, 비디오/오디오 코덱 추출"""
+    info = {}
+    track = {}
+
+    def walk(start, end):
+        offset = start
+        while offset + 8 <= end:
+            size, kind = struct.unpack_from('>I4s', data, offset)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', data, offset + 8)[0]
+                header_size = 16
+            elif size == 0:
+                size = end - offset
+            if size < header_size or offset + size > end:
+                return
+            body = offset + header_size
+            if kind == b'trak':
+                track.clear()
+                walk(body, offset + size)
+                finish_track()
+            elif kind in CONTAINER_BOXES:
+                walk(body, offset + size)
+            elif kind == b'mvhd':
+                version = data[body]
+                if version == 1:
+                    timescale, duration = struct.unpack_from('>IQ', data, body + 20)
+                else:
+                    timescale, duration = struct.unpack_from('>II', data, body + 12)
+                if timescale:
+                    info['duration_seconds'] = duration / timescale
+            elif kind == b'tkhd':
+                # version 0/1에 따라 시각/길이 필드 크기가 다름, 그 뒤 예약 8 + layer/group/volume/예약 8
+                matrix = body + (4 + 32 if data[body] == 1 else 4 + 20) + 16
+                a, b = struct.unpack_from('>ii', data, matrix)
+                width, height = struct.unpack_from('>II', data, matrix + 36)
+                track['size'] = (width >> 16, height >> 16)
+                # 회전 행렬이 90/270도이면 화면에서는 가로/세로가 바뀜
+                track['rotated'] = a == 0 and b != 0
+            elif kind == b'hdlr':
+                track['handler'] = data[body + 8:body + 12]
+            elif kind == b'stsd':
+                entry = body + 8
+                if entry + 8 <= offset + size:
+                    track['codec'] = data[entry + 4:entry + 8].decode('latin-1')
+            offset += size
+
+    def finish_track():
+        codec = SAMPLE_ENTRY_CODECS.get(track.get('codec'), track.get('codec'))
+        if track.get('handler') == b'vide' and 'video_codec' not in info:
+            info['video_codec'] = codec
+            width, height = track.get('size', (0, 0))
+            if track.get('rotated'):
+                width, height = height, width
+            if width and height:
+                info['width'], info['height'] = width, height
+        elif track.get('handler') == b'soun' and 'audio_codec' not in info:
+            info['audio_codec'] = codec
+
+    try:
+        walk(0, len(data))
+    except (struct.error, IndexError):
+        # 잘린 moov: 읽은 데까지만 사용
+        pass
+    return info
+
+
+def format_duration(seconds):
+    """초를 목록에 표시하는 'm:ss' 또는 'h:mm:ss' 문자열로"""
+    total = int(round(seconds))
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{secs:02d}'
+    return f'{minutes}:{secs:02d}'
+
+
+class MediaProber:
+    """업로드된 비디오의 길이/해상도/코덱/비트레이트/크기와 moov 위치 추출
+
+    ffprobe로 형식/스트림 정보를 읽고, MP4/MOV는 최상위 박스 헤더만 직접 읽어
+    moov가 mdat 앞에 있는지(faststart) 확인합니다. ffprobe가 없거나 실패하면
+    MP4/MOV는 moov 박스를 직접 해석해서 길이/해상도/코덱을 채웁니다.
+    가로/세로는 회전 정보를 반영한 화면 기준 값입니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROBE_FFPROBE', 'ffprobe')
+        app.config.setdefault('PROBE_TIMEOUT', 60)
+        # probe-videos 명령에서 동시에 실행할 분석 수
+        app.config.setdefault('PROBE_WORKERS', 4)
+        app.config.setdefault('PROBE_BATCH_SIZE', 100)
+
+        self.app = app
+        app.extensions['media_prober'] = self
+
+    def probe(self, src, f, ext):
+        """src(ffprobe 입력: 경로 또는 URL)와 같은 파일을 연 f(seek 가능)에서 메타데이터 dict 반환
+
+        키: duration_seconds, width, height, video_codec, audio_codec, bitrate, file_size, moov_at_start
+        """
+        f.seek(0, 2)
+        file_size = f.tell()
+        info = {'file_size': file_size, 'moov_at_start': None}
+
+        moov = None
+        if ext.lower() in MP4_EXTENSIONS:
+            info['moov_at_start'], moov = moov_position(f, file_size)
+
+        probed = self.ffprobe(src)
+        if probed is None and moov is not None and moov[2] <= MAX_MOOV_SIZE:
+            offset, header_size, size = moov
+            f.seek(offset + header_size)
+            probed = parse_moov(f.read(size - header_size))
+        info.update(probed or {})
+
+        if not info.get('bitrate') and info.get('duration_seconds'):
+            info['bitrate'] = int(file_size * 8 / info['duration_seconds'])
+        return info
+
+    def ffprobe(self, src):
+        """ffprobe 결과를 메타데이터 dict로 (ffprobe가 없거나 읽지 못하면 None)"""
+        try:
+            out = subprocess.run([
+                self.app.config['PROBE_FFPROBE'], '-v', 'error',
+                '-show_entries', 'format=duration,bit_rate'
+                ':stream=codec_type,codec_name,width,height:stream_tags=rotate:stream_side_data=rotation',
+                '-of', 'json', src,
+            ], capture_output=True, check=True, timeout=self.app.config['PROBE_TIMEOUT']).stdout
+            result = json.loads(out)
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return None
+
+        info = {}
+        fmt = result.get('format', {})
+        if fmt.get('duration') not in (None, 'N/A'):
+            info['duration_seconds'] = float(fmt['duration'])
+        if fmt.get('bit_rate') not in (None, 'N/A'):
+            info['bitrate'] = int(fmt['bit_rate'])
+        for stream in result.get('streams', []):
+            if stream.get('codec_type') == 'video' and 'video_codec' not in info:
+                info['video_codec'] = stream.get('codec_name')
+                width, height = stream.get('width'), stream.get('height')
+                rotation = stream.get('tags', {}).get('rotate')
+                for side_data in stream.get('side_data_list', []):
+                    rotation = side_data.get('rotation', rotation)
+                if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+                    width, height = height, width
+                if width and height:
+                    info['width'], info['height'] = int(width), int(height)
+            elif stream.get('codec_type') == 'audio' and 'audio_codec' not in info:
+                info['audio_codec'] = stream.get('codec_name')
+        return info
+
+    @staticmethod
+    def apply(video, info):
+        """분석 결과를 Video 컬럼에 기록 (길이를 알았으면 표시용 duration 문자열도 서버 값으로 교체)"""
+        video.duration_seconds = info.get('duration_seconds')
+        video.width = info.get('width')
+        video.height = info.get('height')
+        video.video_codec = info.get('video_codec')
+        video.audio_codec = info.get('audio_codec')
+        video.bitrate = info.get('bitrate')
+        video.file_size = info.get('file_size')
+        video.moov_at_start = info.get('moov_at_start')
+        video.probed_at = get_kst_now()
+        if video.duration_seconds:
+            video.duration = format_duration(video.duration_seconds)
@@ -0,0 +1,105 @@
+from sqlalchemy import update, delete, select, func
+from sqlalchemy.dialects import sqlite, postgresql
+
+from database import db, Video, VideoLike, VideoDislike
+
+LIKE = 'like'
+DISLIKE = 'dislike'
+
+# 반응 종류별 (관계 테이블, 카운터 컬럼 이름)
+REACTIONS = {
+    LIKE: (VideoLike, 'likes'),
+    DISLIKE: (VideoDislike, 'dislikes'),
+}
+
+
+class VideoNotFound(LookupError):
+    """반응을 남길 비디오가 없음"""
+
+
+def insert_ignore(model, values):
+    """이미 있으면 무시하는 INSERT (실제로 추가된 경우에만 rowcount == 1)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        stmt = sqlite.insert(model).values(**values).on_conflict_do_nothing()
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(model).values(**values).on_conflict_do_nothing()
+    else:
+        stmt = model.__table__.insert().prefix_with('IGNORE').values(**values)
+    return db.session.execute(stmt).rowcount
+
+
+def toggle_reaction(user_id, video_id, kind):
+    """좋아요/싫어요 토글을 한 트랜잭션으로 처리하고 (likes, dislikes, 활성 여부) 반환
+
+    카운터는 실제로 추가/삭제된 행 수(rowcount)만큼만 `likes = likes + :d` 로 바꾸므로
+    동시에 여러 번 눌러도 관계 테이블과 어긋나지 않습니다.
+    """
+    model, column = REACTIONS[kind]
+    other_model, other_column = REACTIONS[DISLIKE if kind == LIKE else LIKE]
+    key = {'user_id': user_id, 'video_id': video_id}
+    deltas = {'likes': 0, 'dislikes': 0}
+
+    try:
+        removed = db.session.execute(delete(model).filter_by(**key)).rowcount
+        if removed:
+            deltas[column] -= removed
+            active = False
+        else:
+            # 반대 반응이 있으면 제거하고 새 반응 추가
+            deltas[other_column] -= db.session.execute(delete(other_model).filter_by(**key)).rowcount
+            deltas[column] += insert_ignore(model, key)
+            active = True
+
+        video_table = Video.__table__
+        row = db.session.execute(
+            update(video_table)
+            .where(video_table.c.id == video_id)
+            .values(
+                likes=func.coalesce(video_table.c.likes, 0) + deltas['likes'],
+                dislikes=func.coalesce(video_table.c.dislikes, 0) + deltas['dislikes'],
+            )
+            .returning(video_table.c.likes, video_table.c.dislikes)
+        ).first()
+        if row is None:
+            raise VideoNotFound(video_id)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return row.likes, row.dislikes, active
+
+
+def user_reactions(user_id, video_ids):
+    """여러 비디오에 대한 사용자의 반응을 {video_id: 'like' | 'dislike'} 로 반환"""
+    if not video_ids:
+        return {}
+    likes = select(VideoLike.video_id, db.literal(LIKE)).where(
+        VideoLike.user_id == user_id, VideoLike.video_id.in_(video_ids))
+    dislikes = select(VideoDislike.video_id, db.literal(DISLIKE)).where(
+        VideoDislike.user_id == user_id, VideoDislike.video_id.in_(video_ids))
+    return dict(db.session.execute(likes.union_all(dislikes)).all())
+
+
+def reconcile_reaction_counts():
+    """video_likes/video_dislikes 기준으로 좋아요/싫어요 수를 다시 계산하고, 어긋나 있던 비디오 수 반환"""
+    likes = (select(func.count()).select_from(VideoLike)
+             .where(VideoLike.video_id == Video.id).scalar_subquery())
+    dislikes = (select(func.count()).select_from(VideoDislike)
+                .where(VideoDislike.video_id == Video.id).scalar_subquery())
+
+    drifted = db.session.execute(
+        select(func.count()).select_from(Video).where(db.or_(
+            func.coalesce(Video.likes, -1) != likes,
+            func.coalesce(Video.dislikes, -1) != dislikes,
+        ))
+    ).scalar()
+    if drifted:
+        db.session.execute(
+            update(Video)
+            .values(likes=likes, dislikes=dislikes)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return drifted
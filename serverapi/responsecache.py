@@ -0,0 +1,188 @@
+import json
+import hashlib
+import threading
+from functools import wraps
+
+from flask import request, make_response, Response
+from werkzeug.http import parse_etags
+
+from cache import TTLCache
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# 캐시된 응답에서 그대로 돌려줄 헤더
+CACHED_HEADERS = ('Content-Type', 'X-Next-Cursor', 'X-Total-Count')
+
+
+class LocalBackend:
+    """프로세스 내부 버전 카운터 (워커가 하나일 때 또는 TTL 만큼의 지연을 허용할 때)"""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def versions(self, tags):
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def get(self, key):
+        # 응답 본문은 ResponseCache의 로컬 LRU에만 저장
+        return None
+
+    def set(self, key, entry, ttl):
+        pass
+
+
+class RedisBackend:
+    """여러 워커/서버가 버전 카운터와 응답을 공유하는 Redis 백엔드"""
+
+    def __init__(self, client, prefix='rc:'):
+        self.client = client
+        self.prefix = prefix
+
+    def versions(self, tags):
+        if not tags:
+            return []
+        values = self.client.mget([self.prefix + 'v:' + tag for tag in tags])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def bump(self, tags):
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.incr(self.prefix + 'v:' + tag)
+        pipe.execute()
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + 'r:' + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data['etag'], [tuple(h) for h in data['headers']], data['body'].encode('utf-8')
+
+    def set(self, key, entry, ttl):
+        etag, headers, body = entry
+        raw = json.dumps({'etag': etag, 'headers': headers, 'body': body.decode('utf-8')})
+        self.client.setex(self.prefix + 'r:' + key, int(ttl), raw)
+
+
+class ResponseCache:
+    """공개 조회 API의 JSON 응답 캐시 (ETag/304 지원)
+
+    캐시 키에는 경로, 쿼리 문자열과 함께 응답이 의존하는 엔티티(태그)의 버전이 포함됩니다.
+    데이터를 바꾸는 엔드포인트가 bump()로 버전을 올리면 이전 항목은 더 이상 조회되지 않고
+    LRU/TTL에 의해 자연스럽게 밀려납니다. 캐시 적중 시에는 DB를 전혀 조회하지 않습니다.
+
+    조회수/좋아요 같은 카운터는 버전을 올리지 않으므로 최대 RESPONSE_CACHE_TTL 만큼 늦게 반영됩니다.
+    RESPONSE_CACHE_REDIS_URL을 설정하면 (redis 패키지 필요) 버전과 응답을 워커 간에 공유합니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.local = None
+        self.backend = None
+        self.ttl = 60
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_SIZE', 2048)
+        app.config.setdefault('RESPONSE_CACHE_TTL', 60)
+        app.config.setdefault('RESPONSE_CACHE_REDIS_URL', None)
+
+        self.app = app
+        self.ttl = app.config['RESPONSE_CACHE_TTL']
+        self.local = TTLCache(maxsize=app.config['RESPONSE_CACHE_SIZE'], ttl=self.ttl)
+
+        url = app.config['RESPONSE_CACHE_REDIS_URL']
+        if url:
+            if redis is None:
+                raise RuntimeError('RESPONSE_CACHE_REDIS_URL을 사용하려면 redis 패키지가 필요합니다.')
+            self.backend = RedisBackend(redis.Redis.from_url(url))
+        else:
+            self.backend = LocalBackend()
+        app.extensions['response_cache'] = self
+
+    def bump(self, *tags):
+        """태그에 해당하는 엔티티가 바뀌었음을 알림 (DB 커밋 이후에 호출)"""
+        try:
+            self.backend.bump(tags)
+        except Exception as e:
+            print(f"Response Cache Error: {e}")
+
+    def cached(self, tags, vary_on_auth=False):
+        """GET 응답을 캐시하는 데코레이터
+
+        tags: 뷰 인자(kwargs)를 받아 응답이 의존하는 태그 목록을 반환하는 함수
+        vary_on_auth: 로그인 사용자마다 응답이 다른 경우 Authorization 헤더를 키에 포함
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                tag_list = tags(**kwargs)
+                try:
+                    key = self._make_key(tag_list, self.backend.versions(tag_list), vary_on_auth)
+                    entry = self._get(key)
+                except Exception as e:
+                    print(f"Response Cache Error: {e}")
+                    return view(*args, **kwargs)
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough:
+                        return response
+                    entry = self._store(key, response)
+                return self._respond(entry)
+            return wrapper
+        return decorator
+
+    # ========== 내부 ==========
+
+    def _make_key(self, tags, versions, vary_on_auth):
+        parts = [request.path, request.query_string.decode('latin-1')]
+        parts.extend(f'{tag}={version}' for tag, version in zip(tags, versions))
+        if vary_on_auth:
+            parts.append(request.headers.get('Authorization', ''))
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def _get(self, key):
+        entry = self.local.get(key)
+        if entry is None:
+            entry = self.backend.get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+        return entry
+
+    def _store(self, key, response):
+        body = response.get_data()
+        # 같은 내용이면 버전이 바뀌어도 같은 ETag가 나오도록 본문 해시 사용
+        etag = hashlib.sha1(body).hexdigest()
+        headers = [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers]
+        entry = (etag, headers, body)
+
+        self.local.set(key, entry)
+        try:
+            self.backend.set(key, entry, self.ttl)
+        except Exception as e:
+            print(f"Response Cache Error: {e}")
+        return entry
+
+    def _respond(self, entry):
+        etag, headers, body = entry
+        # 브라우저가 매번 재검증하도록 해서 변경 시 바로 반영되고, 같으면 304
+        extra = [('ETag', f'"{etag}"'), ('Cache-Control', 'no-cache')]
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and parse_etags(if_none_match).contains(etag):
+            return Response(status=304, headers=extra)
+        return Response(body, status=200, headers=headers + extra)
@@ -0,0 +1,182 @@
+from sqlalchemy import text
+
+from database import db, Video, User
+
+# trigram 토크나이저는 3글자 단위로 색인하므로 한글처럼 띄어쓰기/형태소가
+# 애매한 텍스트도 부분 문자열로 검색됨 (SQLite 3.34 이상)
+MIN_TRIGRAM_LENGTH = 3
+
+FTS_TABLES = ('videos_fts', 'users_fts')
+
+SEARCH_DDL = [
+    # ---------- 비디오: 제목/설명/채널 ----------
+    """CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+        title, description, channel,
+        content='videos', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS videos_fts_ai AFTER INSERT ON videos BEGIN
+        INSERT INTO videos_fts(rowid, title, description, channel)
+        VALUES (new.id, new.title, new.description, new.channel);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS videos_fts_ad AFTER DELETE ON videos BEGIN
+        INSERT INTO videos_fts(videos_fts, rowid, title, description, channel)
+        VALUES ('delete', old.id, old.title, old.description, old.channel);
+    END""",
+    # 조회수/좋아요 갱신 때는 색인을 건드리지 않도록 검색 대상 컬럼만 감시
+    """CREATE TRIGGER IF NOT EXISTS videos_fts_au AFTER UPDATE OF title, description, channel ON videos BEGIN
+        INSERT INTO videos_fts(videos_fts, rowid, title, description, channel)
+        VALUES ('delete', old.id, old.title, old.description, old.channel);
+        INSERT INTO videos_fts(rowid, title, description, channel)
+        VALUES (new.id, new.title, new.description, new.channel);
+    END""",
+    # ---------- 사용자: 아이디 ----------
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        username, content='users', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username) VALUES (new.id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username) VALUES ('delete', old.id, old.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username) VALUES ('delete', old.id, old.username);
+        INSERT INTO users_fts(rowid, username) VALUES (new.id, new.username);
+    END""",
+]
+
+
+def exclude_search_tables(obj, name, type_, reflected, compare_to):
+    """Alembic autogenerate가 FTS 가상 테이블(및 내부 테이블)을 지우려 하지 않도록 제외"""
+    if type_ == 'table' and name and name.startswith(FTS_TABLES):
+        return False
+    return True
+
+
+def split_terms(query):
+    """검색어를 FTS로 찾을 수 있는 단어와 LIKE로 걸러야 하는 짧은 단어로 분리"""
+    terms = query.split()
+    long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM_LENGTH]
+    short_terms = [t for t in terms if len(t) < MIN_TRIGRAM_LENGTH]
+    return long_terms, short_terms
+
+
+def contains(column, term):
+    """부분 문자열 검색 조건 (SQLite의 LIKE는 ASCII 대소문자를 무시하지만 PostgreSQL은 ILIKE 필요)"""
+    pattern = f'%{term}%'
+    if db.engine.dialect.name == 'postgresql':
+        return column.ilike(pattern)
+    return column.like(pattern)
+
+
+def match_expression(terms):
+    # 각 단어를 구문으로 감싸서 FTS 문법 문자가 그대로 검색되도록
+    return ' AND '.join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+class SearchIndex:
+    """FTS5 기반 비디오/사용자 검색 색인
+
+    색인은 트리거로 videos/users 테이블과 동기화됩니다.
+    색인이 없거나 SQLite가 아닌 경우, 또는 검색어가 너무 짧은 경우에는 LIKE 검색으로 대체합니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._available = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['search_index'] = self
+
+    def create(self):
+        """색인 테이블/트리거 생성 후 기존 데이터로 다시 채움 (여러 번 실행해도 안전)"""
+        if db.engine.dialect.name != 'sqlite':
+            raise RuntimeError('FTS5 검색 색인은 SQLite에서만 사용할 수 있습니다.')
+        for ddl in SEARCH_DDL:
+            db.session.execute(text(ddl))
+        db.session.execute(text("INSERT INTO videos_fts(videos_fts) VALUES ('rebuild')"))
+        db.session.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+        db.session.commit()
+        self._available = True
+
+    @property
+    def available(self):
+        if self._available is None:
+            if db.engine.dialect.name != 'sqlite':
+                self._available = False
+            else:
+                row = db.session.execute(text(
+                    "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'videos_fts'"
+                )).scalar()
+                self._available = bool(row)
+        return self._available
+
+    # ========== 비디오 검색 ==========
+
+    def search_videos(self, query, limit=None):
+        """관련도 순으로 정렬된 Video 목록 반환"""
+        long_terms, short_terms = split_terms(query)
+
+        if not self.available or not long_terms:
+            return self._like_videos(query, limit)
+
+        # bm25 가중치: 제목 > 채널 > 설명
+        sql = """
+            SELECT v.id FROM videos_fts
+            JOIN videos v ON v.id = videos_fts.rowid
+            WHERE videos_fts MATCH :match
+        """
+        params = {'match': match_expression(long_terms)}
+        for i, term in enumerate(short_terms):
+            sql += f" AND (v.title LIKE :s{i} OR v.description LIKE :s{i} OR v.channel LIKE :s{i})"
+            params[f's{i}'] = f'%{term}%'
+        sql += " ORDER BY bm25(videos_fts, 10.0, 1.0, 5.0), v.upload_time DESC"
+        if limit:
+            sql += " LIMIT :limit"
+            params['limit'] = limit
+
+        ids = [row[0] for row in db.session.execute(text(sql), params)]
+        return self._load_in_order(Video, ids)
+
+    def _like_videos(self, query, limit):
+        q = Video.query.filter(
+            db.or_(
+                contains(Video.title, query),
+                contains(Video.description, query),
+                contains(Video.channel, query)
+            )
+        ).order_by(Video.upload_time.desc())
+        if limit:
+            q = q.limit(limit)
+        return q.all()
+
+    # ========== 사용자 검색 ==========
+
+    def search_users(self, query, limit=None):
+        """관련도 순으로 정렬된 User 목록 반환"""
+        if not self.available or len(query) < MIN_TRIGRAM_LENGTH:
+            q = User.query.filter(contains(User.username, query))
+            if limit:
+                q = q.limit(limit)
+            return q.all()
+
+        sql = """
+            SELECT rowid FROM users_fts WHERE users_fts MATCH :match
+            ORDER BY bm25(users_fts), length(username)
+        """
+        params = {'match': match_expression([query])}
+        if limit:
+            sql += " LIMIT :limit"
+            params['limit'] = limit
+
+        ids = [row[0] for row in db.session.execute(text(sql), params)]
+        return self._load_in_order(User, ids)
+
+    def _load_in_order(self, model, ids):
+        if not ids:
+            return []
+        rows = {row.id: row for row in model.query.filter(model.id.in_(ids)).all()}
+        return [rows[i] for i in ids if i in rows]
@@ -0,0 +1,153 @@
+import json
+from datetime import datetime
+
+import pytz
+from flask import Response
+
+from cache import TTLCache
+from database import Video
+from hls import HLS_READY, MASTER_PLAYLIST
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+KST = pytz.timezone('Asia/Seoul')
+
+# 목록 API에서 ORM 객체 대신 튜플로 읽는 컬럼
+VIDEO_LIST_COLUMNS = (
+    Video.id, Video.title, Video.description, Video.channel, Video.thumbnail,
+    Video.views, Video.upload_time, Video.duration, Video.likes, Video.dislikes,
+    Video.hls_status,
+)
+
+
+# ========== 표시용 포맷 ==========
+
+def format_views(views):
+    if views is None: return "0"
+    if views >= 1000000:
+        return f"{views/1000000:.1f}M"
+    elif views >= 1000:
+        return f"{views/1000:.0f}K"
+    return str(views)
+
+
+def localize(upload_time):
+    """DB 시각을 KST 기준 aware datetime으로 변환 (해석할 수 없으면 None)"""
+    if isinstance(upload_time, str):
+        try:
+            upload_time = datetime.fromisoformat(upload_time)
+        except ValueError:
+            return None
+
+    # upload_time에 타임존 정보가 없으면 KST로 설정
+    if upload_time.tzinfo is None:
+        upload_time = KST.localize(upload_time)
+    return upload_time
+
+
+def relative_time(upload_time, now):
+    """aware datetime을 'N일 전' 형식으로 (now는 요청마다 한 번만 구해서 전달)"""
+    diff = now - upload_time
+    if diff.days > 365:
+        return f"{diff.days // 365}년 전"
+    elif diff.days > 30:
+        return f"{diff.days // 30}개월 전"
+    elif diff.days > 0:
+        return f"{diff.days}일 전"
+    elif diff.seconds > 3600:
+        return f"{diff.seconds // 3600}시간 전"
+    elif diff.seconds > 60:
+        return f"{diff.seconds // 60}분 전"
+    else:
+        return "방금 전"
+
+
+def format_time(upload_time, now=None):
+    if upload_time is None:
+        return "Unknown"
+
+    localized = localize(upload_time)
+    if localized is None:
+        return upload_time
+    return relative_time(localized, now or datetime.now(KST))
+
+
+def format_date(upload_time):
+    """업로드 날짜를 YYYY.MM.DD 형식으로 반환"""
+    if upload_time is None:
+        return ""
+
+    localized = localize(upload_time)
+    if localized is None:
+        return ""
+    return localized.strftime('%Y.%m.%d')
+
+
+def json_response(data, status=200):
+    """orjson이 있으면 사용하는 JSON 응답"""
+    if orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return Response(body, status=status, mimetype='application/json')
+
+
+# ========== 비디오 목록 직렬화 ==========
+
+class VideoListSerializer:
+    """홈/검색/피드 목록용 비디오 직렬화
+
+    URL, 날짜, KST 시각처럼 요청과 무관한 값은 행의 내용이 바뀌지 않는 한
+    한 번만 계산해서 캐시하고, 요청마다 달라지는 상대 시간과 조회수/좋아요만 새로 만듭니다.
+    행은 ORM 객체나 VIDEO_LIST_COLUMNS 튜플(Row) 모두 받을 수 있습니다.
+    """
+
+    def __init__(self, base_url, pending_views, maxsize=20000):
+        self.base_url = base_url
+        self.pending_views = pending_views
+        self._static = TTLCache(maxsize=maxsize, ttl=3600)
+
+    def _static_fields(self, row):
+        # 이 값들 중 하나라도 바뀌면 다시 계산 (행 버전 역할)
+        version = (row.title, row.description, row.channel, row.thumbnail,
+                   row.upload_time, row.duration, row.hls_status)
+        cached = self._static.get(row.id)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        fields = {
+            'id': row.id,
+            'title': row.title,
+            'description': row.description,
+            'channel': row.channel,
+            'thumbnail': f'{self.base_url}/api/thumbnails/{row.thumbnail}' if row.thumbnail else None,
+            'uploadDate': format_date(row.upload_time),
+            'duration': row.duration,
+            'videoUrl': f'{self.base_url}/api/videos/{row.id}/stream',
+            'hlsUrl': f'{self.base_url}/api/videos/{row.id}/hls/{MASTER_PLAYLIST}' if row.hls_status == HLS_READY else None,
+        }
+        # 상대 시간 계산용 aware datetime, 계산할 수 없으면 그대로 내보낼 문자열
+        if row.upload_time is None:
+            when = "Unknown"
+        else:
+            when = localize(row.upload_time) or row.upload_time
+
+        self._static.set(row.id, (version, fields, when))
+        return fields, when
+
+    def serialize(self, rows, now=None):
+        now = now or datetime.now(KST)
+        pending_views = self.pending_views
+        items = []
+        for row in rows:
+            fields, when = self._static_fields(row)
+            item = fields.copy()
+            item['uploadTime'] = when if isinstance(when, str) else relative_time(when, now)
+            item['views'] = format_views((row.views or 0) + pending_views(row.id))
+            item['likes'] = row.likes
+            item['dislikes'] = row.dislikes
+            items.append(item)
+        return items
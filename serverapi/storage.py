@@ -0,0 +1,352 @@
+import errno
+import io
+import os
+import shutil
+import tempfile
+import uuid
+
+from flask import redirect
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+from cache import TTLCache
+
+COPY_BUFFER_SIZE = 1024 * 1024
+# 원격 객체를 seek 하며 읽을 때 한 번의 범위 요청으로 가져오는 크기
+RANGE_BUFFER_SIZE = 256 * 1024
+# S3 멀티파트 업로드에서 마지막을 제외한 파트의 최소 크기
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class IncompletePart(Exception):
+    """파트 크기만큼 받기 전에 요청 본문이 끝남 (받은 부분은 버림)"""
+
+
+class LocalStorage:
+    """로컬 디렉토리에 객체를 저장하는 드라이버 (키 = root 기준 '/' 구분 상대 경로)
+
+    presign을 지원하지 않으므로 url()은 None이고, 호출한 쪽이 path()의 파일을 직접 보냅니다.
+    멀티파트 업로드는 파트를 하나의 .part 파일의 오프셋 위치에 바로 쓰고 완료 시 rename만 합니다.
+    """
+
+    remote = False
+    min_part_size = 1
+    url_expires = 0
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def size(self, key):
+        """객체 크기 (없으면 None)"""
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def put_file(self, key, src, content_type=None, cache_control=None):
+        """로컬 파일을 key로 저장 (같은 파일시스템이면 rename이라 src는 없어짐)"""
+        self._place(src, self.path(key))
+
+    def get_file(self, key, dst):
+        shutil.copyfile(self.path(key), dst)
+
+    def open(self, key):
+        return open(self.path(key), 'rb')
+
+    def open_seekable(self, key):
+        return open(self.path(key), 'rb')
+
+    def move(self, src_key, dst_key, content_type=None, cache_control=None):
+        self._place(self.path(src_key), self.path(dst_key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix=''):
+        """prefix 아래 객체의 (키, 수정 시각) 목록"""
+        top = self.path(prefix) if prefix else self.root
+        for dirpath, dirnames, filenames in os.walk(top):
+            relative = os.path.relpath(dirpath, self.root).replace(os.sep, '/')
+            for filename in filenames:
+                key = filename if relative == '.' else f'{relative}/{filename}'
+                try:
+                    yield key, os.path.getmtime(os.path.join(dirpath, filename))
+                except FileNotFoundError:
+                    continue
+
+    def url(self, key):
+        return None
+
+    # ========== 멀티파트 업로드 ==========
+
+    def create_multipart(self, key):
+        upload_id = uuid.uuid4().hex
+        part_path = self._part_path(key, upload_id)
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        open(part_path, 'wb').close()
+        return upload_id
+
+    def upload_part(self, key, upload_id, number, offset, stream, size):
+        """stream에서 size 바이트를 읽어 offset 위치에 기록하고 ETag 반환"""
+        written = 0
+        with open(self._part_path(key, upload_id), 'r+b') as f:
+            f.seek(offset)
+            while written < size:
+                data = stream.read(min(COPY_BUFFER_SIZE, size - written))
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+            f.truncate(offset + written if written == size else offset)
+        if written != size:
+            raise IncompletePart(key)
+        return str(number)
+
+    def complete_multipart(self, key, upload_id, parts):
+        os.replace(self._part_path(key, upload_id), self.path(key))
+
+    def abort_multipart(self, key, upload_id):
+        try:
+            os.remove(self._part_path(key, upload_id))
+        except FileNotFoundError:
+            pass
+
+    def _part_path(self, key, upload_id):
+        return f'{self.path(key)}.{upload_id}.part'
+
+    @staticmethod
+    def _place(src, dst):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.replace(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # 다른 파일시스템이면 같은 디렉토리의 임시 파일로 복사한 뒤 교체
+            tmp = f'{dst}.{os.getpid()}.tmp'
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+
+
+class S3Storage:
+    """S3 호환 객체 저장소(AWS S3, MinIO 등) 드라이버 (키 = prefix 뒤의 객체 키)
+
+    - put_file()은 boto3의 관리형 업로드라 큰 파일은 멀티파트로 나눠 병렬 전송합니다.
+    - url()은 STORAGE_URL_EXPIRES 초 동안 유효한 presign GET URL을 돌려주고, 같은 키는
+      유효 시간의 절반 동안 같은 URL을 재사용해서 브라우저/CDN 캐시가 맞도록 합니다.
+    - 끝나지 않은 멀티파트 업로드는 세션 정리에서 abort하지만, 프로세스가 죽어 남는 것에 대비해
+      버킷에 AbortIncompleteMultipartUpload 수명 주기 규칙을 두는 것이 좋습니다.
+    """
+
+    remote = True
+    min_part_size = S3_MIN_PART_SIZE
+
+    def __init__(self, bucket, prefix='', client=None, url_expires=3600, spool_size=COPY_BUFFER_SIZE):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client
+        self.url_expires = url_expires
+        self.spool_size = spool_size
+        self._urls = TTLCache(maxsize=10000, ttl=url_expires / 2)
+
+    def _key(self, key):
+        return self.prefix + key
+
+    def exists(self, key):
+        return self.size(key) is not None
+
+    def size(self, key):
+        """객체 크기 (없으면 None)"""
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))['ContentLength']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def put_file(self, key, src, content_type=None, cache_control=None):
+        """로컬 파일을 업로드 (src는 그대로 남으므로 필요 없으면 호출한 쪽에서 지움)"""
+        self.client.upload_file(src, self.bucket, self._key(key),
+                                ExtraArgs=self._metadata(content_type, cache_control))
+
+    def get_file(self, key, dst):
+        self.client.download_file(self.bucket, self._key(key), dst)
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))['Body']
+
+    def open_seekable(self, key):
+        """seek 가능한 읽기 전용 파일 객체 (필요한 부분만 범위 요청으로 읽음, 객체가 없으면 FileNotFoundError)"""
+        size = self.size(key)
+        if size is None:
+            raise FileNotFoundError(key)
+        return io.BufferedReader(_RangeReader(self.client, self.bucket, self._key(key), size),
+                                 buffer_size=RANGE_BUFFER_SIZE)
+
+    def move(self, src_key, dst_key, content_type=None, cache_control=None):
+        """서버 측 복사 후 원본 삭제 (5GB가 넘는 객체는 boto3가 멀티파트 복사)"""
+        extra = self._metadata(content_type, cache_control)
+        if extra:
+            extra['MetadataDirective'] = 'REPLACE'
+        self.client.copy({'Bucket': self.bucket, 'Key': self._key(src_key)}, self.bucket, self._key(dst_key),
+                         ExtraArgs=extra)
+        self.delete(src_key)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        self._urls.delete(key)
+
+    def list(self, prefix=''):
+        """prefix 아래 객체의 (키, 수정 시각) 목록"""
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for item in page.get('Contents', ()):
+                yield item['Key'][len(self.prefix):], item['LastModified'].timestamp()
+
+    def url(self, key):
+        url = self._urls.get(key)
+        if url is None:
+            url = self.client.generate_presigned_url(
+                'get_object', Params={'Bucket': self.bucket, 'Key': self._key(key)}, ExpiresIn=self.url_expires)
+            self._urls.set(key, url)
+        return url
+
+    @staticmethod
+    def _metadata(content_type, cache_control):
+        extra = {}
+        if content_type:
+            extra['ContentType'] = content_type
+        if cache_control:
+            extra['CacheControl'] = cache_control
+        return extra
+
+    # ========== 멀티파트 업로드 ==========
+
+    def create_multipart(self, key):
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key))['UploadId']
+
+    def upload_part(self, key, upload_id, number, offset, stream, size):
+        """stream에서 size 바이트를 받아 number번 파트로 올리고 ETag 반환
+
+        크기가 모자라면 올리지 않도록 본문을 먼저 임시 파일(작으면 메모리)에 받습니다.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_size) as body:
+            received = 0
+            while received < size:
+                data = stream.read(min(COPY_BUFFER_SIZE, size - received))
+                if not data:
+                    raise IncompletePart(key)
+                body.write(data)
+                received += len(data)
+            body.seek(0)
+            return self.client.upload_part(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                           PartNumber=number, Body=body, ContentLength=size)['ETag']
+
+    def complete_multipart(self, key, upload_id, parts):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': etag} for number, etag in parts]},
+        )
+
+    def abort_multipart(self, key, upload_id):
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                raise
+
+
+class _RangeReader(io.RawIOBase):
+    """S3 객체를 Range GET으로 읽는 파일 객체"""
+
+    def __init__(self, client, bucket, key, size):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer):
+        end = min(self.position + len(buffer), self.size)
+        if end <= self.position:
+            return 0
+        body = self.client.get_object(Bucket=self.bucket, Key=self.key,
+                                      Range=f'bytes={self.position}-{end - 1}')['Body']
+        data = body.read()
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def create_storage(app, local_root, prefix):
+    """STORAGE_BACKEND 설정에 맞는 드라이버 (local: local_root 디렉토리, s3: 버킷의 prefix 아래)
+
+    STORAGE_BACKEND: 'local' | 's3' (자격 증명은 boto3 기본 방식: AWS_ACCESS_KEY_ID 환경변수 등)
+    """
+    app.config.setdefault('STORAGE_BACKEND', 'local')
+    app.config.setdefault('STORAGE_S3_BUCKET', None)
+    app.config.setdefault('STORAGE_S3_PREFIX', '')
+    # MinIO 등 S3 호환 저장소 주소 (비워 두면 AWS)
+    app.config.setdefault('STORAGE_S3_ENDPOINT_URL', None)
+    app.config.setdefault('STORAGE_S3_REGION', None)
+    # presign URL 유효 시간 (초)
+    app.config.setdefault('STORAGE_URL_EXPIRES', 3600)
+
+    backend = app.config['STORAGE_BACKEND']
+    if backend == 'local':
+        return LocalStorage(local_root)
+    if backend != 's3':
+        raise RuntimeError(f'지원하지 않는 STORAGE_BACKEND 입니다: {backend}')
+    if boto3 is None:
+        raise RuntimeError("STORAGE_BACKEND='s3'를 사용하려면 boto3 패키지가 필요합니다.")
+    if not app.config['STORAGE_S3_BUCKET']:
+        raise RuntimeError("STORAGE_BACKEND='s3'에는 STORAGE_S3_BUCKET 설정이 필요합니다.")
+
+    # 같은 앱의 드라이버들은 클라이언트(연결 풀) 하나를 같이 씀
+    client = app.extensions.get('s3_client')
+    if client is None:
+        client = boto3.client('s3', endpoint_url=app.config['STORAGE_S3_ENDPOINT_URL'],
+                              region_name=app.config['STORAGE_S3_REGION'])
+        app.extensions['s3_client'] = client
+    return S3Storage(app.config['STORAGE_S3_BUCKET'], app.config['STORAGE_S3_PREFIX'] + prefix,
+                     client=client, url_expires=app.config['STORAGE_URL_EXPIRES'])
+
+
+def redirect_response(url, expires, max_age=None):
+    """presign URL로 보내는 302 응답 (URL이 재사용되는 동안에도 유효하도록 캐시는 유효 시간의 1/4까지)"""
+    limit = max(0, expires // 4)
+    response = redirect(url, code=302)
+    response.headers['Cache-Control'] = f'public, max-age={limit if max_age is None else min(max_age, limit)}'
+    return response
@@ -0,0 +1,373 @@
+import os
+import mimetypes
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import request, Response, abort
+from werkzeug.http import parse_range_header, http_date, parse_date, parse_etags
+
+# 한 번에 읽어서 내보내는 크기 (pread 경로)
+CHUNK_SIZE = 256 * 1024
+# 멀티 레인지 요청에서 허용하는 최대 구간 수 (그 이상은 전체 응답으로 처리)
+MAX_RANGES = 16
+
+
+class MediaFile:
+    """열린 파일 디스크립터와 stat 결과를 묶어 캐시하는 항목"""
+
+    __slots__ = ('key', 'path', 'fd', 'size', 'mtime', 'inode', 'etag',
+                 'last_modified', 'mimetype', 'checked_at', 'refs', 'evicted', 'lock')
+
+    def __init__(self, key, path):
+        self.key = key
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.refs = 0
+        self.evicted = False
+        self.lock = threading.Lock()
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self._load_stat(os.fstat(self.fd))
+
+    def _load_stat(self, st):
+        self.size = st.st_size
+        self.mtime = int(st.st_mtime)
+        self.inode = st.st_ino
+        # 강한 ETag: inode, 크기, 수정 시각(ns)이 모두 같아야 같은 바이트로 간주
+        self.etag = f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+        self.last_modified = datetime.fromtimestamp(self.mtime, tz=timezone.utc)
+        self.checked_at = time.monotonic()
+
+    def is_stale(self):
+        """경로의 파일이 교체/수정되었는지 확인"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return True
+        if st.st_ino != self.inode or st.st_size != self.size or int(st.st_mtime) != self.mtime:
+            return True
+        self.checked_at = time.monotonic()
+        return False
+
+    def open_same(self):
+        """경로의 파일을 새로 열어 반환 (캐시한 파일과 inode/크기/수정 시각이 다르면 None)"""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return None
+        st = os.fstat(f.fileno())
+        if st.st_ino != self.inode or st.st_size != self.size or int(st.st_mtime) != self.mtime:
+            f.close()
+            return None
+        return f
+
+    def acquire(self):
+        """참조 1 증가 (이미 캐시에서 제거되어 닫히는 중이면 False)"""
+        with self.lock:
+            if self.evicted:
+                return False
+            self.refs += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.refs -= 1
+            should_close = self.evicted and self.refs == 0
+        if should_close:
+            self._close()
+
+    def evict(self):
+        with self.lock:
+            self.evicted = True
+            should_close = self.refs == 0
+        if should_close:
+            self._close()
+
+    def _close(self):
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+
+
+class StreamEngine:
+    """비디오 스트리밍 엔진
+
+    비디오 id를 키로 열린 파일과 stat 결과를 캐시해서, 탐색(seek)이나 모바일 레인지
+    탐색 요청마다 DB와 파일시스템을 다시 조회하지 않도록 합니다.
+    단일/멀티 레인지, If-Range, 조건부 요청(304)을 처리하고, 가능한 경우
+    WSGI 서버의 sendfile 경로를 사용하거나 nginx/Apache로 전송을 위임합니다.
+    """
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = 256
+        self.stat_ttl = 5.0
+        self.offload = None
+        self.accel_prefix = '/protected/videos/'
+        self.accel_root = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # STREAM_OFFLOAD: None | 'x-accel' (nginx) | 'x-sendfile' (Apache/lighttpd)
+        app.config.setdefault('STREAM_OFFLOAD', None)
+        app.config.setdefault('STREAM_ACCEL_PREFIX', '/protected/videos/')
+        # 지정하면 X-Accel-Redirect에 파일명 대신 이 디렉토리 기준 상대 경로를 붙임 (하위 디렉토리가 있는 저장소)
+        app.config.setdefault('STREAM_ACCEL_ROOT', None)
+        app.config.setdefault('STREAM_CACHE_SIZE', 256)
+        app.config.setdefault('STREAM_STAT_TTL', 5.0)
+
+        self.offload = app.config['STREAM_OFFLOAD']
+        self.accel_prefix = app.config['STREAM_ACCEL_PREFIX']
+        self.accel_root = app.config['STREAM_ACCEL_ROOT']
+        self.max_entries = app.config['STREAM_CACHE_SIZE']
+        self.stat_ttl = app.config['STREAM_STAT_TTL']
+        app.extensions['stream_engine'] = self
+
+    # ========== 캐시 관리 ==========
+
+    def lookup(self, key, resolve):
+        """키에 해당하는 MediaFile 반환 (캐시 미스일 때만 resolve()로 경로 조회)
+
+        반환된 항목은 acquire() 된 상태이므로 사용 후 release() 해야 합니다.
+        """
+        # 참조는 락 안에서 잡아야 그 사이 invalidate()/LRU 제거가 fd를 닫지 않음
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.acquire():
+                self._entries.move_to_end(key)
+            else:
+                entry = None
+
+        if entry is not None and time.monotonic() - entry.checked_at > self.stat_ttl:
+            if entry.is_stale():
+                self._drop(key, entry)
+                entry.release()
+                entry = None
+
+        if entry is None:
+            path = resolve()
+            if not path or not os.path.isfile(path):
+                return None
+            entry = MediaFile(key, path)
+            with self._lock:
+                old = self._entries.pop(key, None)
+                self._entries[key] = entry
+                entry.acquire()
+                evicted = []
+                while len(self._entries) > self.max_entries:
+                    _, victim = self._entries.popitem(last=False)
+                    evicted.append(victim)
+            if old is not None:
+                evicted.append(old)
+            for victim in evicted:
+                victim.evict()
+
+        return entry
+
+    def invalidate(self, key):
+        """비디오 삭제/교체 시 캐시에서 제거"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.evict()
+
+    def _drop(self, key, entry):
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.evict()
+
+    # ========== 응답 생성 ==========
+
+    def serve(self, key, resolve):
+        """레인지/조건부 요청을 처리한 스트리밍 응답 반환"""
+        entry = self.lookup(key, resolve)
+        if entry is None:
+            abort(404)
+
+        try:
+            return self._build_response(entry)
+        except Exception:
+            entry.release()
+            raise
+
+    def _build_response(self, entry):
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'ETag': entry.etag,
+            'Last-Modified': http_date(entry.last_modified),
+        }
+
+        if self._not_modified(entry):
+            entry.release()
+            return Response(status=304, headers=headers)
+
+        if self.offload:
+            entry.release()
+            return self._offload_response(entry, headers)
+
+        ranges = self._requested_ranges(entry)
+        if ranges == []:
+            entry.release()
+            headers['Content-Range'] = f'bytes */{entry.size}'
+            return Response(status=416, headers=headers)
+
+        if ranges is None:
+            return self._single_response(entry, 0, entry.size, 200, headers)
+
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            headers['Content-Range'] = f'bytes {start}-{stop - 1}/{entry.size}'
+            return self._single_response(entry, start, stop, 206, headers)
+
+        return self._multipart_response(entry, ranges, headers)
+
+    def _not_modified(self, entry):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            return parse_etags(if_none_match).contains_weak(entry.etag.strip('"'))
+
+        if_modified_since = parse_date(request.headers.get('If-Modified-Since'))
+        if if_modified_since is not None:
+            return entry.last_modified <= if_modified_since
+        return False
+
+    def _requested_ranges(self, entry):
+        """요청한 바이트 구간 목록 반환
+
+        None: 전체 응답(200), []: 만족할 수 없는 레인지(416)
+        """
+        header = request.headers.get('Range')
+        if not header:
+            return None
+
+        # If-Range가 현재 표현과 다르면 레인지를 무시하고 전체를 보냄
+        if_range = request.headers.get('If-Range')
+        if if_range:
+            if if_range.startswith('"') or if_range.startswith('W/'):
+                if if_range != entry.etag:
+                    return None
+            else:
+                date = parse_date(if_range)
+                if date is None or date != entry.last_modified:
+                    return None
+
+        parsed = parse_range_header(header)
+        if parsed is None or parsed.units != 'bytes' or len(parsed.ranges) > MAX_RANGES:
+            return None
+
+        size = entry.size
+        spans = []
+        for begin, end in parsed.ranges:
+            if begin < 0:
+                start, stop = max(0, size + begin), size
+            else:
+                start, stop = begin, size if end is None else min(end, size)
+            if start < stop:
+                spans.append((start, stop))
+
+        # 겹치거나 맞닿은 구간 병합
+        spans.sort()
+        merged = []
+        for start, stop in spans:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def _single_response(self, entry, start, stop, status, headers):
+        length = stop - start
+        headers['Content-Length'] = str(length)
+
+        if request.method == 'HEAD':
+            entry.release()
+            return Response(status=status, headers=headers, mimetype=entry.mimetype)
+
+        # 전체 응답만 file_wrapper(sendfile)로 보냄: 서버에 따라 파일 끝까지 보내므로(uWSGI 등)
+        # 레인지 응답은 캐시된 fd에서 pread로 정확히 구간만 보냄
+        f = None
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None and start == 0 and stop == entry.size:
+            # 그 사이 파일이 교체되었으면 다른 내용을 예전 ETag/길이로 보내지 않도록 pread 경로 사용
+            f = entry.open_same()
+        if f is not None:
+            entry.release()
+            body = file_wrapper(f, CHUNK_SIZE)
+        else:
+            body = self._iter_range(entry, start, stop, release=True)
+
+        return Response(body, status=status, headers=headers,
+                        mimetype=entry.mimetype, direct_passthrough=True)
+
+    def _multipart_response(self, entry, ranges, headers):
+        boundary = uuid.uuid4().hex
+        parts = []
+        total = 0
+        for start, stop in ranges:
+            part_header = (
+                f'--{boundary}\r\n'
+                f'Content-Type: {entry.mimetype}\r\n'
+                f'Content-Range: bytes {start}-{stop - 1}/{entry.size}\r\n\r\n'
+            ).encode('ascii')
+            parts.append((part_header, start, stop))
+            total += len(part_header) + (stop - start) + 2
+        closing = f'--{boundary}--\r\n'.encode('ascii')
+        total += len(closing)
+
+        headers['Content-Length'] = str(total)
+        mimetype = f'multipart/byteranges; boundary={boundary}'
+
+        if request.method == 'HEAD':
+            entry.release()
+            return Response(status=206, headers=headers, content_type=mimetype)
+
+        def generate():
+            try:
+                for part_header, start, stop in parts:
+                    yield part_header
+                    yield from self._iter_range(entry, start, stop, release=False)
+                    yield b'\r\n'
+                yield closing
+            finally:
+                entry.release()
+
+        return Response(generate(), status=206, headers=headers,
+                        content_type=mimetype, direct_passthrough=True)
+
+    def _iter_range(self, entry, start, stop, release):
+        # 캐시된 fd를 공유하므로 seek 대신 pread로 오프셋을 지정해서 읽음
+        try:
+            offset = start
+            while offset < stop:
+                data = os.pread(entry.fd, min(CHUNK_SIZE, stop - offset), offset)
+                if not data:
+                    break
+                offset += len(data)
+                yield data
+        finally:
+            if release:
+                entry.release()
+
+    def _offload_response(self, entry, headers):
+        # 바이트 전송은 앞단 웹서버가 담당 (레인지 처리 포함)
+        headers.pop('Accept-Ranges', None)
+        if self.offload == 'x-accel':
+            headers['X-Accel-Redirect'] = self.accel_prefix + self._accel_path(entry.path)
+        else:
+            headers['X-Sendfile'] = entry.path
+        return Response(status=200, headers=headers, mimetype=entry.mimetype)
+
+    def _accel_path(self, path):
+        if self.accel_root:
+            relative = os.path.relpath(path, self.accel_root)
+            if not relative.startswith(os.pardir):
+                return relative.replace(os.sep, '/')
+        return os.path.basename(path)
@@ -0,0 +1,214 @@
+import re
+import json
+import uuid
+import hashlib
+import threading
+from datetime import timedelta
+
+from database import db, UploadSession, get_kst_now
+from storage import LocalStorage, IncompletePart
+
+# Content-Range: bytes <start>-<end>/<total>
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """재개 가능한 업로드 처리 중 발생한 오류 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+
+class ResumableUploads:
+    """청크 단위로 이어받을 수 있는 비디오 업로드
+
+    청크 하나가 저장소(storage)의 멀티파트 업로드 파트 하나가 되고, 완료하면 저장소 안의
+    임시 키(uploads/<세션 id>)와 내용의 SHA-256을 돌려주므로 호출한 쪽은 그 객체를 옮기기만 하면 됩니다.
+    (로컬 저장소는 파트를 .part 파일의 오프셋 위치에 바로 쓰고, S3는 파트를 그대로 올림)
+    청크는 끝까지 받아야 인정하며, 마지막을 제외한 청크는 저장소의 최소 파트 크기 이상이어야 합니다.
+    해시는 청크를 받으면서 같이 계산하고(같은 프로세스가 처음부터 순서대로 받은 경우),
+    그렇지 않으면 완료 시 객체를 한 번 읽어 계산합니다.
+    """
+
+    def __init__(self, app=None, storage=None):
+        self.app = None
+        self.storage = storage
+        # 세션 id -> (해시한 바이트 수, sha256 객체)
+        self._hashers = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+        app.config.setdefault('UPLOAD_SESSION_TTL', timedelta(hours=24))
+        self.app = app
+        if self.storage is None:
+            self.storage = LocalStorage(app.config['UPLOAD_FOLDER'])
+        if app.config['UPLOAD_CHUNK_SIZE'] < self.storage.min_part_size:
+            raise RuntimeError(f'UPLOAD_CHUNK_SIZE는 {self.storage.min_part_size} 바이트 이상이어야 합니다.')
+        app.extensions['resumable_uploads'] = self
+
+    @staticmethod
+    def key(session):
+        """받는 중인 파일의 저장소 키"""
+        return f'uploads/{session.id}'
+
+    def create(self, user_id, filename, original_name, total_size, checksum=None, complete=False):
+        """업로드 세션 생성 및 저장소 멀티파트 업로드 시작
+
+        complete: 같은 내용(checksum)이 이미 저장되어 있어 데이터를 받지 않고 바로 완료할 수 있는 세션
+        """
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            filename=filename,
+            original_name=original_name,
+            total_size=total_size,
+            received=total_size if complete else 0,
+            checksum=checksum.lower() if checksum else None
+        )
+        if not complete:
+            self._start(session)
+        db.session.add(session)
+        db.session.commit()
+        return session
+
+    def _start(self, session):
+        session.storage_upload_id = self.storage.create_multipart(self.key(session))
+        session.parts = '[]'
+        with self._lock:
+            self._hashers[session.id] = (0, hashlib.sha256())
+
+    def write_chunk(self, session, content_range, stream):
+        """Content-Range의 청크를 다음 파트로 저장하고 새 오프셋 반환
+
+        이미 받은 위치가 아닌 곳에서 시작하는 청크는 409로 거절하고
+        클라이언트가 현재 오프셋부터 다시 보내도록 합니다.
+        """
+        if session.storage_upload_id is None:
+            raise UploadError('업로드 세션이 만료되었습니다. 다시 업로드해주세요.', status=410)
+        match = CONTENT_RANGE_RE.match(content_range or '')
+        if not match:
+            raise UploadError('Content-Range 헤더가 필요합니다.')
+
+        start, end, total = (int(g) for g in match.groups())
+        if total != session.total_size or end < start or end >= total:
+            raise UploadError('잘못된 Content-Range 입니다.', status=416)
+        if start != session.received:
+            raise UploadError('업로드 오프셋이 일치하지 않습니다.', status=409, offset=session.received)
+        expected = end - start + 1
+        if end + 1 < total and expected < self.storage.min_part_size:
+            raise UploadError(f'마지막이 아닌 청크는 {self.storage.min_part_size} 바이트 이상이어야 합니다.',
+                              status=416)
+
+        with self._lock:
+            hashed, hasher = self._hashers.get(session.id, (None, None))
+        # 다른 프로세스가 받은 청크가 있으면 완료 시 저장소에서 계산 (청크가 끊기면 복사본만 버림)
+        hasher = hasher.copy() if hashed == start else None
+        parts = json.loads(session.parts or '[]')
+        number = len(parts) + 1
+        try:
+            etag = self.storage.upload_part(self.key(session), session.storage_upload_id, number, start,
+                                            _HashingReader(stream, hasher), expected)
+        except IncompletePart:
+            raise UploadError('청크가 중간에 끊겼습니다.', status=400, offset=session.received)
+        with self._lock:
+            if hasher is not None:
+                self._hashers[session.id] = (end + 1, hasher)
+            else:
+                self._hashers.pop(session.id, None)
+
+        parts.append([number, etag])
+        session.parts = json.dumps(parts)
+        session.received = end + 1
+        session.updated_at = get_kst_now()
+        db.session.commit()
+        return session.received
+
+    def finalize(self, session):
+        """크기/체크섬 확인 후 (저장소 키, SHA-256) 반환 (세션 삭제는 호출한 쪽에서 블롭으로 옮긴 뒤)
+
+        데이터를 받지 않고 완료된 세션(create(complete=True))은 키가 None 입니다.
+        """
+        if session.received != session.total_size:
+            raise UploadError('아직 업로드가 끝나지 않았습니다.', status=409, offset=session.received)
+
+        if session.storage_upload_id is None:
+            if not session.checksum:
+                raise UploadError('업로드 세션이 만료되었습니다. 다시 업로드해주세요.', status=410)
+            return None, session.checksum
+
+        key = self.key(session)
+        # 앞선 완료 요청이 파트를 합친 뒤 실패했으면 이미 합쳐진 객체를 그대로 씀
+        if self.storage.size(key) != session.total_size:
+            self.storage.complete_multipart(key, session.storage_upload_id, json.loads(session.parts or '[]'))
+        if self.storage.size(key) != session.total_size:
+            raise UploadError('업로드된 파일 크기가 일치하지 않습니다.', status=422)
+
+        with self._lock:
+            hashed, hasher = self._hashers.pop(session.id, (None, None))
+        if hashed != session.total_size:
+            hasher = hashlib.sha256()
+            body = self.storage.open(key)
+            try:
+                for block in iter(lambda: body.read(COPY_BUFFER_SIZE), b''):
+                    hasher.update(block)
+            finally:
+                body.close()
+        digest = hasher.hexdigest()
+
+        if session.checksum and digest != session.checksum:
+            self.discard(session)
+            raise UploadError('체크섬이 일치하지 않습니다. 다시 업로드해주세요.', status=422)
+
+        return key, digest
+
+    def restart(self, session):
+        """데이터 없이 완료된 세션을 처음부터 받도록 되돌림 (그 사이 같은 내용이 삭제된 경우)"""
+        self._start(session)
+        session.received = 0
+        session.updated_at = get_kst_now()
+        db.session.commit()
+
+    def _remove(self, session):
+        with self._lock:
+            self._hashers.pop(session.id, None)
+        if session.storage_upload_id is not None:
+            self.storage.abort_multipart(self.key(session), session.storage_upload_id)
+            self.storage.delete(self.key(session))
+        db.session.delete(session)
+
+    def discard(self, session):
+        self._remove(session)
+        db.session.commit()
+
+    def cleanup_stale(self):
+        """TTL 동안 진행이 없는 세션과 받던 파트 정리, 삭제한 개수 반환"""
+        cutoff = get_kst_now() - self.app.config['UPLOAD_SESSION_TTL']
+        stale = UploadSession.query.filter(UploadSession.updated_at < cutoff).all()
+        for session in stale:
+            self._remove(session)
+        if stale:
+            db.session.commit()
+        return len(stale)
+
+
+class _HashingReader:
+    """읽은 데이터를 해시에도 넣는 스트림 (hasher가 None이면 그대로 읽기만)"""
+
+    __slots__ = ('stream', 'hasher')
+
+    def __init__(self, stream, hasher):
+        self.stream = stream
+        self.hasher = hasher
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        return data
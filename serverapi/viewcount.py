@@ -0,0 +1,102 @@
+import atexit
+import threading
+from collections import defaultdict
+
+from sqlalchemy import update, bindparam
+
+from database import db, Video
+
+
+class ViewCounter:
+    """조회수 증가분을 메모리에 모았다가 한 번에 반영하는 write-behind 카운터
+
+    요청마다 SQLite 쓰기 잠금을 잡는 대신, 비디오 id별 증가분을 모아 두고
+    주기(VIEW_FLUSH_INTERVAL) 또는 누적 개수(VIEW_FLUSH_THRESHOLD)에 도달하면
+    `UPDATE videos SET views = views + n` 으로 일괄 반영합니다.
+    아직 반영되지 않은 증가분은 pending()으로 조회할 수 있습니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pending = defaultdict(int)
+        self._in_flight = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('VIEW_FLUSH_INTERVAL', 5.0)
+        app.config.setdefault('VIEW_FLUSH_THRESHOLD', 500)
+        self.app = app
+        app.extensions['view_counter'] = self
+        # 프로세스 종료 시 남은 증가분 반영
+        atexit.register(self.flush)
+
+    def incr(self, video_id, n=1):
+        with self._lock:
+            self._pending[video_id] += n
+            self._total += n
+            should_flush = self._total >= self.app.config['VIEW_FLUSH_THRESHOLD']
+        self._ensure_thread()
+        if should_flush:
+            self._wakeup.set()
+
+    def pending(self, video_id):
+        """DB에 아직 반영되지 않은 조회수 증가분"""
+        with self._lock:
+            return self._pending.get(video_id, 0) + self._in_flight.get(video_id, 0)
+
+    def flush(self):
+        """모아둔 증가분을 DB에 반영하고 반영한 비디오 수 반환"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = dict(self._pending)
+                self._in_flight = batch
+                self._pending = defaultdict(int)
+                self._total = 0
+
+            stmt = (
+                update(Video.__table__)
+                .where(Video.__table__.c.id == bindparam('video_id'))
+                .values(views=db.func.coalesce(Video.__table__.c.views, 0) + bindparam('delta'))
+            )
+            params = [{'video_id': video_id, 'delta': delta} for video_id, delta in batch.items()]
+
+            try:
+                with self.app.app_context():
+                    db.session.execute(stmt, params)
+                    db.session.commit()
+            except Exception as e:
+                print(f"View Flush Error: {e}")
+                # 실패한 증가분은 다음 주기에 다시 시도
+                with self._lock:
+                    for video_id, delta in batch.items():
+                        self._pending[video_id] += delta
+                        self._total += delta
+                    self._in_flight = {}
+                return 0
+
+            with self._lock:
+                self._in_flight = {}
+            return len(batch)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.app.config['VIEW_FLUSH_INTERVAL'])
+            self._wakeup.clear()
+            self.flush()
@@ -10,7 +10,7 @@ import { Upload, X, Loader2 } from 'lucide-react';
 import Header from './Header';
 import SideMenu from './SideMenu';
 import Channel from './Channel';
-import { API_URL, TokenStorage, authFetch, authFetchFormData } from './api';
+import { API_URL, TokenStorage, authFetch, uploadResumable, fetchMyReactions } from './api';
 import Home from './pages/Home';
 import WatchPage from './pages/WatchPage';
 import UserChannel from './UserChannel';
@@ -29,6 +29,8 @@ const AppContent = () => {
   const [liked, setLiked] = useState<LikedState>({});
   const [videos, setVideos] = useState<VideoType[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showUploadModal, setShowUploadModal] = useState(false);
   const [sidebarOpen, setSidebarOpen] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
@@ -42,6 +44,7 @@ const AppContent = () => {
   const [videoFile, setVideoFile] = useState<File | null>(null);
   const [thumbnailFile, setThumbnailFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState(0);
 
   const [currentUser, setCurrentUser] = useState<{id: number, username: string} | null>(null);
   const [showAuthModal, setShowAuthModal] = useState(false);
@@ -133,6 +136,8 @@ const AppContent = () => {
       const response = await fetch(url);
       const data = await response.json();
       setVideos(Array.isArray(data) ? data : []);
+      // 검색 결과가 아닌 홈 피드는 커서로 다음 페이지를 이어서 가져옴
+      setNextCursor(query ? null : response.headers.get('X-Next-Cursor'));
       setLoading(false);
     } catch (error) {
       console.error('Error fetching videos:', error);
@@ -140,6 +145,24 @@ const AppContent = () => {
     }
   };
 
+  // 무한 스크롤: 다음 페이지 가져오기
+  const loadMoreVideos = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetch(`${API_URL}/videos?cursor=${encodeURIComponent(nextCursor)}`);
+      const data = await response.json();
+      if (Array.isArray(data)) {
+        setVideos(prev => [...prev, ...data.filter(v => !prev.some(p => p.id === v.id))]);
+      }
+      setNextCursor(response.headers.get('X-Next-Cursor'));
+    } catch (error) {
+      console.error('Error fetching more videos:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSearch = () => {
     fetchVideos(searchQuery);
   };
@@ -155,11 +178,29 @@ const AppContent = () => {
     localStorage.removeItem('user');
     setCurrentUser(null);
     setSubscribedChannels([]);
+    setLiked({});
     setShowUserMenu(false);
     setUploadForm(prev => ({ ...prev, channel: '' }));
     alert("로그아웃 되었습니다.");
   };
 
+  // 목록에 새로 들어온 비디오들의 내 좋아요/싫어요 상태를 한 번에 가져오기
+  useEffect(() => {
+    if (!currentUser) return;
+    const ids = videos.map(v => v.id).filter(id => !(id in liked));
+    if (ids.length === 0) return;
+
+    fetchMyReactions(ids)
+      .then(reactions => {
+        setLiked(prev => {
+          const next = { ...prev };
+          ids.forEach(id => { next[id] = reactions[id] ?? null; });
+          return next;
+        });
+      })
+      .catch(error => console.error('Error fetching reactions:', error));
+  }, [currentUser, videos]);
+
   const handleLike = async (videoId: number) => {
     if (!currentUser) {
       alert("로그인이 필요합니다.");
@@ -263,15 +304,15 @@ const AppContent = () => {
     }
 
     setUploading(true);
-    const formData = new FormData();
-    formData.append('video', videoFile);
-    if (thumbnailFile) formData.append('thumbnail', thumbnailFile);
-    formData.append('title', uploadForm.title);
-    formData.append('description', uploadForm.description);
-    formData.append('duration', uploadForm.duration || '0:00');
+    setUploadProgress(0);
 
     try {
-      const response = await authFetchFormData(`${API_URL}/videos/upload`, formData);
+      // 청크 단위로 업로드 (연결이 끊겨도 다시 시도하면 이어서 전송)
+      const response = await uploadResumable(videoFile, {
+        title: uploadForm.title,
+        description: uploadForm.description,
+        duration: uploadForm.duration || '0:00',
+      }, thumbnailFile, setUploadProgress);
 
       if (response.ok) {
         alert('업로드 완료!');
@@ -607,6 +648,9 @@ const AppContent = () => {
       <Home
       videos={videos}
       loading={loading}
+      hasMore={!!nextCursor}
+      loadingMore={loadingMore}
+      onLoadMore={loadMoreVideos}
       />
     } />
 
@@ -749,7 +793,7 @@ const AppContent = () => {
       {uploading ? (
         <div className="text-center py-10 space-y-4">
         <Loader2 className="animate-spin mx-auto text-blue-500" size={48} />
-        <p className="text-white text-lg font-medium">비디오를 업로드하고 처리 중입니다...</p>
+        <p className="text-white text-lg font-medium">비디오를 업로드하고 처리 중입니다... {uploadProgress}%</p>
         <p className="text-gray-400 text-sm">파일 크기에 따라 시간이 걸릴 수 있습니다. 창을 닫지 마세요.</p>
         </div>
       ) : (
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import type { FormEvent } from 'react';
 import { X, Video, Upload } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
@@ -16,6 +16,8 @@ const Channel = ({
 
     const [channelData, setChannelData] = useState<any>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const sentinelRef = useRef<HTMLDivElement>(null);
     const [showProfileEditModal, setShowProfileEditModal] = useState(false);
     const [profileForm, setProfileForm] = useState({ bio: '' });
     const [profileImageFile, setProfileImageFile] = useState<File | null>(null);
@@ -43,6 +45,39 @@ const Channel = ({
         }
     };
 
+    // 채널 동영상 다음 페이지 (keyset 커서)
+    const loadMoreVideos = async () => {
+        if (!channelData?.nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const response = await fetch(`${API_URL}/users/${channelData.username}/videos?cursor=${encodeURIComponent(channelData.nextCursor)}`);
+            if (response.ok) {
+                const data = await response.json();
+                setChannelData((prev: any) => ({
+                    ...prev,
+                    videos: [...prev.videos, ...data],
+                    nextCursor: response.headers.get('X-Next-Cursor')
+                }));
+            }
+        } catch (error) {
+            console.error('Error fetching more videos:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    // 목록 끝이 화면에 보이면 다음 페이지 요청
+    useEffect(() => {
+        const sentinel = sentinelRef.current;
+        if (!sentinel || !channelData?.nextCursor) return;
+
+        const observer = new IntersectionObserver((entries) => {
+            if (entries[0].isIntersecting) loadMoreVideos();
+        }, { rootMargin: '400px' });
+        observer.observe(sentinel);
+        return () => observer.disconnect();
+    }, [channelData?.nextCursor, loadingMore]);
+
     const handleUpdateProfile = async (e: FormEvent) => {
         e.preventDefault();
         setUpdatingProfile(true);
@@ -199,6 +234,7 @@ const Channel = ({
             ))}
             </div>
         )}
+        <div ref={sentinelRef} className="h-10" />
         </div>
 
         {/* 프로필 수정 모달 */}
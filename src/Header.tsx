@@ -1,7 +1,7 @@
 import { Play, Menu, Search, Upload, Bell, Home, TrendingUp, Compass, X } from 'lucide-react'; // X, Home 등 추가
 import { useNavigate } from 'react-router-dom';
 import { useState, useEffect, type KeyboardEvent } from 'react'; // useState, useEffect 추가
-import { API_URL } from './api'; // API_URL 추가
+import { fetchChannelSummaries } from './api';
 
 interface ChannelProfile {
     username: string;
@@ -78,24 +78,13 @@ const Header = ({
         // 구독한 채널들의 프로필 정보 가져오기
         useEffect(() => {
             const fetchChannelProfiles = async () => {
-                const profiles: {[key: string]: ChannelProfile} = {};
-
-                for (const channel of subscribedChannels) {
-                    try {
-                        const response = await fetch(`${API_URL}/users/${channel}`);
-                        if (response.ok) {
-                            const data = await response.json();
-                            profiles[channel] = {
-                                username: data.username,
-                                profileImage: data.profileImage
-                            };
-                        }
-                    } catch (error) {
-                        console.error(`Error fetching profile for ${channel}:`, error);
-                    }
+                try {
+                    // 구독 채널 전체를 한 번의 요청으로 조회
+                    const profiles = await fetchChannelSummaries(subscribedChannels);
+                    setChannelProfiles(profiles);
+                } catch (error) {
+                    console.error('Error fetching channel profiles:', error);
                 }
-
-                setChannelProfiles(profiles);
             };
 
             if (subscribedChannels.length > 0) {
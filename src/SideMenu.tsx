@@ -1,7 +1,7 @@
 import { Home, TrendingUp, Compass } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 import { useState, useEffect } from 'react';
-import { API_URL } from './api';
+import { fetchChannelSummaries } from './api';
 
 interface SideMenuProps {
     sidebarOpen: boolean;
@@ -39,26 +39,13 @@ const SideMenu = ({
     // 구독한 채널들의 프로필 정보 가져오기
     useEffect(() => {
         const fetchChannelProfiles = async () => {
-            const profiles: {[key: string]: ChannelProfile} = {};
-
-            for (const channel of subscribedChannels) {
-                try {
-                    const response = await fetch(`${API_URL}/users/${channel}`);
-                    if (response.ok) {
-                        const data = await response.json();
-                        console.log(`Profile data for ${channel}:`, data); // 👈 디버깅 추가
-                        profiles[channel] = {
-                            username: data.username,
-                            profileImage: data.profileImage
-                        };
-                    }
-                } catch (error) {
-                    console.error(`Error fetching profile for ${channel}:`, error);
-                }
+            try {
+                // 구독 채널 전체를 한 번의 요청으로 조회
+                const profiles = await fetchChannelSummaries(subscribedChannels);
+                setChannelProfiles(profiles);
+            } catch (error) {
+                console.error('Error fetching channel profiles:', error);
             }
-
-            console.log('All profiles:', profiles); // 👈 디버깅 추가
-            setChannelProfiles(profiles);
         };
 
         if (subscribedChannels.length > 0) {
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Video, Upload } from 'lucide-react';
 import { API_URL,  authFetch } from './api';
@@ -13,6 +13,8 @@ const UserChannel = ({ currentUser }: UserChannelProps) => {
 
     const [channelData, setChannelData] = useState<any>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const sentinelRef = useRef<HTMLDivElement>(null);
     const [subscribing, setSubscribing] = useState(false);
 
     useEffect(() => {
@@ -35,6 +37,39 @@ const UserChannel = ({ currentUser }: UserChannelProps) => {
         }
     };
 
+    // 채널 동영상 다음 페이지 (keyset 커서)
+    const loadMoreVideos = async () => {
+        if (!channelData?.nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const response = await fetch(`${API_URL}/users/${channelData.username}/videos?cursor=${encodeURIComponent(channelData.nextCursor)}`);
+            if (response.ok) {
+                const data = await response.json();
+                setChannelData((prev: any) => ({
+                    ...prev,
+                    videos: [...prev.videos, ...data],
+                    nextCursor: response.headers.get('X-Next-Cursor')
+                }));
+            }
+        } catch (error) {
+            console.error('Error fetching more videos:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    // 목록 끝이 화면에 보이면 다음 페이지 요청
+    useEffect(() => {
+        const sentinel = sentinelRef.current;
+        if (!sentinel || !channelData?.nextCursor) return;
+
+        const observer = new IntersectionObserver((entries) => {
+            if (entries[0].isIntersecting) loadMoreVideos();
+        }, { rootMargin: '400px' });
+        observer.observe(sentinel);
+        return () => observer.disconnect();
+    }, [channelData?.nextCursor, loadingMore]);
+
     const handleSubscribe = async () => {
         if (!currentUser) {
             alert('구독하려면 로그인이 필요합니다.');
@@ -191,6 +226,7 @@ const UserChannel = ({ currentUser }: UserChannelProps) => {
             ))}
             </div>
         )}
+        <div ref={sentinelRef} className="h-10" />
         </div>
         </div>
     );
@@ -1,24 +1,48 @@
-import { memo } from 'react';
+import { memo, useEffect, useRef } from 'react';
+import Hls from 'hls.js';
 
 interface VideoPlayerProps {
     videoUrl?: string;
+    hlsUrl?: string | null;  // HLS 패키징이 끝난 경우 master.m3u8 주소
 }
 
-const VideoPlayer = memo(({ videoUrl }: VideoPlayerProps) => {
-    if (!videoUrl) return <div className="w-full h-full bg-black" />;
+const VideoPlayer = memo(({ videoUrl, hlsUrl }: VideoPlayerProps) => {
+    const videoRef = useRef<HTMLVideoElement>(null);
+
+    // HLS가 준비되어 있으면 적응형 스트리밍, 아니면 원본 파일 재생
+    useEffect(() => {
+        const video = videoRef.current;
+        if (!video) return;
+
+        if (hlsUrl && Hls.isSupported()) {
+            const hls = new Hls();
+            hls.loadSource(hlsUrl);
+            hls.attachMedia(video);
+            return () => hls.destroy();
+        }
+
+        if (hlsUrl && video.canPlayType('application/vnd.apple.mpegurl')) {
+            // Safari(iOS)는 HLS를 기본 지원
+            video.src = hlsUrl;
+        } else if (videoUrl) {
+            video.src = videoUrl;
+        }
+    }, [videoUrl, hlsUrl]);
+
+    if (!videoUrl && !hlsUrl) return <div className="w-full h-full bg-black" />;
 
     return (
         <video
+        ref={videoRef}
         controls
         autoPlay
         className="w-full h-full"
-        src={videoUrl}
         // 재생 시점을 유지하고 싶다면 onTimeUpdate 등을 활용할 수 있지만,
         // 태그 자체가 유지되는 것이 근본 해결책입니다.
         >
         브라우저가 비디오를 지원하지 않습니다.
         </video>
     );
-}, (prev, next) => prev.videoUrl === next.videoUrl); // URL이 같으면 절대 리렌더링 안 함
+}, (prev, next) => prev.videoUrl === next.videoUrl && prev.hlsUrl === next.hlsUrl); // URL이 같으면 절대 리렌더링 안 함
 
 export default VideoPlayer;
@@ -3,7 +3,7 @@ import { useState, useEffect, memo } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { ThumbsUp, ThumbsDown, Share2, Video, Trash2, Loader2, Edit } from 'lucide-react';
 import VideoPlayer from './VideoPlayer';
-import { API_URL, authFetch } from './api';
+import { API_URL, authFetch, fetchChannelSummaries } from './api';
 
 
 export interface VideoType {
@@ -19,7 +19,9 @@ export interface VideoType {
     likes: number;
     dislikes: number;
     videoUrl?: string;
+    hlsUrl?: string | null;
     subscriberCount?: number;
+    commentCount?: number;
 
 }
 
@@ -71,6 +73,9 @@ const VideoPlayerOverlay = memo(({
     const navigate = useNavigate();  // 👈 이 줄 추가
     const [comments, setComments] = useState<CommentType[]>([]);
     const [loadingComments, setLoadingComments] = useState(false);
+    const [commentCount, setCommentCount] = useState(video.commentCount ?? 0);
+    const [commentCursor, setCommentCursor] = useState<string | null>(null);
+    const [loadingMoreComments, setLoadingMoreComments] = useState(false);
     const [commentText, setCommentText] = useState('');
     const [submitting, setSubmitting] = useState(false);
     const [channelProfile, setChannelProfile] = useState<{ profileImage: string | null } | null>(null);
@@ -102,6 +107,24 @@ const VideoPlayerOverlay = memo(({
         fetchComments();
     }, [video.id]);
 
+    // 댓글 작성자들의 프로필을 한 번에 가져와 합침
+    const fetchCommentProfiles = async (page: CommentType[]) => {
+        const usernames = [...new Set(page.map(c => c.username))].filter(name => name && !(name in commentProfiles));
+        if (usernames.length === 0) return;
+        try {
+            const summaries = await fetchChannelSummaries(usernames);
+            setCommentProfiles(prev => {
+                const next = { ...prev };
+                for (const name of usernames) {
+                    next[name] = summaries[name]?.profileImage ?? null;
+                }
+                return next;
+            });
+        } catch (error) {
+            console.error('Failed to fetch comment profiles', error);
+        }
+    };
+
     const fetchComments = async () => {
         setLoadingComments(true);
         try {
@@ -109,24 +132,10 @@ const VideoPlayerOverlay = memo(({
             if (response.ok) {
                 const data = await response.json();
                 setComments(data);
-
-                // 댓글 작성자들의 프로필 가져오기
-const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] as string[];
-                const profiles: {[username: string]: string | null} = {};
-
-                for (const username of uniqueUsernames) {
-                    try {
-                        const profileResponse = await fetch(`${API_URL}/users/${username}`);
-                        if (profileResponse.ok) {
-                            const profileData = await profileResponse.json();
-                            profiles[username] = profileData.profileImage;
-                        }
-                    } catch (error) {
-                        console.error(`Failed to fetch profile for ${username}`, error);
-                    }
-                }
-
-                setCommentProfiles(profiles);
+                setCommentCursor(response.headers.get('X-Next-Cursor'));
+                const total = response.headers.get('X-Total-Count');
+                setCommentCount(total !== null ? Number(total) : data.length);
+                fetchCommentProfiles(data);
             }
         } catch (error) {
             console.error('Failed to fetch comments', error);
@@ -135,6 +144,25 @@ const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] a
         }
     };
 
+    // 댓글 더 보기: 다음 페이지 가져오기
+    const loadMoreComments = async () => {
+        if (!commentCursor || loadingMoreComments) return;
+        setLoadingMoreComments(true);
+        try {
+            const response = await fetch(`${API_URL}/videos/${video.id}/comments?cursor=${encodeURIComponent(commentCursor)}`);
+            if (response.ok) {
+                const data = await response.json();
+                setComments(prev => [...prev, ...data.filter((c: CommentType) => !prev.some(p => p.id === c.id))]);
+                setCommentCursor(response.headers.get('X-Next-Cursor'));
+                fetchCommentProfiles(data);
+            }
+        } catch (error) {
+            console.error('Failed to fetch more comments', error);
+        } finally {
+            setLoadingMoreComments(false);
+        }
+    };
+
     const handleCommentSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!currentUser || !commentText.trim() || submitting) return;
@@ -153,6 +181,7 @@ const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] a
                 const data = await response.json();
                 const newComment = data.comment;
                 setComments(prev => [newComment, ...prev]);
+                setCommentCount(prev => prev + 1);
                 setCommentText('');
 
                 // 현재 사용자의 프로필 추가
@@ -197,6 +226,7 @@ const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] a
 
             if (response.ok) {
                 setComments(prev => prev.filter(c => c.id !== commentId));
+                setCommentCount(prev => Math.max(0, prev - 1));
             } else if (response.status === 403) {
                 alert("본인의 댓글만 삭제할 수 있습니다.");
             } else {
@@ -255,7 +285,7 @@ const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] a
         <div className="max-w-7xl mx-auto grid grid-cols-1 lg:grid-cols-3 gap-8">
         <div className="lg:col-span-2 space-y-4">
         <div className="w-full aspect-video bg-black rounded-xl overflow-hidden shadow-2xl ring-1 ring-gray-800">
-        <VideoPlayer videoUrl={video.videoUrl} />
+        <VideoPlayer videoUrl={video.videoUrl} hlsUrl={video.hlsUrl} />
         </div>
 
         <div className="space-y-4">
@@ -388,7 +418,7 @@ const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] a
         {/* 댓글 섹션 */}
         <div className="mt-8">
         <h3 className="text-xl font-bold text-white mb-6">
-        댓글 {comments.length}개
+        댓글 {commentCount}개
         </h3>
 
         {/* 댓글 입력 폼 */}
@@ -543,6 +573,19 @@ const uniqueUsernames = [...new Set(data.map((c: CommentType) => c.username))] a
             ))
         )}
         </div>
+
+        {/* 댓글 더 보기 */}
+        {!loadingComments && commentCursor && (
+            <div className="flex justify-center mt-6">
+            <button
+            onClick={loadMoreComments}
+            disabled={loadingMoreComments}
+            className="px-4 py-2 text-sm font-medium text-blue-400 hover:bg-gray-800 rounded-full disabled:opacity-50"
+            >
+            {loadingMoreComments ? '불러오는 중...' : '댓글 더 보기'}
+            </button>
+            </div>
+        )}
         </div>
         </div>
         </div>
@@ -73,6 +73,39 @@ export const authFetchFormData = async (url: string, formData: FormData) => {
     return response;
 };
 
+// ========== 반응형 이미지 ==========
+// 서버가 너비별 변형을 만들어 두므로 w= 로 필요한 크기만 받음 (WebP 여부는 Accept 헤더로 서버가 선택)
+export const THUMBNAIL_WIDTHS = [320, 640, 1280];
+
+export const imageSrcSet = (url: string, widths: number[] = THUMBNAIL_WIDTHS): string =>
+    widths.map((w) => `${url}?w=${w} ${w}w`).join(', ');
+
+// 채널 요약 정보 일괄 조회 (프로필 이미지, 구독자 수, 동영상 수)
+export interface ChannelSummary {
+    username: string;
+    profileImage: string | null;
+    subscriberCount: number;
+    videoCount: number;
+}
+
+export const fetchChannelSummaries = async (names: string[]): Promise<{[key: string]: ChannelSummary}> => {
+    if (names.length === 0) return {};
+    const response = await fetch(`${API_URL}/channels/summary?names=${encodeURIComponent(names.join(','))}`);
+    if (!response.ok) {
+        throw new Error('채널 정보를 불러오지 못했습니다.');
+    }
+    return response.json();
+};
+
+// 여러 비디오에 대한 내 반응 일괄 조회 ({ [videoId]: 'like' | 'dislike' })
+export const fetchMyReactions = async (videoIds: number[]): Promise<{[key: number]: 'like' | 'dislike'}> => {
+    const response = await authFetch(`${API_URL}/reactions?ids=${videoIds.join(',')}`);
+    if (!response.ok) {
+        throw new Error('반응 정보를 불러오지 못했습니다.');
+    }
+    return response.json();
+};
+
 // 비밀번호 변경
 export const changePassword = async (currentPassword: string, newPassword: string) => {
     const response = await authFetch(`${API_URL}/profile/change-password`, {
@@ -90,3 +123,74 @@ export const deleteAccount = async (password: string) => {
     });
     return response;
 };
+
+// ========== 재개 가능한 청크 업로드 ==========
+// 같은 파일을 다시 올리면 localStorage에 저장된 세션으로 끊긴 지점부터 이어서 전송합니다.
+const uploadSessionKey = (file: File) => `upload_${file.name}_${file.size}_${file.lastModified}`;
+
+export const uploadResumable = async (
+    file: File,
+    fields: Record<string, string>,
+    thumbnail: File | null,
+    onProgress?: (percent: number) => void
+) => {
+    const sessionKey = uploadSessionKey(file);
+    let session: { uploadId: string; offset: number; chunkSize: number } | null = null;
+
+    // 1. 이전 세션이 있으면 현재 오프셋 조회
+    const savedId = localStorage.getItem(sessionKey);
+    if (savedId) {
+        const response = await authFetch(`${API_URL}/uploads/${savedId}`);
+        if (response.ok) {
+            session = await response.json();
+        } else {
+            localStorage.removeItem(sessionKey);
+        }
+    }
+
+    // 2. 없으면 새 세션 생성
+    if (!session) {
+        const response = await authFetch(`${API_URL}/uploads`, {
+            method: 'POST',
+            body: JSON.stringify({ filename: file.name, size: file.size }),
+        });
+        if (!response.ok) return response;
+        session = await response.json();
+        localStorage.setItem(sessionKey, session!.uploadId);
+    }
+
+    const { uploadId, chunkSize } = session!;
+    let offset = session!.offset;
+
+    // 3. 청크 전송 (오프셋 불일치 시 서버가 알려준 위치부터 다시)
+    while (offset < file.size) {
+        const end = Math.min(offset + chunkSize, file.size);
+        const response = await fetch(`${API_URL}/uploads/${uploadId}`, {
+            method: 'PUT',
+            headers: {
+                ...TokenStorage.getAuthHeader(),
+                'Content-Type': 'application/octet-stream',
+                'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`,
+            },
+            body: file.slice(offset, end),
+        });
+        const data = await response.json();
+        if (response.ok || response.status === 409) {
+            offset = data.offset;
+        } else {
+            return new Response(JSON.stringify(data), { status: response.status });
+        }
+        onProgress?.(Math.floor((offset / file.size) * 100));
+    }
+
+    // 4. 완료 처리 (제목/설명/썸네일)
+    const formData = new FormData();
+    Object.entries(fields).forEach(([key, value]) => formData.append(key, value));
+    if (thumbnail) formData.append('thumbnail', thumbnail);
+
+    const response = await authFetchFormData(`${API_URL}/uploads/${uploadId}/complete`, formData);
+    if (response.ok) {
+        localStorage.removeItem(sessionKey);
+    }
+    return response;
+};
@@ -2,6 +2,8 @@
 import type { VideoType } from '../VideoPlayerOverlay';
 import { Play, Video } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
+import { useEffect, useRef } from 'react';
+import { imageSrcSet } from '../api';
 
 // VideoCardProps 정의 및 onClick 추가
 interface VideoCardProps {
@@ -20,6 +22,9 @@ const VideoCard = ({ video, isLarge = false, onClick }: VideoCardProps) => (
     {video.thumbnail ? (
         <img
         src={video.thumbnail}
+        srcSet={imageSrcSet(video.thumbnail)}
+        sizes="(min-width: 1536px) 20vw, (min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
+        loading="lazy"
         alt={video.title}
         className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
         onError={(e) => {
@@ -60,14 +65,30 @@ const VideoCard = ({ video, isLarge = false, onClick }: VideoCardProps) => (
 interface HomeProps {
     videos: VideoType[];
     loading: boolean;
+    hasMore: boolean;
+    loadingMore: boolean;
+    onLoadMore: () => void;
     // 사용하지 않는 props 정의 제거 (빌드 오류 방지)
 }
 
 // 사용하지 않는 props는 매개변수에서 제거
 const categories = ['전체', '게임', '음악', '실시간', '요리', '축구', '프로그래밍'];
 
-const Home = ({ videos, loading }: HomeProps) => {
+const Home = ({ videos, loading, hasMore, loadingMore, onLoadMore }: HomeProps) => {
     const navigate = useNavigate();
+    const sentinelRef = useRef<HTMLDivElement>(null);
+
+    // 목록 끝이 화면에 보이면 다음 페이지 요청
+    useEffect(() => {
+        const sentinel = sentinelRef.current;
+        if (!sentinel || !hasMore) return;
+
+        const observer = new IntersectionObserver((entries) => {
+            if (entries[0].isIntersecting) onLoadMore();
+        }, { rootMargin: '400px' });
+        observer.observe(sentinel);
+        return () => observer.disconnect();
+    }, [hasMore, onLoadMore]);
 
     return (
         <div className="flex-1 overflow-y-auto p-4 sm:p-6 bg-[#0f0f0f]">
@@ -104,6 +125,8 @@ const Home = ({ videos, loading }: HomeProps) => {
             ))}
             </div>
         )}
+        <div ref={sentinelRef} className="h-10" />
+        {loadingMore && <div className="text-gray-400 text-center py-4">로딩중...</div>}
         </div>
         </div>
     );